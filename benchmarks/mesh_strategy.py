@@ -0,0 +1,105 @@
+"""
+Mesh Strategy Benchmark
+
+Compares the mesh strategies of the TIN generation on the same area regarding runtime, peak memory, triangle count
+and the largest vertical error of the mesh at the raster points within the area. The area is a square on a synthetic
+hilly DTM with the configured grid size. Every strategy runs in its own process, so the peak memory (maximum
+resident set size) is measured independently.
+
+Example:
+    Run the script from the repository root:
+
+        python benchmarks/mesh_strategy.py --POINTS=160000 --BACKEND=TRIANGLE
+
+Optional Arguments:
+    --POINTS (int): Approximate number of raster points within the area (default 160000).
+    --BACKEND (str): Triangulation backend, PYVISTA or TRIANGLE (default TRIANGLE).
+"""
+
+import argparse
+import multiprocessing
+import resource
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "src"))
+
+import numpy as np
+import shapely
+
+from config.configuration import config
+from config.mesh_strategy import MeshStrategy
+from config.triangulation_backend import TriangulationBackend
+from core.tin.area import Area
+from core.tin.grid import Grid
+from core.tin.triangulator import create_triangulator
+
+
+def create_area(points: int, grid_size: float) -> Area:
+    """Create a square area with about the given number of raster points on a synthetic hilly DTM."""
+    size = np.sqrt(points) * grid_size
+    origin = np.array([2600000.0, 1200000.0])
+    xs = origin[0] + (np.arange(-2, np.sqrt(points) + 3)) * grid_size
+    ys = origin[1] + (np.arange(-2, np.sqrt(points) + 3)) * grid_size
+    x, y = np.meshgrid(xs, ys)
+    z = 400 + 20 * np.sin(x / 150) * np.cos(y / 110) + 0.5 * np.sin(x / 13 + y / 17) + 0.05 * (x - origin[0])
+    raster_points = np.column_stack([x.ravel(), y.ravel(), z.ravel()])
+
+    area = Area(shapely.box(origin[0], origin[1], origin[0] + size, origin[1] + size))
+    area.raster_points_buffer.append(raster_points)
+    within = shapely.contains_xy(area.inner_polygon, raster_points[:, 0], raster_points[:, 1])
+    area.raster_points_within.append(raster_points[within])
+    return area
+
+
+def get_max_error(vertices: np.ndarray, faces: np.ndarray, raster_points: np.ndarray) -> float:
+    """Return the largest vertical error of a mesh at the raster points, ignoring triangles without area."""
+    triangles = shapely.polygons(vertices[faces][:, :, :2])
+    faces = faces[shapely.area(triangles) > 0]
+    triangles = shapely.polygons(vertices[faces][:, :, :2])
+    point_indices, face_indices = shapely.STRtree(triangles).query(shapely.points(raster_points[:, :2]),
+                                                                   predicate="intersects")
+    corners = vertices[faces[face_indices]]
+    heights = Grid.interpolate_vectorized(
+        raster_points[point_indices, 0], raster_points[point_indices, 1],
+        corners[:, 0, 0], corners[:, 0, 1], corners[:, 0, 2],
+        corners[:, 1, 0], corners[:, 1, 1], corners[:, 1, 2],
+        corners[:, 2, 0], corners[:, 2, 1], corners[:, 2, 2])
+    return float(np.max(np.abs(heights - raster_points[point_indices, 2])))
+
+
+def run_strategy(strategy: MeshStrategy, points: int, backend: TriangulationBackend, results: dict):
+    """Mesh the area with one strategy and store runtime, peak memory, triangle count and largest error."""
+    config.tin.mesh_strategy = strategy
+    Area.triangulator = create_triangulator(backend)
+    area = create_area(points, config.tin.grid_size.value)
+    baseline_memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    vertices, faces = area.create_mesh()
+    runtime = time.perf_counter() - start
+    peak_memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline_memory
+    max_error = get_max_error(vertices, faces, area.raster_points_within[0])
+    results[strategy.value] = (runtime, peak_memory / 1024, len(faces), max_error)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the mesh strategies of the TIN generation.")
+    parser.add_argument("--POINTS", type=int, default=160000, help="Number of raster points within the area")
+    parser.add_argument("--BACKEND", type=str, default="TRIANGLE", help="Triangulation backend")
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    with context.Manager() as manager:
+        results = manager.dict()
+        for strategy in MeshStrategy:
+            process = context.Process(target=run_strategy,
+                                      args=(strategy, args.POINTS, TriangulationBackend(args.BACKEND), results))
+            process.start()
+            process.join()
+
+        print(f"{args.POINTS} raster points, {args.BACKEND}, grid size {config.tin.grid_size.value} m, "
+              f"max height error {config.tin.max_height_error} m")
+        print(f"{'strategy':<10} {'runtime [s]':>12} {'peak memory [MB]':>18} {'triangles':>10} {'max error [m]':>14}")
+        for strategy, (runtime, peak_memory, triangles, max_error) in results.items():
+            print(f"{strategy:<10} {runtime:>12.3f} {peak_memory:>18.1f} {triangles:>10} {max_error:>14.3f}")
@@ -0,0 +1,115 @@
+"""
+Triangulation Benchmark
+
+Compares the triangulation backends of the TIN generation on the same areas regarding runtime, peak memory and
+triangle count. The areas are random polygons with holes on a synthetic DTM with the configured grid size. Every
+backend runs in its own process, so the peak memory (maximum resident set size) is measured independently.
+
+Example:
+    Run the script from the repository root:
+
+        python benchmarks/triangulation.py --AREAS=200 --SIZE=100
+
+Optional Arguments:
+    --AREAS (int): Number of areas to triangulate (default 100).
+    --SIZE (float): Approximate extent of the areas in meters (default 100).
+    --SEED (int): Seed of the random area generation (default 0).
+"""
+
+import argparse
+import multiprocessing
+import resource
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "src"))
+
+import numpy as np
+import shapely
+from shapely import Polygon
+
+from config.configuration import config
+from config.triangulation_backend import TriangulationBackend
+from core.tin.area import Area
+from core.tin.grid import Grid
+from core.tin.triangulator import PyvistaTriangulator, TriangleTriangulator
+
+TRIANGULATORS = {
+    TriangulationBackend.PYVISTA: PyvistaTriangulator,
+    TriangulationBackend.TRIANGLE: TriangleTriangulator,
+}
+
+
+def create_area(rng: np.random.Generator, size: float) -> Polygon:
+    """Create a random star shaped polygon with a hole."""
+    center = np.array([2600000.0, 1200000.0]) + rng.uniform(0, 10 * size, 2)
+    angles = np.sort(rng.uniform(0, 2 * np.pi, 24))
+    radii = rng.uniform(0.3, 0.5, 24) * size
+    exterior = center + np.column_stack([np.cos(angles), np.sin(angles)]) * radii[:, np.newaxis]
+    hole_angles = np.linspace(0, 2 * np.pi, 8, endpoint=False)
+    hole = center + np.column_stack([np.cos(hole_angles), np.sin(hole_angles)]) * 0.1 * size
+    return Polygon(exterior, [hole])
+
+
+def create_raster_points(polygon: Polygon, grid_size: float) -> np.ndarray:
+    """Create synthetic raster points covering the polygon with a buffer of two grid cells."""
+    minx, miny, maxx, maxy = polygon.buffer(2 * grid_size).bounds
+    xs = np.arange(np.floor(minx / grid_size), np.ceil(maxx / grid_size) + 1) * grid_size + grid_size / 2
+    ys = np.arange(np.floor(miny / grid_size), np.ceil(maxy / grid_size) + 1) * grid_size + grid_size / 2
+    x, y = np.meshgrid(xs, ys)
+    z = 400 + 5 * np.sin(x / 17) + 3 * np.cos(y / 11)
+    return np.column_stack([x.ravel(), y.ravel(), z.ravel()])
+
+
+def prepare_inputs(areas: int, size: float, seed: int) -> list[tuple]:
+    """Prepare the triangulation inputs (densified rings and points within) of all areas."""
+    rng = np.random.default_rng(seed)
+    grid_size = config.tin.grid_size.value
+    inputs = []
+    for _ in range(areas):
+        area = Area(create_area(rng, size))
+        raster_points = create_raster_points(area.polygon, grid_size)
+        grid = Grid(raster_points, grid_size)
+        exterior, *interiors = area.densify_linearrings_by_raster(
+            [area.polygon.exterior] + list(area.polygon.interiors), grid)
+        points = raster_points[:, :2]
+        mask = shapely.contains_xy(area.polygon.buffer(-0.001), points[:, 0], points[:, 1])
+        inputs.append((area.polygon, exterior, interiors, points[mask]))
+    return inputs
+
+
+def run_backend(backend: TriangulationBackend, areas: int, size: float, seed: int, results: dict):
+    """Triangulate all areas with one backend and store runtime, peak memory and triangle count."""
+    inputs = prepare_inputs(areas, size, seed)
+    triangulator = TRIANGULATORS[backend]()
+    baseline_memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    triangles = 0
+    for polygon, exterior, interiors, points_within in inputs:
+        _, faces = triangulator.triangulate(polygon, exterior, interiors, points_within)
+        triangles += len(faces)
+    runtime = time.perf_counter() - start
+    peak_memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline_memory
+    results[backend.value] = (runtime, peak_memory / 1024, triangles)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the triangulation backends of the TIN generation.")
+    parser.add_argument("--AREAS", type=int, default=100, help="Number of areas to triangulate")
+    parser.add_argument("--SIZE", type=float, default=100.0, help="Approximate extent of the areas in meters")
+    parser.add_argument("--SEED", type=int, default=0, help="Seed of the random area generation")
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    with context.Manager() as manager:
+        results = manager.dict()
+        for backend in TRIANGULATORS:
+            process = context.Process(target=run_backend, args=(backend, args.AREAS, args.SIZE, args.SEED, results))
+            process.start()
+            process.join()
+
+        print(f"{args.AREAS} areas, size {args.SIZE} m, grid size {config.tin.grid_size.value} m")
+        print(f"{'backend':<10} {'runtime [s]':>12} {'peak memory [MB]':>18} {'triangles':>10}")
+        for backend, (runtime, peak_memory, triangles) in results.items():
+            print(f"{backend:<10} {runtime:>12.3f} {peak_memory:>18.1f} {triangles:>10}")
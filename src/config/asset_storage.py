@@ -0,0 +1,8 @@
+from enum import Enum
+
+
+class AssetStorage(Enum):
+    """Available storage modes of the downloaded ZIP assets in the file cache"""
+
+    EXTRACT = "EXTRACT"  # the member is extracted (CityGML) or converted to a binary tile (DTM), the ZIP is removed
+    ZIP = "ZIP"  # the ZIP is stored and its member is streamed on every read (CityGML), DTM tiles are still converted
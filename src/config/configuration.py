@@ -1,15 +1,20 @@
 import os
 from pathlib import Path
-from pydantic import BaseModel, model_validator, Field
+from pydantic import BaseModel, model_validator, field_validator, Field
 from pydantic_yaml import parse_yaml_raw_as
 from typing import List, Optional
 
+from config.asset_storage import AssetStorage
 from config.building_source import BuildingSource
+from config.dtm_source import DtmSource
 from config.extrusion_source import ExtrusionSource
 from config.geo_referencing import GeoReferencing
 from config.gml_geometry import GmlGeometry
 from config.grid_size import GridSize
+from config.mesh_strategy import MeshStrategy
 from config.projection_source import ProjectionSource
+from config.triangulation_backend import TriangulationBackend
+from utils.xpath import compile_xpath
 
 
 class Color(BaseModel):
@@ -62,12 +67,41 @@ class STACConfig(BaseModel):
 
     dtm_items_url: Optional[str] = Field(None, description="URL to STAC items for DTM data")
     building_items_url: Optional[str] = Field(None, description="URL to STAC items for building data")
+    dtm_source: DtmSource = Field(DtmSource.XYZ,
+                                  description="Format of the DTM assets. COG assets are not downloaded, only the "
+                                              "windows covering the areas are read with HTTP range requests.")
+    asset_storage: AssetStorage = Field(AssetStorage.EXTRACT,
+                                        description="Storage of the downloaded ZIP assets. ZIP keeps only the "
+                                                    "compressed file and streams its member on every read. DTM "
+                                                    "assets are converted to binary tiles with both storages.")
 
 
 class TINConfig(BaseModel):
     """TIN generation configuration"""
     grid_size: GridSize = Field(..., description="TIN grid size")
     max_height_error: float = Field(..., ge=0.0, le=0.05, description="Maximum allowed height error for TIN generation")
+    triangulation_backend: TriangulationBackend = Field(TriangulationBackend.PYVISTA,
+                                                        description="Triangulation backend for the TIN generation. "
+                                                                    "TRIANGLE falls back to PYVISTA if the triangle library is not installed.")
+    mesh_strategy: MeshStrategy = Field(MeshStrategy.DECIMATE,
+                                        description="Mesh creation strategy. ADAPTIVE inserts raster points until "
+                                                    "max_height_error is met at every raster point.")
+    mesh_cache_size_mb: int = Field(0, ge=0,
+                                    description="Size in MB of the disk cache for area meshes. The cache is "
+                                                "disabled by default (0), setting a size opts in.")
+
+
+class ProcessingConfig(BaseModel):
+    """Processing configuration"""
+
+    workers: int = Field(1, ge=1, description="Number of worker processes for CPU bound processing steps like the mesh "
+                                              "creation (1 = processing in the task process). The worker "
+                                              "processes are started by every task process of the Celery worker, "
+                                              "so up to concurrency x workers processes run at once.")
+    building_cache_size_mb: int = Field(0, ge=0,
+                                        description="Size in MB of the disk cache for buildings converted from "
+                                                    "CityGML. The cache is disabled by default (0), setting a size "
+                                                    "opts in.")
 
 
 class ProjectionConfigSource(BaseModel):
@@ -132,6 +166,10 @@ class ProjectionFeatureType(BaseModel):
                                                         description="Group mappings for the projection feature type")
     color: Color = Field(default_factory=lambda: Color(r=1.0, g=1.0, b=1.0), json_schema_extra={"default": "white"},
                          description="Color assigned to the projection feature type")
+    partition_group: Optional[str] = Field(None,
+                                           description="Name of the partition group. The polygons of all feature types "
+                                                       "of a group share their boundaries (e.g. land cover) and are "
+                                                       "meshed together without cracks.")
 
 
 class GmlGeometryMapping(BaseModel):
@@ -140,6 +178,13 @@ class GmlGeometryMapping(BaseModel):
     xpath: str = Field(..., description="XPath expression to locate the building part geometry in source data")
     geometry: GmlGeometry = Field(..., description="Referenced geometry type of the building part")
 
+    @field_validator("xpath")
+    @classmethod
+    def check_xpath(cls, xpath: str) -> str:
+        """Compile the XPath expression, so invalid expressions are rejected when the configuration loads."""
+        compile_xpath(xpath)
+        return xpath
+
 
 class BuildingPartConfig(BaseModel):
     """Building part configuration for building feature type"""
@@ -156,6 +201,13 @@ class BuildingSourceConfig(BaseModel):
     type: BuildingSource = Field(..., description="Type of the data source")
     expression: str = Field(..., description="Expression defining the source data")
 
+    @model_validator(mode="after")
+    def check_xpath(self):
+        """Compile the XPath expression of CityGML sources, so invalid expressions are rejected when loading."""
+        if self.type == BuildingSource.CITY_GML:
+            compile_xpath(self.expression)
+        return self
+
 
 class BuildingPropertyConfig(BaseModel):
     """Property mapping configuration for building feature type"""
@@ -212,6 +264,13 @@ class BuildingFeatureType(BaseModel):
     group_mapping: List[BuildingSourceConfig] = Field(default_factory=list, json_schema_extra={"default": []},
                                                       description="Group mappings for the building feature type")
 
+    @field_validator("egid_xpath")
+    @classmethod
+    def check_egid_xpath(cls, egid_xpath: str) -> str:
+        """Compile the EGID XPath expression, so invalid expressions are rejected when the configuration loads."""
+        compile_xpath(egid_xpath)
+        return egid_xpath
+
 
 class ExtrusionConfigSource(BaseModel):
     """Source configuration for extrusion feature type"""
@@ -344,7 +403,7 @@ class Configuration(BaseModel):
 
     This class defines the complete configuration model for the application. It aggregates
     settings for logging, internationalization (i18n), Redis and PostGIS database connections,
-    STAC data sources, TIN generation, and IFC export configuration. The configuration is
+    STAC data sources, TIN generation, processing, and IFC export configuration. The configuration is
     typically loaded from a YAML file using the `load()` class method, which supports
     environment variable expansion.
     """
@@ -356,6 +415,8 @@ class Configuration(BaseModel):
                              description="STAC configuration for external data sources")
     tin: TINConfig = Field(default_factory=lambda: TINConfig(grid_size=GridSize.SMALL, max_height_error=0.05),
                            description="TIN (Triangulated Irregular Network) generation configuration")
+    processing: ProcessingConfig = Field(default_factory=lambda: ProcessingConfig(),
+                                         description="Processing configuration")
     ifc: IFCConfig = Field(..., description="IFC (Industry Foundation Classes) export configuration")
 
     @classmethod
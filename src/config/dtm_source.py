@@ -0,0 +1,8 @@
+from enum import Enum
+
+
+class DtmSource(Enum):
+    """Available DTM asset formats of the STAC DTM collection"""
+
+    XYZ = "XYZ"  # zipped ASCII XYZ files, downloaded and converted to binary tiles
+    COG = "COG"  # cloud optimized GeoTIFFs, read by windows covering the areas
@@ -0,0 +1,8 @@
+from enum import Enum
+
+
+class MeshStrategy(Enum):
+    """Available strategies for the mesh creation of an area"""
+
+    DECIMATE = "DECIMATE"  # dense triangulation of all raster points with subsequent decimation
+    ADAPTIVE = "ADAPTIVE"  # greedy insertion of raster points until the maximum height error is met
@@ -0,0 +1,8 @@
+from enum import Enum
+
+
+class TriangulationBackend(Enum):
+    """Available triangulation backends for the TIN generation"""
+
+    TRIANGLE = "TRIANGLE"  # constrained Delaunay triangulation by the triangle library
+    PYVISTA = "PYVISTA"  # Delaunay triangulation by VTK with clipping to the area
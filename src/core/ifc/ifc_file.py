@@ -5,6 +5,7 @@ This module contains wrapper functions to simplify the process of building an if
 import math
 import datetime
 import logging
+import numpy as np
 from ifcopenshell import file, entity_instance, guid
 from shapely import Point
 
@@ -29,8 +30,9 @@ class IfcFile:
     def write(self, path: str):
         self.file.write(path)
 
-    def create_ifc_cartesian_point(self, point: Point) -> entity_instance:
-        return self.file.create_entity("IfcCartesianPoint", Coordinates=point.coords[0])
+    def create_ifc_cartesian_point(self, point: Point | tuple[float, ...]) -> entity_instance:
+        coordinates = point.coords[0] if isinstance(point, Point) else tuple(point)
+        return self.file.create_entity("IfcCartesianPoint", Coordinates=coordinates)
 
     def create_ifc_owner_history(self, name: str, version: str, application_full_name: str) -> entity_instance:
         the_person = self.file.create_entity("IfcPerson", GivenName=name)
@@ -231,18 +233,15 @@ class IfcFile:
         voids = [self.file.create_entity("IfcClosedShell", CfsFaces=void_faces) for void_faces in void_faces_list]
         return self.file.create_entity("IfcFacetedBrepWithVoids", Outer=outer, Voids=voids)
 
-    def create_ifc_triangulated_face_set(
-            self, coord_list: list[Point], coord_index: list[tuple[int, int, int]]
-    ) -> entity_instance:
-        coordinates = self.file.create_entity("IfcCartesianPointList3D",
-                                              CoordList=[coord.coords[0] for coord in coord_list])
-        return self.file.create_entity("IfcTriangulatedFaceSet", Coordinates=coordinates, CoordIndex=coord_index)
+    def create_ifc_triangulated_face_set(self, coord_list: np.ndarray, coord_index: np.ndarray) -> entity_instance:
+        coordinates = self.file.create_entity("IfcCartesianPointList3D", CoordList=coord_list.tolist())
+        return self.file.create_entity("IfcTriangulatedFaceSet", Coordinates=coordinates,
+                                       CoordIndex=coord_index.tolist())
 
     def create_ifc_polygonal_face_set(
-            self, coord_list: list[Point], faces: list[entity_instance]
+            self, coord_list: list[tuple[float, float, float]], faces: list[entity_instance]
     ) -> entity_instance:
-        coordinates = self.file.create_entity("IfcCartesianPointList3D",
-                                              CoordList=[coord.coords[0] for coord in coord_list])
+        coordinates = self.file.create_entity("IfcCartesianPointList3D", CoordList=coord_list)
         return self.file.create_entity("IfcPolygonalFaceSet", Coordinates=coordinates, Faces=faces)
 
     def create_ifc_indexed_polygonal_face(
@@ -253,7 +252,7 @@ class IfcFile:
     def create_ifc_indexed_polygonal_face_with_voids(
             self, coord_index: list[tuple[int, int, int]], inner_cord_indices: list[list[tuple[int, int, int]]]
     ) -> entity_instance:
-        return self.file.create_entity("IfcIndexedPolygonalFaceWithVoids", CoordList=coord_index,
+        return self.file.create_entity("IfcIndexedPolygonalFaceWithVoids", CoordIndex=coord_index,
                                        InnerCoordIndices=inner_cord_indices)
 
     def create_ifc_product_definition_shape(
@@ -19,7 +19,9 @@ class Building(FeatureElement):
                    ifc_representation_sub_context: entity_instance) -> entity_instance:
         ifc_local_placement = ifc_file.create_relative_ifc_local_placement(placement_rel_to, Point(0, 0, 0))
         ifc_building = ifc_file.create_ifc_product("IfcBuilding", ifc_local_placement)
-        ifc_elements = [building_part.map_to_ifc(ifc_file, ifc_local_placement, ifc_representation_sub_context) for
+        vertices = {}
+        ifc_elements = [building_part.map_to_ifc(ifc_file, ifc_local_placement, ifc_representation_sub_context,
+                                                 vertices) for
                         building_part in
                         self.building_parts]
         ifc_file.create_ifc_rel_contained_in_spatial_structure(ifc_elements, ifc_building)
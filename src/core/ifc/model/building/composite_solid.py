@@ -1,11 +1,17 @@
+from typing import Iterator
+
+import numpy as np
 from ifcopenshell import entity_instance
 from lxml.etree import _Element as XmlElement
 from shapely import Point
 
 from core.ifc.ifc_file import IfcFile
 from core.ifc.model.building.gml_geometry import GmlGeometry
-from core.ifc.model.building.namespace import namespace
 from core.ifc.model.building.solid import Solid
+from utils.xpath import compile_xpath
+
+
+SOLID_XPATH = compile_xpath("./gml:solidMember/gml:Solid")
 
 
 class CompositeSolid(GmlGeometry):
@@ -14,12 +20,22 @@ class CompositeSolid(GmlGeometry):
         self.solids = []
 
     def from_gml(self, gml: XmlElement, project_origin: Point):
-        for solid_gml in gml.xpath("./gml:solidMember/gml:Solid", namespaces=namespace):
+        for solid_gml in SOLID_XPATH(gml):
             solid = Solid()
             solid.from_gml(solid_gml, project_origin)
             self.solids.append(solid)
 
+    def to_layout(self, rings: list[np.ndarray]) -> list:
+        return [solid.to_layout(rings) for solid in self.solids]
+
+    def from_layout(self, layout: list, rings: Iterator[np.ndarray], project_origin: Point):
+        for solid_layout in layout:
+            solid = Solid()
+            solid.from_layout(solid_layout, rings, project_origin)
+            self.solids.append(solid)
+
     def map_to_ifc(self, ifc_file: IfcFile, ifc_style: entity_instance,
-                   ifc_representation_sub_context: entity_instance) -> entity_instance:
-        ifc_breps = [solid.create_ifc_brep(ifc_file, ifc_style) for solid in self.solids]
+                   ifc_representation_sub_context: entity_instance,
+                   vertices: dict[tuple, entity_instance]) -> entity_instance:
+        ifc_breps = [solid.create_ifc_brep(ifc_file, ifc_style, vertices) for solid in self.solids]
         return ifc_file.create_ifc_product_definition_shape(ifc_representation_sub_context, "Brep", ifc_breps)
@@ -1,10 +1,16 @@
+from typing import Iterator
+
+import numpy as np
 from ifcopenshell import entity_instance
 from lxml.etree import _Element as XmlElement
 from shapely import Point
 
 from core.ifc.ifc_file import IfcFile
-from core.ifc.model.building.namespace import namespace
 from core.ifc.model.building.polygon import Polygon
+from utils.xpath import compile_xpath
+
+
+POLYGON_XPATH = compile_xpath("./gml:surfaceMember/gml:Polygon")
 
 
 class CompositeSurface:
@@ -13,16 +19,27 @@ class CompositeSurface:
         self.polygons = []
 
     def from_gml(self, gml: XmlElement, project_origin: Point):
-        for polygon_gml in gml.xpath("./gml:surfaceMember/gml:Polygon", namespaces=namespace):
+        for polygon_gml in POLYGON_XPATH(gml):
             polygon = Polygon()
             polygon.from_gml(polygon_gml, project_origin)
             self.polygons.append(polygon)
 
+    def to_layout(self, rings: list[np.ndarray]) -> list:
+        """Append the ring coordinates to rings and return the layouts of the polygons."""
+        return [polygon.to_layout(rings) for polygon in self.polygons]
+
+    def from_layout(self, layout: list, rings: Iterator[np.ndarray], project_origin: Point):
+        """Create the composite surface from its layout (see `to_layout`) and the ring coordinates without origin."""
+        for polygon_layout in layout:
+            polygon = Polygon()
+            polygon.from_layout(polygon_layout, rings, project_origin)
+            self.polygons.append(polygon)
+
     def create_ifc_indexed_polygonal_faces(self, ifc_file: IfcFile, coordinates: dict[tuple, int]) -> list[
         entity_instance]:
         ifc_faces = [polygon.create_ifc_indexed_polygonal_face(ifc_file, coordinates) for polygon in self.polygons]
         return ifc_faces
 
-    def create_ifc_faces(self, ifc_file: IfcFile) -> list[entity_instance]:
-        ifc_faces = [polygon.create_ifc_face(ifc_file) for polygon in self.polygons]
+    def create_ifc_faces(self, ifc_file: IfcFile, vertices: dict[tuple, entity_instance]) -> list[entity_instance]:
+        ifc_faces = [polygon.create_ifc_face(ifc_file, vertices) for polygon in self.polygons]
         return ifc_faces
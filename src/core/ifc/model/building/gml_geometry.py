@@ -1,4 +1,7 @@
 from abc import ABC, abstractmethod
+from typing import Any, Iterator
+
+import numpy as np
 from ifcopenshell import entity_instance
 from lxml.etree import _Element as XmlElement
 from shapely import Point
@@ -28,9 +31,41 @@ class GmlGeometry(ABC):
         """
         raise NotImplementedError("from_gml must be implemented by subclasses")
 
+    @abstractmethod
+    def to_layout(self, rings: list[np.ndarray]) -> Any:
+        """
+        Return the compact representation of the geometry used by the building cache.
+
+        Args:
+            rings: List to which the ring coordinates (arrays of shape (N, 3)) are appended in traversal order.
+
+        Returns:
+            The JSON serializable structure of the geometry referencing the rings by their order.
+
+        Raises:
+            NotImplementedError: Must be implemented by subclasses.
+        """
+        raise NotImplementedError("to_layout must be implemented by subclasses")
+
+    @abstractmethod
+    def from_layout(self, layout: Any, rings: Iterator[np.ndarray], project_origin: Point):
+        """
+        Create the geometry from its compact representation (see `to_layout`).
+
+        Args:
+            layout: The structure of the geometry.
+            rings: Iterator over the ring coordinates in traversal order.
+            project_origin: The project origin to apply for spatial transformation.
+
+        Raises:
+            NotImplementedError: Must be implemented by subclasses.
+        """
+        raise NotImplementedError("from_layout must be implemented by subclasses")
+
     @abstractmethod
     def map_to_ifc(self, ifc_file: IfcFile, ifc_style: entity_instance,
-                   ifc_representation_sub_context: entity_instance) -> entity_instance:
+                   ifc_representation_sub_context: entity_instance,
+                   vertices: dict[tuple, entity_instance]) -> entity_instance:
         """
         Create an IFC Product Definition Shape entity for this geometry.
 
@@ -38,6 +73,8 @@ class GmlGeometry(ABC):
             ifc_file: An instance of the IFC file to which geometry should be added.
             ifc_style: IFC style definition to apply.
             ifc_representation_sub_context: IFC sub-context entity.
+            vertices: Cartesian points by coordinates shared by the boundary representations of a building, so
+                that every corner becomes a single IFC cartesian point. Missing points are added.
 
         Returns:
             The created IFC Product Definition Shape entity.
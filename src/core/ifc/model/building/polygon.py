@@ -1,10 +1,17 @@
+from typing import Iterator
+
+import numpy as np
 from ifcopenshell import entity_instance
 from lxml.etree import _Element as XmlElement
 from shapely import Point
 
 from core.ifc.ifc_file import IfcFile
-from core.ifc.model.building.namespace import namespace
 from core.ifc.model.building.pos_list import PosList
+from utils.xpath import compile_xpath
+
+
+EXTERIOR_XPATH = compile_xpath("./gml:exterior//gml:posList")
+INTERIOR_XPATH = compile_xpath("./gml:interior//gml:posList")
 
 
 class Polygon:
@@ -14,20 +21,34 @@ class Polygon:
         self.interior = []
 
     def from_gml(self, gml: XmlElement, project_origin: Point):
-        pos_list_exterior = gml.xpath("./gml:exterior//gml:posList", namespaces=namespace)
+        pos_list_exterior = EXTERIOR_XPATH(gml)
         if len(pos_list_exterior) != 1:
             raise ValueError("Polygon expects exactly one exterior posList")
         self.exterior.from_gml(pos_list_exterior[0], project_origin)
-        for pos_list_gml in gml.xpath("./gml:interior//gml:posList", namespaces=namespace):
+        for pos_list_gml in INTERIOR_XPATH(gml):
             pos_list = PosList()
             pos_list.from_gml(pos_list_gml, project_origin)
             self.interior.append(pos_list)
 
+    def to_layout(self, rings: list[np.ndarray]) -> int:
+        """Append the ring coordinates to rings and return the number of rings (exterior first)."""
+        rings.append(self.exterior.coordinates)
+        rings.extend(pos_list.coordinates for pos_list in self.interior)
+        return 1 + len(self.interior)
+
+    def from_layout(self, layout: int, rings: Iterator[np.ndarray], project_origin: Point):
+        """Create the polygon from its layout (see `to_layout`) and the ring coordinates without origin."""
+        self.exterior.from_coordinates(next(rings), project_origin)
+        for _ in range(layout - 1):
+            pos_list = PosList()
+            pos_list.from_coordinates(next(rings), project_origin)
+            self.interior.append(pos_list)
+
     def create_ifc_indexed_polygonal_face(self, ifc_file: IfcFile,
                                           coordinates: dict[tuple, int]) -> entity_instance:
         exterior_indices = []
-        for vertex in self.exterior.coordinates:
-            key = vertex.coords[0]
+        for vertex in self.exterior.coordinates.tolist():
+            key = tuple(vertex)
             if key not in coordinates:
                 coordinates[key] = len(coordinates) + 1
             exterior_indices.append(coordinates[key])
@@ -35,8 +56,8 @@ class Polygon:
         interior_indices_list = []
         for interior in self.interior:
             polygon_indices = []
-            for vertex in interior.coordinates:
-                key = vertex.coords[0]
+            for vertex in interior.coordinates.tolist():
+                key = tuple(vertex)
                 if key not in coordinates:
                     coordinates[key] = len(coordinates) + 1
                 polygon_indices.append(coordinates[key])
@@ -47,21 +68,19 @@ class Polygon:
         else:
             return ifc_file.create_ifc_indexed_polygonal_face(exterior_indices)
 
-    def create_ifc_face(self, ifc_file: IfcFile) -> entity_instance:
-        vertex_dict = {}
-        vertices = []
-        for vertex in self.exterior.coordinates:
-            if vertex not in vertex_dict:
-                vertex_dict[vertex] = ifc_file.create_ifc_cartesian_point(vertex)
-            vertices.append(vertex_dict[vertex])
-        exterior_ifc_poly_loop = ifc_file.create_ifc_poly_loop(vertices)
-        interior_ifc_poly_loops = []
-        for interior in self.interior:
-            vertices = []
-            for vertex in interior:
-                if vertex not in vertex_dict:
-                    vertex_dict[vertex] = ifc_file.create_ifc_cartesian_point(vertex)
-                vertices.append(vertex_dict[vertex])
-            interior_ifc_poly_loops.append(ifc_file.create_ifc_poly_loop(vertices))
+    def create_ifc_face(self, ifc_file: IfcFile, vertices: dict[tuple, entity_instance]) -> entity_instance:
+        """Create the face with cartesian points from vertices (by coordinates), adding the missing points."""
+        exterior_ifc_poly_loop = self.create_ifc_poly_loop(ifc_file, self.exterior, vertices)
+        interior_ifc_poly_loops = [self.create_ifc_poly_loop(ifc_file, interior, vertices) for interior in self.interior]
         ifc_face = ifc_file.create_ifc_face(exterior_ifc_poly_loop, interior_ifc_poly_loops)
         return ifc_face
+
+    @staticmethod
+    def create_ifc_poly_loop(ifc_file: IfcFile, pos_list: PosList,
+                             vertices: dict[tuple, entity_instance]) -> entity_instance:
+        ifc_cartesian_points = []
+        for vertex in map(tuple, pos_list.coordinates.tolist()):
+            if vertex not in vertices:
+                vertices[vertex] = ifc_file.create_ifc_cartesian_point(vertex)
+            ifc_cartesian_points.append(vertices[vertex])
+        return ifc_file.create_ifc_poly_loop(ifc_cartesian_points)
@@ -1,3 +1,4 @@
+import numpy as np
 from lxml.etree import _Element as XmlElement
 
 from shapely import Point
@@ -6,17 +7,19 @@ from shapely import Point
 class PosList:
     def __init__(self):
         super().__init__()
-        self.coordinates = []
+        self.coordinates = np.empty((0, 3))  # array of shape (N, 3) without the closing coordinate
 
     def from_gml(self, gml: XmlElement, project_origin: Point):
-        coords = list(map(float, gml.text.split()))
+        coords = np.asarray(gml.text.split(), dtype=np.float64)
         if len(coords) % 3 != 0:
             raise ValueError("PosList is not 3 dimensional")
         if len(coords) < 12:
             raise ValueError("PosList must have at least 4 coordinates")
-        if coords[:3] != coords[-3:]:
+        coords = coords.reshape((-1, 3))
+        if not np.array_equal(coords[0], coords[-1]):
             raise ValueError("PosList must be closed")
-        for i in range(0, len(coords) - 3, 3):
-            self.coordinates.append(
-                Point(float(coords[i] - project_origin.x), float(coords[i + 1] - project_origin.y),
-                            float(coords[i + 2] - project_origin.z)))
+        self.from_coordinates(coords[:-1], project_origin)
+
+    def from_coordinates(self, coordinates: np.ndarray, project_origin: Point):
+        """Set the coordinates from an array of shape (N, 3) without closing coordinate, shifted by the origin."""
+        self.coordinates = coordinates - np.array([project_origin.x, project_origin.y, project_origin.z])
@@ -1,3 +1,6 @@
+from typing import Iterator
+
+import numpy as np
 from ifcopenshell import entity_instance
 from lxml.etree import _Element as XmlElement
 from shapely import Point
@@ -5,7 +8,11 @@ from shapely import Point
 from core.ifc.ifc_file import IfcFile
 from core.ifc.model.building.composite_surface import CompositeSurface
 from core.ifc.model.building.gml_geometry import GmlGeometry
-from core.ifc.model.building.namespace import namespace
+from utils.xpath import compile_xpath
+
+
+EXTERIOR_XPATH = compile_xpath("./gml:exterior/gml:CompositeSurface")
+INTERIOR_XPATH = compile_xpath("./gml:interior/gml:CompositeSurface")
 
 
 class Solid(GmlGeometry):
@@ -15,19 +22,30 @@ class Solid(GmlGeometry):
         self.interior = []
 
     def from_gml(self, gml: XmlElement, project_origin: Point):
-        surface_exterior = gml.xpath("./gml:exterior/gml:CompositeSurface", namespaces=namespace)
+        surface_exterior = EXTERIOR_XPATH(gml)
         if len(surface_exterior) != 1:
             raise ValueError("Solid expects exactly one exterior composite surface")
         self.exterior.from_gml(surface_exterior[0], project_origin)
-        for interior_gml in gml.xpath("./gml:interior", namespaces=namespace):
-            for composite_surface_gml in interior_gml.xpath("./gml:CompositeSurface", namespaces=namespace):
-                composite_surface = CompositeSurface()
-                composite_surface.from_gml(composite_surface_gml, project_origin)
-                self.interior.append(composite_surface)
-
-    def create_ifc_brep(self, ifc_file: IfcFile, ifc_style: entity_instance) -> entity_instance:
-        exterior_ifc_faces = self.exterior.create_ifc_faces(ifc_file)
-        interior_ifc_faces_list = [cs.create_ifc_faces(ifc_file) for cs in self.interior]
+        for composite_surface_gml in INTERIOR_XPATH(gml):
+            composite_surface = CompositeSurface()
+            composite_surface.from_gml(composite_surface_gml, project_origin)
+            self.interior.append(composite_surface)
+
+    def to_layout(self, rings: list[np.ndarray]) -> list:
+        return [self.exterior.to_layout(rings), [cs.to_layout(rings) for cs in self.interior]]
+
+    def from_layout(self, layout: list, rings: Iterator[np.ndarray], project_origin: Point):
+        exterior_layout, interior_layouts = layout
+        self.exterior.from_layout(exterior_layout, rings, project_origin)
+        for interior_layout in interior_layouts:
+            composite_surface = CompositeSurface()
+            composite_surface.from_layout(interior_layout, rings, project_origin)
+            self.interior.append(composite_surface)
+
+    def create_ifc_brep(self, ifc_file: IfcFile, ifc_style: entity_instance,
+                        vertices: dict[tuple, entity_instance]) -> entity_instance:
+        exterior_ifc_faces = self.exterior.create_ifc_faces(ifc_file, vertices)
+        interior_ifc_faces_list = [cs.create_ifc_faces(ifc_file, vertices) for cs in self.interior]
         if interior_ifc_faces_list:
             ifc_brep = ifc_file.create_ifc_faceted_brep_with_voids(exterior_ifc_faces, interior_ifc_faces_list)
         else:
@@ -36,6 +54,7 @@ class Solid(GmlGeometry):
         return ifc_brep
 
     def map_to_ifc(self, ifc_file: IfcFile, ifc_style: entity_instance,
-                   ifc_representation_sub_context: entity_instance) -> entity_instance:
-        ifc_brep = self.create_ifc_brep(ifc_file, ifc_style)
+                   ifc_representation_sub_context: entity_instance,
+                   vertices: dict[tuple, entity_instance]) -> entity_instance:
+        ifc_brep = self.create_ifc_brep(ifc_file, ifc_style, vertices)
         return ifc_file.create_ifc_product_definition_shape(ifc_representation_sub_context, "Brep", [ifc_brep])
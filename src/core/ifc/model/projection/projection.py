@@ -1,3 +1,4 @@
+import numpy as np
 from ifcopenshell import entity_instance
 from shapely import Point
 
@@ -8,20 +9,14 @@ from core.ifc.model.projection.tessellation import Tessellation
 
 class Projection(FeatureElement):
 
-    def __init__(self, data: tuple[list[list[float]], list[list[int]]]):
+    def __init__(self, data: tuple[np.ndarray, np.ndarray]):
         super().__init__()
-        self.triangles = []
-        point_list = data[0]
-        index_list = data[1]
-        for triangle in index_list:
-            p1 = Point(point_list[triangle[0]])
-            p2 = Point(point_list[triangle[1]])
-            p3 = Point(point_list[triangle[2]])
-            self.triangles.append((p1, p2, p3))
+        self.vertices = np.asarray(data[0], dtype=np.float64).reshape(-1, 3)
+        self.indices = np.asarray(data[1], dtype=np.int64).reshape(-1, 3)
 
     def map_to_ifc(self, ifc_file: IfcFile, entity: str, placement_rel_to: entity_instance, ifc_representation_sub_context: entity_instance,
                    ifc_style: entity_instance) -> entity_instance:
-        tessellation = Tessellation(self.triangles)
+        tessellation = Tessellation(self.vertices, self.indices)
         ifc_face_set = tessellation.map_to_ifc(ifc_file)
         ifc_product_definition_shape = ifc_file.create_ifc_product_definition_shape(ifc_representation_sub_context,
                                                                                     "Tessellation", [ifc_face_set])
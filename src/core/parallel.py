@@ -0,0 +1,49 @@
+import logging
+from typing import Callable, TypeVar
+
+import billiard
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def map_inputs(function: Callable[[T], R], inputs: list[T], workers: int) -> list[R]:
+    """
+    Apply a function to all inputs, in worker processes if more than one worker is configured.
+
+    The function and the inputs are sent to the worker processes, so they must be picklable (module level functions
+    or bound methods of picklable objects). The pool of billiard (the multiprocessing fork of Celery) is used, which
+    may be started from daemonic processes like the task processes of the Celery prefork pool, unlike the pools of
+    the standard library.
+
+    Args:
+        function: The function to apply.
+        inputs: The inputs of the function.
+        workers: Number of worker processes. With one worker the function is applied in the current process.
+
+    Returns:
+        The results in the order of the inputs.
+    """
+    if workers <= 1 or len(inputs) <= 1:
+        return [function(value) for value in inputs]
+
+    logger.info(f"process {len(inputs)} inputs of {function.__name__} with {workers} worker processes")
+    chunksize = max(1, len(inputs) // (workers * 4))
+    chunks = [inputs[start:start + chunksize] for start in range(0, len(inputs), chunksize)]
+    pool = billiard.get_context().Pool(processes=min(workers, len(inputs)))
+    try:
+        # one job per chunk, billiard accounts the results of a map job to one worker only and the other workers
+        # then wait for the results to be consumed before they exit
+        async_results = [pool.apply_async(apply_to_chunk, (function, chunk)) for chunk in chunks]
+        return [result for async_result in async_results for result in async_result.get()]
+    finally:
+        # terminating the pool may block in billiard, the workers exit when the remaining chunks are done
+        pool.close()
+        pool.join()
+
+
+def apply_to_chunk(function: Callable[[T], R], chunk: list[T]) -> list[R]:
+    """Apply a function to the inputs of a chunk in a worker process."""
+    return [function(value) for value in chunk]
@@ -0,0 +1,326 @@
+import logging
+from contextlib import ExitStack
+from typing import Any, Iterator
+
+import numpy as np
+from lxml.etree import _Element as XmlElement
+from shapely import Point
+
+from config.building_source import BuildingSource
+from config.configuration import BuildingFeatureType, BuildingAttributeConfig, BuildingPropertyConfig
+from config.gml_geometry import GmlGeometry
+from core.ifc.model.building.building import BuildingPart, Building
+from core.ifc.model.building.gml_geometry import GmlGeometry as GmlGeometryModel
+from core.ifc.model.element import Element
+from core.ifc.model.building.composite_solid import CompositeSolid
+from core.ifc.model.building.multi_surface import MultiSurface
+from core.ifc.model.building.solid import Solid
+from service.asset_file import AssetFile
+from service.building_cache import BuildingCache
+from service.city_gml_index import CityGmlIndex
+from utils.xpath import compile_xpath, find_text
+
+logger = logging.getLogger(__name__)
+
+
+class CityGmlBuildings:
+    """
+    The buildings of the feature types read from a CityGML file, in the compact form of the building cache.
+
+    Per feature type the EGIDs and layouts (CITY_GML values and geometry structure, see `GmlGeometry.to_layout`) of the
+    buildings are kept in the order of the file, and the coordinates of their rings are packed into one array without
+    project origin. Worker processes return this form instead of `Building` objects, so only a few arrays and small
+    layouts are sent back to the calling process.
+    """
+
+    def __init__(self):
+        self.buildings_by_key: dict[str, list[tuple[str, dict[str, Any]]]] = {}
+        self.rings_by_key: dict[str, list[np.ndarray]] = {}
+        self.coordinates_by_key: dict[str, np.ndarray] = {}
+        self.ring_sizes_by_key: dict[str, np.ndarray] = {}
+
+    def add(self, feature_type_key: str, egid: str, layout: dict[str, Any], rings: list[np.ndarray]):
+        """Add a building with its layout and ring coordinates."""
+        self.buildings_by_key.setdefault(feature_type_key, []).append((egid, layout))
+        self.rings_by_key.setdefault(feature_type_key, []).extend(rings)
+
+    def pack(self):
+        """Pack the ring coordinates of every feature type into one array and the ring sizes."""
+        for feature_type_key, rings in self.rings_by_key.items():
+            self.coordinates_by_key[feature_type_key] = np.vstack(rings) if rings else np.empty((0, 3))
+            self.ring_sizes_by_key[feature_type_key] = np.array([len(ring) for ring in rings], dtype=np.int64)
+        self.rings_by_key = {}
+
+    def get_rings(self, feature_type_key: str) -> list[np.ndarray]:
+        """Return the ring coordinates of the buildings of a feature type in the order of the layouts."""
+        ring_ends = np.cumsum(self.ring_sizes_by_key.get(feature_type_key, []))
+        if len(ring_ends) == 0:
+            return []
+        return np.split(self.coordinates_by_key[feature_type_key], ring_ends[:-1])
+
+
+class CityGmlReader:
+    """
+    Reads the buildings of the building feature types from CityGML files.
+
+    The reader holds only plain data (feature type configurations, SQL rows, the project origin and the building
+    cache settings), so it can be sent to worker processes and the buildings of several CityGML files can be read in
+    parallel. `read` returns the buildings in the compact form of the building cache (see `CityGmlBuildings`) and
+    `create_buildings` creates the building elements from it in the calling process. Converted buildings are stored in
+    the building cache and later jobs reuse them without parsing the CityGML fragments.
+    """
+
+    CACHE_ORIGIN = Point(0, 0, 0)  # geometries are read and cached without project origin
+
+    def __init__(self, feature_types: dict[str, BuildingFeatureType],
+                 element_rows_by_egid_by_key: dict[str, dict[str, dict[str, Any]]], project_origin: Point,
+                 building_cache: BuildingCache, asset_ids_by_file: dict[str, str]):
+        self.feature_types = feature_types
+        self.element_rows_by_egid_by_key = element_rows_by_egid_by_key
+        self.project_origin = project_origin
+        self.building_cache = building_cache
+        self.asset_ids_by_file = asset_ids_by_file
+        self.requested_egids_by_xpath: dict[str, set[str]] = {}
+        for feature_type_key, feature_type in feature_types.items():
+            self.requested_egids_by_xpath.setdefault(feature_type.egid_xpath, set()).update(
+                element_rows_by_egid_by_key[feature_type_key].keys())
+
+    def read(self, city_gml: str) -> CityGmlBuildings:
+        """
+        Read the requested buildings of a CityGML file.
+
+        Only the fragments of the requested buildings are read in one pass in the order of the file, using the EGID
+        index of the file (see `CityGmlIndex`), and only if the buildings are not in the building cache.
+
+        Args:
+            city_gml: Path to the CityGML file or ZIP member.
+
+        Returns:
+            The buildings of every feature type in the order of the file.
+        """
+        asset_id = self.asset_ids_by_file.get(city_gml, city_gml)
+        indexes_by_xpath = {}
+        egids_by_range_by_xpath = {}
+        for egid_xpath, egids in self.requested_egids_by_xpath.items():
+            city_gml_index = indexes_by_xpath[egid_xpath] = CityGmlIndex.open(city_gml, egid_xpath)
+            egids_by_range_by_xpath[egid_xpath] = {(start, end): egid for egid in egids
+                                                   for start, end in city_gml_index.ranges_by_egid.get(egid, [])}
+        ranges = sorted({building_range for egids_by_range in egids_by_range_by_xpath.values()
+                         for building_range in egids_by_range})
+        logger.debug(f"read {len(ranges)} buildings of {city_gml}")
+
+        city_gml_buildings = CityGmlBuildings()
+        cached_by_cache_key = {}
+        created_by_cache_key = {}
+        with ExitStack() as stack:
+            file = None
+            for start, end in ranges:
+                building_gml = None
+                for feature_type_key, feature_type in self.feature_types.items():
+                    egid = egids_by_range_by_xpath[feature_type.egid_xpath].get((start, end))
+                    if egid is None or egid not in self.element_rows_by_egid_by_key[feature_type_key]:
+                        continue
+                    logger.debug(f"process building {egid} of {feature_type_key}")
+                    city_gml_index = indexes_by_xpath[feature_type.egid_xpath]
+
+                    cache_key = None
+                    if self.building_cache.enabled:
+                        cache_key = BuildingCache.create_key(egid, asset_id, feature_type)
+                        if cache_key not in cached_by_cache_key:
+                            building_count = len(city_gml_index.ranges_by_egid[egid])
+                            cached_by_cache_key[cache_key] = self.get_cached(cache_key, building_count)
+                        cached = cached_by_cache_key[cache_key]
+                        if cached is not None:
+                            city_gml_buildings.add(feature_type_key, egid, *next(cached))
+                            continue
+
+                    # the byte ranges of the building elements are the same in the indexes of all EGID expressions
+                    if building_gml is None:
+                        if file is None:
+                            file = stack.enter_context(AssetFile.open(city_gml))
+                        building_gml = city_gml_index.read_building(file, start, end)
+                    rings = []
+                    layout = self.to_layout(self.read_values(building_gml, feature_type),
+                                            self.read_geometries(building_gml, feature_type, self.CACHE_ORIGIN), rings)
+                    city_gml_buildings.add(feature_type_key, egid, layout, rings)
+                    if cache_key is not None:
+                        layouts, cache_rings = created_by_cache_key.setdefault(cache_key, ([], []))
+                        layouts.append(layout)
+                        cache_rings.extend(rings)
+                    logger.debug(f"finished processing building")
+
+        for cache_key, (layouts, rings) in created_by_cache_key.items():
+            self.building_cache.add(cache_key, layouts, rings)
+        if cached_by_cache_key:
+            logger.debug(f"reused {sum(cached is not None for cached in cached_by_cache_key.values())} of "
+                         f"{len(cached_by_cache_key)} cached buildings of {city_gml}")
+        city_gml_buildings.pack()
+        return city_gml_buildings
+
+    def create_buildings(self, city_gml_buildings: CityGmlBuildings) -> dict[str, list[Building]]:
+        """
+        Create the buildings read from a CityGML file (see `read`), applying the project origin and the SQL values.
+
+        Args:
+            city_gml_buildings: The buildings of the file in compact form.
+
+        Returns:
+            The buildings by feature type key in the order of the file.
+        """
+        buildings_by_key = {}
+        for feature_type_key, buildings in city_gml_buildings.buildings_by_key.items():
+            feature_type = self.feature_types[feature_type_key]
+            element_rows_by_egid = self.element_rows_by_egid_by_key[feature_type_key]
+            rings = iter(city_gml_buildings.get_rings(feature_type_key))
+            buildings_by_key[feature_type_key] = [
+                self.create_building(*self.from_layout(layout, rings, feature_type), feature_type,
+                                     element_rows_by_egid[egid]) for egid, layout in buildings]
+        return buildings_by_key
+
+    def get_cached(self, cache_key: str, building_count: int) -> \
+            Iterator[tuple[dict[str, Any], list[np.ndarray]]] | None:
+        """
+        Return the cached buildings of an EGID, or None if they are not cached.
+
+        Args:
+            cache_key: The cache key of the EGID.
+            building_count: The number of buildings of the EGID in the CityGML file.
+
+        Returns:
+            Iterator over the layouts and the ring coordinates of the buildings in the order of the file.
+        """
+        cached = self.building_cache.get(cache_key)
+        if cached is None:
+            return None
+        layouts, rings = cached
+        if len(layouts) != building_count:
+            logger.warning(f"building cache entry {cache_key} has {len(layouts)} instead of {building_count} "
+                           f"buildings, ignoring it")
+            return None
+        buildings = []
+        ring_start = 0
+        for layout in layouts:
+            ring_end = ring_start + self.count_rings(layout["geometries"])
+            buildings.append((layout, rings[ring_start:ring_end]))
+            ring_start = ring_end
+        return iter(buildings)
+
+    def read_values(self, building_gml: XmlElement, building_config: BuildingFeatureType) -> dict[str, str | None]:
+        """Return the values of all CITY_GML sources of a feature type by expression."""
+        sources = [mapping.source for mapping in (building_config.entity_mapping.attributes +
+                                                  building_config.entity_mapping.properties +
+                                                  building_config.spatial_structure_mapping.attributes +
+                                                  building_config.spatial_structure_mapping.properties)]
+        sources += building_config.group_mapping
+        return {source.expression: find_text(building_gml, source.expression) for source in sources
+                if source.type == BuildingSource.CITY_GML}
+
+    def read_geometries(self, building_gml: XmlElement, building_config: BuildingFeatureType,
+                        project_origin: Point) -> list[list[GmlGeometryModel]]:
+        """Return the geometries of every building part configuration of a feature type."""
+        geometries = []
+        for building_part_config in building_config.entity_mapping.building_parts:
+            geometry_mapping = building_part_config.geometry_mapping
+            part_geometries = []
+            for geometry_gml in compile_xpath(geometry_mapping.xpath)(building_gml):
+                geometry = self.create_geometry(geometry_mapping.geometry)
+                geometry.from_gml(geometry_gml, project_origin)
+                part_geometries.append(geometry)
+            geometries.append(part_geometries)
+        return geometries
+
+    @staticmethod
+    def create_geometry(gml_geometry: GmlGeometry) -> GmlGeometryModel:
+        if gml_geometry == GmlGeometry.SOLID:
+            return Solid()
+        elif gml_geometry == GmlGeometry.COMPOSITE_SOLID:
+            return CompositeSolid()
+        elif gml_geometry == GmlGeometry.MULTI_SURFACE:
+            return MultiSurface()
+        raise NotImplementedError(f"building step for gml geometry type {gml_geometry} not implemented")
+
+    @staticmethod
+    def count_rings(layout: Any) -> int:
+        """Return the number of rings of a geometry layout, whose leaves are the ring counts of the polygons."""
+        if isinstance(layout, int):
+            return layout
+        return sum(CityGmlReader.count_rings(item) for item in layout)
+
+    def to_layout(self, values: dict[str, str | None], geometries: list[list[GmlGeometryModel]],
+                  rings: list[np.ndarray]) -> dict[str, Any]:
+        """Return the cache layout of a building and append its ring coordinates to rings."""
+        return {"values": values,
+                "geometries": [[geometry.to_layout(rings) for geometry in part_geometries]
+                               for part_geometries in geometries]}
+
+    def from_layout(self, layout: dict[str, Any], rings: Iterator[np.ndarray],
+                    building_config: BuildingFeatureType) -> tuple[dict[str, str | None], list[list[GmlGeometryModel]]]:
+        """Return the values and geometries of a building from its cache layout, shifted by the project origin."""
+        geometries = []
+        for building_part_config, part_layouts in zip(building_config.entity_mapping.building_parts,
+                                                      layout["geometries"]):
+            part_geometries = []
+            for geometry_layout in part_layouts:
+                geometry = self.create_geometry(building_part_config.geometry_mapping.geometry)
+                geometry.from_layout(geometry_layout, rings, self.project_origin)
+                part_geometries.append(geometry)
+            geometries.append(part_geometries)
+        return layout["values"], geometries
+
+    def create_building(self, values: dict[str, str | None], geometries: list[list[GmlGeometryModel]],
+                        building_config: BuildingFeatureType, element_row: dict[str, Any]) -> Building:
+        building = Building()
+        self.add_attributes(building, building_config.entity_mapping.attributes, values, element_row)
+        self.add_properties(building, building_config.entity_mapping.properties, values, element_row)
+        self.add_groups(building, building_config, values, element_row)
+        for building_part_config, part_geometries in zip(building_config.entity_mapping.building_parts, geometries):
+            for geometry in part_geometries:
+                building_part = BuildingPart(building_part_config.entity, geometry, building_part_config.color)
+                building.add_building_part(building_part)
+
+        spatial_structure = Element()
+        self.add_attributes(spatial_structure, building_config.spatial_structure_mapping.attributes, values,
+                            element_row)
+        self.add_properties(spatial_structure, building_config.spatial_structure_mapping.properties, values,
+                            element_row)
+        building.spatial_structure = spatial_structure
+        return building
+
+    def add_attributes(self, element: Element, attributes: list[BuildingAttributeConfig],
+                       values: dict[str, str | None], element_row: dict[str, Any]):
+        for attribute in attributes:
+            if attribute.source.type == BuildingSource.CITY_GML:
+                value = values.get(attribute.source.expression)
+                if value is not None:
+                    element.add_attribute(attribute.attribute, value)
+            elif attribute.source.type == BuildingSource.SQL:
+                if attribute.source.expression in element_row:
+                    element.add_attribute(attribute.attribute, element_row[attribute.source.expression])
+            elif attribute.source.type == BuildingSource.STATIC:
+                element.add_attribute(attribute.attribute, attribute.source.expression)
+
+    def add_properties(self, element: Element, properties: list[BuildingPropertyConfig],
+                       values: dict[str, str | None], element_row: dict[str, Any]):
+        for p in properties:
+            if p.source.type == BuildingSource.CITY_GML:
+                value = values.get(p.source.expression)
+                if value is not None:
+                    element.add_property(p.property_set, p.property, value)
+            elif p.source.type == BuildingSource.SQL:
+                if p.source.expression in element_row:
+                    element.add_property(p.property_set, p.property, element_row[p.source.expression])
+            elif p.source.type == BuildingSource.STATIC:
+                element.add_property(p.property_set, p.property, p.source.expression)
+
+    def add_groups(self, element: Element, building_config: BuildingFeatureType, values: dict[str, str | None],
+                   element_row: dict[str, Any]):
+        for group_mapping in building_config.group_mapping:
+            if group_mapping.type == BuildingSource.CITY_GML:
+                value = values.get(group_mapping.expression)
+                if value is not None:
+                    element.add_group(value)
+            elif group_mapping.type == BuildingSource.SQL:
+                if group_mapping.expression in element_row:
+                    element.add_group(element_row[group_mapping.expression])
+            elif group_mapping.type == BuildingSource.STATIC:
+                element.add_group(group_mapping.expression)
@@ -8,6 +8,7 @@ from shapely import wkt, Point
 from shapely.geometry import box
 from shapely.geometry.base import BaseGeometry
 
+from core.tin import kernels
 from core.tin.area import Area
 from core.tin.raster_points import RasterPoints
 
@@ -15,6 +16,7 @@ logger = logging.getLogger(__name__)
 
 
 class ProjectionData:
+    WELD_TOLERANCE = 1e-6  # meters
 
     def __init__(self, element_row: dict[str, Any], project_origin: Point):
         self.element_row = element_row
@@ -37,29 +39,46 @@ class ProjectionData:
         for area in self.areas:
             area.add_raster_points(raster_points)
 
-    def create_mesh_data(self):
-        points_total = []
-        point_to_index = {}
-        indices_total = []
+    def create_mesh_data(self, area_meshes: list[tuple[np.ndarray, np.ndarray]] | None = None) -> tuple[
+        np.ndarray, np.ndarray]:
+        """
+        Merge the meshes of all areas into one mesh relative to the project origin.
 
-        for area in self.areas:
-            points, faces = area.create_mesh()
+        Vertices of different areas closer than the weld tolerance (quantized to a grid of WELD_TOLERANCE) are welded
+        into one vertex. The vertices are ordered by their first use in the faces.
+
+        Args:
+            area_meshes: Precomputed meshes of the areas, created if not given.
+
+        Returns:
+            The vertices as an array of shape (N, 3) and the faces as an array of shape (M, 3).
+        """
+        if area_meshes is None:
+            area_meshes = [area.create_mesh() for area in self.areas]
+
+        points_list = []
+        faces_list = []
+        offset = 0
+        for area, (points, faces) in zip(self.areas, area_meshes):
             if len(points) == 0 or len(faces) == 0:
                 logger.debug("No points or faces found for area %s", area.polygon)
                 continue
-            points = points - np.array([self.project_origin.x, self.project_origin.y, self.project_origin.z])
-
-            for face in faces:
-                new_face = []
-                for local_idx in face:
-                    p = tuple(points[local_idx])
-                    if p not in point_to_index:
-                        point_to_index[p] = len(points_total)
-                        points_total.append(p)
-                    new_face.append(point_to_index[p])
-                indices_total.append(tuple(new_face))
-
-        return points_total, indices_total
+            points_list.append(np.asarray(points, dtype=np.float64))
+            faces_list.append(np.asarray(faces, dtype=np.int64) + offset)
+            offset += len(points)
+
+        if not faces_list:
+            return np.empty((0, 3)), np.empty((0, 3), dtype=np.int64)
+
+        points = np.vstack(points_list) - np.array([self.project_origin.x, self.project_origin.y,
+                                                    self.project_origin.z])
+        corner_indices = np.vstack(faces_list).ravel()
+        keys = np.round(points[corner_indices] / self.WELD_TOLERANCE).astype(np.int64)
+        first_corners, inverse = kernels.weld(keys)
+
+        welded_points = np.ascontiguousarray(points[corner_indices[first_corners]])
+        welded_faces = np.ascontiguousarray(inverse.reshape(-1, 3))
+        return welded_points, welded_faces
 
     def cut_polygon_if_large(self, poly: shapely.Polygon, max_size_m: int = 1000) -> list[BaseGeometry]:
         minx, miny, maxx, maxy = poly.bounds
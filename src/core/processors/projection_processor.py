@@ -1,6 +1,8 @@
 import logging
 from typing import Any
 
+import numpy as np
+import shapely
 from shapely import Point
 
 
@@ -9,9 +11,13 @@ from config.projection_source import ProjectionSource
 from core.ifc.model.element import Element
 from core.ifc.model.projection.projection import Projection
 from core.processors.projection_data import ProjectionData
+from core.tin.area import Area
+from core.tin.partition import Partition
+from core.tin.mesh_worker import create_meshes, create_partition_meshes
 from core.tin.raster_points import RasterPoints
 from service.postgis_service import PostgisService
 from service.bounding_box import BoundingBox
+from service.mesh_cache import MeshCache
 from service.stac_service import STACService
 
 logger = logging.getLogger(__name__)
@@ -22,6 +28,7 @@ class ProjectionProcessor:
     def __init__(self):
         self.postgis_service = PostgisService()
         self.stac_service = STACService()
+        self.mesh_cache = MeshCache(config.tin.mesh_cache_size_mb)
 
     def process(self, polygon: str, project_origin: Point) -> dict[str, list[Projection]]:
         feature_types_by_key = {p.name: p for p in config.ifc.projection_feature_types}
@@ -51,11 +58,9 @@ class ProjectionProcessor:
         dtm_files = self.stac_service.fetch_dtm_assets(bounding_box, config.tin.grid_size.value)
         logger.info(f"fetched {len(dtm_files)} dtm files")
 
-        projections_by_key = {}
-        for feature_type_key, feature_type in feature_types_by_key.items():
-            logger.info(f"create {feature_type_key} feature type")
+        projection_data_by_key = {}
+        for feature_type_key in feature_types_by_key:
             sql_result = sql_results_by_feature_type[feature_type_key]
-
             projection_data = []
             for element_row in sql_result:
                 try:
@@ -63,28 +68,109 @@ class ProjectionProcessor:
                     projection_data.append(projection_element_data)
                 except Exception as e:
                     logger.error(f"error in element data: {e}. Skipping element...")
+            projection_data_by_key[feature_type_key] = projection_data
+
+        areas = []
+        partitions_by_group = {}
+        for feature_type_key, projection_data in projection_data_by_key.items():
+            partition_group = feature_types_by_key[feature_type_key].partition_group
+            for projection_element_data in projection_data:
+                for area in projection_element_data.areas:
+                    if partition_group is not None:
+                        partitions_by_group.setdefault(partition_group, []).append(len(areas))
+                    areas.append(area)
+
+        envelopes = [shapely.box(*area.get_envelope()) for area in areas]
+        region = shapely.union_all(envelopes) if envelopes else None
+        area_tree = shapely.STRtree(envelopes)
+        for dtm_file in dtm_files:
+            logger.info(f"load and process dtm file: {dtm_file}")
+            dtm_points = RasterPoints(dtm_file, region)
+            if dtm_points.bounds is None:
+                continue
+            area_indices = np.sort(area_tree.query(shapely.box(*dtm_points.bounds)))
+            logger.debug(f"calculate raster points for {len(area_indices)} areas")
+            for index in area_indices:
+                areas[index].add_raster_points(dtm_points)
+        logger.info(f"finished processing dtm files")
+
+        logger.info("create meshes")
+        meshes = iter(self.create_meshes(areas, list(partitions_by_group.values())))
+        logger.info("finished creating meshes")
 
-            for dtm_file in dtm_files:
-                logger.info(f"load and process dtm file: {dtm_file}")
-                dtm_points = RasterPoints(dtm_file)
-                for index, projection_element_data in enumerate(projection_data):
-                    logger.debug(f"calculate raster points for element {index + 1}/{len(sql_result)}")
-                    projection_element_data.add_raster_points(dtm_points)
-            logger.info(f"finished processing dtm files")
+        projections_by_key = {}
+        for feature_type_key, feature_type in feature_types_by_key.items():
+            logger.info(f"create {feature_type_key} feature type")
+            projection_data = projection_data_by_key[feature_type_key]
 
-            logger.info(f"create meshes for {feature_type_key} elements")
             for index, projection_element_data in enumerate(projection_data):
-                logger.debug(f"create mesh for element {index + 1}/{len(sql_result)}")
-                projection = self.create_projection(feature_type, projection_element_data)
+                logger.debug(f"create projection for element {index + 1}/{len(projection_data)}")
+                area_meshes = [next(meshes) for _ in projection_element_data.areas]
+                projection = self.create_projection(feature_type, projection_element_data, area_meshes)
 
                 if feature_type_key not in projections_by_key:
                     projections_by_key[feature_type_key] = []
                 projections_by_key[feature_type_key].append(projection)
-            logger.info("finished creating meshes")
         return projections_by_key
 
-    def create_projection(self, feature_type: ProjectionFeatureType, projection_data: ProjectionData) -> Projection:
-        projection = Projection(projection_data.create_mesh_data())
+    def create_meshes(self, areas: list[Area], partitions: list[list[int]]) -> list[tuple[np.ndarray, np.ndarray]]:
+        """
+        Create the meshes of areas, meshing the areas of a partition together.
+
+        Args:
+            areas: The areas with their raster points.
+            partitions: The indices of the areas of every partition. The other areas are meshed on their own.
+
+        Returns:
+            The vertices and faces of the mesh of every area in the order of the areas.
+        """
+        meshes = [None] * len(areas)
+        partitioned = {index for partition in partitions for index in partition}
+        single_indices = [index for index in range(len(areas)) if index not in partitioned]
+        for index, mesh in zip(single_indices, self.create_area_meshes([areas[index] for index in single_indices])):
+            meshes[index] = mesh
+
+        if partitions:
+            logger.info(f"create {len(partitions)} partition meshes of {len(partitioned)} areas")
+            partition_inputs = [Partition([areas[index] for index in partition]).to_mesh_input()
+                                for partition in partitions]
+            partition_meshes = create_partition_meshes(partition_inputs, config.processing.workers)
+            for partition, area_meshes in zip(partitions, partition_meshes):
+                for index, mesh in zip(partition, area_meshes):
+                    meshes[index] = mesh
+        return meshes
+
+    def create_area_meshes(self, areas: list[Area]) -> list[tuple[np.ndarray, np.ndarray]]:
+        """
+        Create the meshes of areas, reusing the meshes from the mesh cache.
+
+        Args:
+            areas: The areas with their raster points.
+
+        Returns:
+            The vertices and faces of the mesh of every area in the order of the areas.
+        """
+        if not self.mesh_cache.enabled:
+            return create_meshes([area.to_mesh_input() for area in areas], config.processing.workers)
+
+        triangulator = type(Area.triangulator).__name__
+        keys = [MeshCache.create_key(area.polygon, triangulator, [self.stac_service.asset_ids_by_file.get(f, f)
+                                                                   for f in area.dtm_files]) for area in areas]
+        meshes = [self.mesh_cache.get(key) for key in keys]
+        missing = [index for index, mesh in enumerate(meshes) if mesh is None]
+        logger.info(f"reuse {len(areas) - len(missing)} of {len(areas)} meshes from the mesh cache")
+
+        created_meshes = create_meshes([areas[index].to_mesh_input() for index in missing], config.processing.workers)
+        for index, mesh in zip(missing, created_meshes):
+            meshes[index] = mesh
+            self.mesh_cache.add(keys[index], *mesh)
+        if missing:
+            self.mesh_cache.evict()
+        return meshes
+
+    def create_projection(self, feature_type: ProjectionFeatureType, projection_data: ProjectionData,
+                          area_meshes: list[tuple[np.ndarray, np.ndarray]] | None = None) -> Projection:
+        projection = Projection(projection_data.create_mesh_data(area_meshes))
         self.add_attributes(projection, feature_type.entity_mapping.attributes, projection_data.element_row)
         self.add_properties(projection, feature_type.entity_mapping.properties, projection_data.element_row)
         self.add_groups(projection, feature_type, projection_data.element_row)
@@ -0,0 +1,263 @@
+import logging
+from typing import Callable
+
+import numpy as np
+from shapely.geometry.polygon import LinearRing, Polygon
+
+from core.tin.grid import Grid
+from core.tin.triangulator import Triangulator
+
+logger = logging.getLogger(__name__)
+
+
+class AdaptiveTin:
+    """
+    Error-bounded TIN generation by greedy insertion of raster points.
+
+    The triangulation starts with the densified rings of the area only. In every iteration the raster point with the
+    largest vertical error is selected per triangle, all selected points exceeding the maximum height error are
+    inserted, and the area is triangulated again by the configured triangulator. Triangles which are unchanged since
+    the previous iteration keep their largest error, only the raster points of the new triangles are located (by
+    scan conversion on the raster lattice) and checked again. The refinement ends when the height of every raster
+    point within the area deviates at most by the maximum height error from the TIN, so the mesh size scales with the
+    terrain complexity instead of the number of raster points.
+
+    Inserted points are vertices of the TIN and are not checked again, their height is the raster height. A point
+    dropped by the triangulator (e.g. merged with a close vertex) is not inserted again, so the refinement also ends
+    if the remaining errors can not be reduced. Raster points outside the triangulation (e.g. of triangles removed by
+    the clipping pass of the triangulator) can not be checked. Both are verified by a final pass over all raster
+    points, which logs a warning if the error bound is not met.
+    """
+
+    def __init__(self, triangulator: Triangulator, grid: Grid, max_height_error: float):
+        self.triangulator = triangulator
+        self.grid = grid
+        self.max_height_error = max_height_error
+
+    def triangulate(self, polygon: Polygon, exterior: LinearRing, interiors: list[LinearRing],
+                    raster_points_within: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Create the TIN of an area.
+
+        Args:
+            polygon: The polygon of the area.
+            exterior: The densified exterior ring.
+            interiors: The densified interior rings.
+            raster_points_within: Array of shape (N, 3) with the raster points within the polygon.
+
+        Returns:
+            The 2D vertices as an array of shape (N, 2) and the faces as an array of shape (M, 3).
+        """
+        return self.refine(lambda points: self.triangulator.triangulate(polygon, exterior, interiors, points),
+                           raster_points_within)
+
+    def refine(self, triangulate: Callable[[np.ndarray], tuple[np.ndarray, np.ndarray]],
+               raster_points_within: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Insert raster points until the maximum height error is met.
+
+        Args:
+            triangulate: Function triangulating the fixed vertices (e.g. the densified rings) together with the
+                inserted points given as array of shape (N, 2).
+            raster_points_within: Array of shape (N, 3) with the raster points to meet the error bound at.
+
+        Returns:
+            The 2D vertices as an array of shape (N, 2) and the faces as an array of shape (M, 3).
+        """
+        candidates = np.reshape(raster_points_within, (-1, 3))
+        point_grid = self.create_point_grid(candidates)
+        inserted = np.zeros(len(candidates), dtype=bool)
+        vertices = np.empty((0, 2))
+        faces = np.empty((0, 3), dtype=np.int64)
+        max_errors = np.empty(0)
+        max_error_points = np.empty(0, dtype=np.int64)
+        iterations = 0
+        while True:
+            iterations += 1
+            new_vertices, new_faces = triangulate(candidates[inserted, :2])
+            previous_faces = self.match_faces(vertices, faces, new_vertices, new_faces)
+            vertices, faces = new_vertices, new_faces
+            heights, _ = self.grid.get_heights_for_vertices(vertices)
+
+            unchanged = previous_faces >= 0
+            new_max_errors = np.full(len(faces), -np.inf)
+            new_max_error_points = np.full(len(faces), -1, dtype=np.int64)
+            new_max_errors[unchanged] = max_errors[previous_faces[unchanged]]
+            new_max_error_points[unchanged] = max_error_points[previous_faces[unchanged]]
+            max_errors, max_error_points = new_max_errors, new_max_error_points
+
+            # inserted points are vertices of the tin
+            point_indices, face_indices = self.locate_points(vertices, faces[~unchanged], point_grid)
+            face_indices = np.flatnonzero(~unchanged)[face_indices]
+            checked = ~inserted[point_indices]
+            point_indices, face_indices = point_indices[checked], face_indices[checked]
+            errors = self.get_errors(vertices, faces, heights, face_indices, candidates[point_indices])
+            self.set_max_errors(max_errors, max_error_points, face_indices, point_indices, errors)
+
+            # points dropped by the triangulator (e.g. merged with a close vertex) are not inserted again
+            selected = max_error_points[max_errors > self.max_height_error]
+            selected = selected[~inserted[selected]]
+            if len(selected) == 0:
+                break
+            inserted[selected] = True
+
+        logger.debug(f"adaptive tin with {len(faces)} triangles from {np.count_nonzero(inserted)} of "
+                     f"{len(candidates)} raster points after {iterations} iterations")
+        self.check(vertices, faces, candidates, point_grid)
+        return vertices, faces
+
+    def create_point_grid(self, candidates: np.ndarray) -> np.ndarray:
+        """
+        Return the index of the raster point at every node of the grid (-1 for nodes without raster point).
+
+        Args:
+            candidates: Array of shape (N, 3) with the raster points, which lie on the nodes of the grid.
+
+        Returns:
+            The indices as array of shape (rows, columns) of the grid.
+        """
+        columns = np.rint((candidates[:, 0] - self.grid.min_x) / self.grid.spacing).astype(np.int64)
+        rows = np.rint((candidates[:, 1] - self.grid.min_y) / self.grid.spacing).astype(np.int64)
+        within = (columns >= 0) & (columns < self.grid.nx) & (rows >= 0) & (rows < self.grid.ny)
+        point_grid = np.full((self.grid.ny, self.grid.nx), -1, dtype=np.int64)
+        point_grid[rows[within], columns[within]] = np.flatnonzero(within)
+        return point_grid
+
+    def locate_points(self, vertices: np.ndarray, faces: np.ndarray, point_grid: np.ndarray) -> \
+            tuple[np.ndarray, np.ndarray]:
+        """
+        Find the raster points within triangles by scan conversion on the grid.
+
+        Every triangle is intersected with the grid rows it covers and the grid nodes between the intersections are
+        looked up in the point grid, so the cost scales with the area of the triangles. Points on a shared edge are
+        returned for both triangles.
+
+        Args:
+            vertices: The 2D vertices of the triangulation.
+            faces: The triangles to scan as array of shape (M, 3).
+            point_grid: The index of the raster point at every grid node (see `create_point_grid`).
+
+        Returns:
+            The indices of the raster points and the index of the triangle (within `faces`) containing them.
+        """
+        tolerance = Grid.TOLERANCE
+        ny, nx = point_grid.shape
+        u = ((vertices[:, 0] - self.grid.min_x) / self.grid.spacing)[faces]
+        v = ((vertices[:, 1] - self.grid.min_y) / self.grid.spacing)[faces]
+
+        row_start = np.maximum(np.ceil(v.min(axis=1) - tolerance), 0).astype(np.int64)
+        row_end = np.minimum(np.floor(v.max(axis=1) + tolerance), ny - 1).astype(np.int64)
+        face_rows = self.expand(row_end - row_start + 1)
+        rows = row_start[face_rows] + self.offsets(face_rows)
+
+        # the interval of the triangle on every row from the intersections with its edges
+        low = np.full(len(rows), np.inf)
+        high = np.full(len(rows), -np.inf)
+        for start, end in ((0, 1), (1, 2), (2, 0)):
+            u0, v0 = u[face_rows, start], v[face_rows, start]
+            u1, v1 = u[face_rows, end], v[face_rows, end]
+            on_edge = (rows >= np.minimum(v0, v1) - tolerance) & (rows <= np.maximum(v0, v1) + tolerance)
+            dv = v1 - v0
+            horizontal = np.abs(dv) <= tolerance
+            t = np.clip((rows - v0) / np.where(horizontal, 1.0, dv), 0.0, 1.0)
+            x = u0 + t * (u1 - u0)
+            low = np.where(on_edge, np.minimum(low, np.where(horizontal, np.minimum(u0, u1), x)), low)
+            high = np.where(on_edge, np.maximum(high, np.where(horizontal, np.maximum(u0, u1), x)), high)
+
+        column_start = np.maximum(np.ceil(low - tolerance), 0).astype(np.int64)
+        column_end = np.minimum(np.floor(high + tolerance), nx - 1).astype(np.int64)
+        row_cells = self.expand(column_end - column_start + 1)
+        point_indices = point_grid[rows[row_cells], column_start[row_cells] + self.offsets(row_cells)]
+        found = point_indices >= 0
+        return point_indices[found], face_rows[row_cells][found]
+
+    @staticmethod
+    def expand(counts: np.ndarray) -> np.ndarray:
+        """Repeat the index of every element by its count (negative counts are treated as zero)."""
+        return np.repeat(np.arange(len(counts)), np.maximum(counts, 0))
+
+    @staticmethod
+    def offsets(indices: np.ndarray) -> np.ndarray:
+        """Return the position of every element within its run of equal indices (see `expand`)."""
+        if len(indices) == 0:
+            return np.empty(0, dtype=np.int64)
+        starts = np.flatnonzero(np.concatenate([[True], indices[1:] != indices[:-1]]))
+        return np.arange(len(indices)) - np.repeat(starts, np.diff(np.append(starts, len(indices))))
+
+    @staticmethod
+    def match_faces(vertices: np.ndarray, faces: np.ndarray, new_vertices: np.ndarray, new_faces: np.ndarray) -> \
+            np.ndarray:
+        """
+        Return the index of the identical previous triangle for every new triangle, or -1 for changed triangles.
+
+        Triangles are compared by the coordinates of their corners, as triangulators may renumber the vertices.
+        """
+        matches = np.full(len(new_faces), -1, dtype=np.int64)
+        if len(faces) == 0 or len(new_faces) == 0:
+            return matches
+        coordinates = np.vstack([vertices, new_vertices])
+        order = np.lexsort((coordinates[:, 1], coordinates[:, 0]))
+        sorted_coordinates = coordinates[order]
+        is_new_coordinate = np.ones(len(order), dtype=bool)
+        is_new_coordinate[1:] = np.any(sorted_coordinates[1:] != sorted_coordinates[:-1], axis=1)
+        vertex_ids = np.empty(len(order), dtype=np.int64)
+        vertex_ids[order] = np.cumsum(is_new_coordinate)
+        keys = np.vstack([np.sort(vertex_ids[:len(vertices)][faces], axis=1),
+                          np.sort(vertex_ids[len(vertices):][new_faces], axis=1)])
+        if vertex_ids.max() < 1 << 21:
+            # the three vertex ids packed into one integer sort much faster
+            keys = (keys[:, 0] << 42) | (keys[:, 1] << 21) | keys[:, 2]
+            order = np.argsort(keys, kind="stable")
+        else:
+            order = np.lexsort((keys[:, 2], keys[:, 1], keys[:, 0]))
+        # a stable sort keeps the previous triangle before the identical new triangle
+        sorted_keys = keys[order].reshape(len(order), -1)
+        identical = np.all(sorted_keys[1:] == sorted_keys[:-1], axis=1)
+        previous, new = order[:-1][identical], order[1:][identical]
+        pairs = (previous < len(faces)) & (new >= len(faces))
+        matches[new[pairs] - len(faces)] = previous[pairs]
+        return matches
+
+    @staticmethod
+    def get_errors(vertices: np.ndarray, faces: np.ndarray, heights: np.ndarray, face_indices: np.ndarray,
+                   points: np.ndarray) -> np.ndarray:
+        """Return the vertical errors of raster points (array of shape (N, 3)) to the triangles containing them."""
+        corners = vertices[faces[face_indices]]
+        corner_heights = heights[faces[face_indices]]
+        tin_heights = Grid.interpolate_vectorized(
+            points[:, 0], points[:, 1],
+            corners[:, 0, 0], corners[:, 0, 1], corner_heights[:, 0],
+            corners[:, 1, 0], corners[:, 1, 1], corner_heights[:, 1],
+            corners[:, 2, 0], corners[:, 2, 1], corner_heights[:, 2])
+        errors = np.abs(points[:, 2] - tin_heights)
+        # vertices without height (outside the grid) must not hide the errors of their triangles
+        errors[np.isnan(errors)] = np.inf
+        return errors
+
+    @staticmethod
+    def set_max_errors(max_errors: np.ndarray, max_error_points: np.ndarray, face_indices: np.ndarray,
+                       point_indices: np.ndarray, errors: np.ndarray):
+        """Set the largest error and its raster point of the triangles containing the points."""
+        if len(errors) == 0:
+            return
+        # the first point per triangle after sorting by triangle and descending error
+        order = np.lexsort((-errors, face_indices))
+        face_indices = face_indices[order]
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = face_indices[1:] != face_indices[:-1]
+        max_errors[face_indices[first]] = errors[order][first]
+        max_error_points[face_indices[first]] = point_indices[order][first]
+
+    def check(self, vertices: np.ndarray, faces: np.ndarray, candidates: np.ndarray, point_grid: np.ndarray):
+        """Verify the error bound at all raster points and log a warning for points outside the TIN or the bound."""
+        heights, _ = self.grid.get_heights_for_vertices(vertices)
+        point_indices, face_indices = self.locate_points(vertices, faces, point_grid)
+        errors = self.get_errors(vertices, faces, heights, face_indices, candidates[point_indices])
+        outside = len(candidates) - len(np.unique(point_indices))
+        if outside > 0:
+            logger.warning(f"{outside} of {len(candidates)} raster points outside the adaptive tin, the height error "
+                           f"is not bounded at them")
+        if len(errors) > 0 and np.max(errors) > self.max_height_error + Grid.TOLERANCE:
+            exceeding = len(np.unique(point_indices[errors > self.max_height_error + Grid.TOLERANCE]))
+            logger.warning(f"{exceeding} raster points exceed the maximum height error of the adaptive tin, "
+                           f"largest error {np.max(errors)}")
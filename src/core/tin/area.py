@@ -1,15 +1,19 @@
 import logging
+from functools import cached_property
+
 import numpy as np
 import pyvista as pv
 import shapely
-from shapely import Point, MultiPoint
 from shapely.geometry.base import BaseGeometry
-from shapely.geometry.polygon import LinearRing, Polygon
+from shapely.geometry.polygon import LinearRing
 from shapely.ops import orient
 
 from config.configuration import config
+from config.mesh_strategy import MeshStrategy
+from core.tin.adaptive_tin import AdaptiveTin
 from core.tin.grid import Grid
 from core.tin.raster_points import RasterPoints
+from core.tin.triangulator import Triangulator, create_triangulator
 
 logger = logging.getLogger(__name__)
 
@@ -17,97 +21,114 @@ logger = logging.getLogger(__name__)
 class Area:
     """Class representing a polygonal area including holes if present."""
 
+    triangulator: Triangulator = create_triangulator(config.tin.triangulation_backend)
+    INNER_DISTANCE = 0.001  # raster points closer to the boundary are not used as vertices
+
     def __init__(self, polygon: BaseGeometry):
         if not isinstance(polygon, shapely.Polygon):
             raise ValueError(f"{type(polygon).__name__} not supported")
         self.polygon = orient(polygon, sign=1.0)
         self.raster_points_within = []
         self.raster_points_buffer = []
+        self.dtm_files = []
+
+    @staticmethod
+    def get_buffer_distance() -> float:
+        """Return the distance around the polygon in which raster points are collected for the interpolation grid."""
+        return 2 * config.tin.grid_size.value
+
+    def get_envelope(self) -> tuple[float, float, float, float]:
+        """Return the bounds (minx, miny, maxx, maxy) of the polygon expanded by the buffer distance."""
+        minx, miny, maxx, maxy = self.polygon.bounds
+        distance = self.get_buffer_distance()
+        return minx - distance, miny - distance, maxx + distance, maxy + distance
+
+    @cached_property
+    def buffer_polygon(self) -> BaseGeometry:
+        """The prepared polygon buffered by the buffer distance, for collecting the raster points of the grid."""
+        polygon = self.polygon.buffer(self.get_buffer_distance())
+        shapely.prepare(polygon)
+        return polygon
+
+    @cached_property
+    def inner_polygon(self) -> BaseGeometry:
+        """The prepared polygon shrunk by the inner distance, for collecting the raster points within the area."""
+        polygon = self.polygon.buffer(-self.INNER_DISTANCE)
+        shapely.prepare(polygon)
+        return polygon
 
     def add_raster_points(self, raster_points: RasterPoints):
         """Add raster points within and buffered around the polygon area."""
-        rpb = raster_points.within(self.polygon, 2 * config.tin.grid_size.value)
+        rpb = raster_points.within(self.buffer_polygon)
         if rpb is not None:
-            self.raster_points_buffer.extend(rpb)
-        rpw = raster_points.within(self.polygon, -0.001)
+            self.raster_points_buffer.append(rpb)
+            self.dtm_files.append(raster_points.dtm_filepath)
+        rpw = raster_points.within(self.inner_polygon)
         if rpw is not None:
-            self.raster_points_within.extend(rpw)
+            self.raster_points_within.append(rpw)
+
+    def to_mesh_input(self) -> tuple[np.ndarray, list[np.ndarray], np.ndarray, np.ndarray]:
+        """
+        Return the compact array representation of the area used as input for the mesh creation in worker
+        processes: exterior coordinates, interior coordinates, buffered raster points and raster points within.
+        """
+        return (np.asarray(self.polygon.exterior.coords),
+                [np.asarray(interior.coords) for interior in self.polygon.interiors],
+                self.stack_raster_points(self.raster_points_buffer),
+                self.stack_raster_points(self.raster_points_within))
+
+    @classmethod
+    def from_mesh_input(cls, mesh_input: tuple[np.ndarray, list[np.ndarray], np.ndarray, np.ndarray]) -> "Area":
+        """Create an area from its compact array representation (see `to_mesh_input`)."""
+        exterior, interiors, raster_points_buffer, raster_points_within = mesh_input
+        area = cls(shapely.Polygon(exterior, interiors))
+        if len(raster_points_buffer) > 0:
+            area.raster_points_buffer.append(raster_points_buffer)
+        if len(raster_points_within) > 0:
+            area.raster_points_within.append(raster_points_within)
+        return area
+
+    @staticmethod
+    def stack_raster_points(raster_points: list[np.ndarray]) -> np.ndarray:
+        return np.vstack(raster_points) if raster_points else np.empty((0, 3))
 
     def create_mesh(self) -> tuple[np.ndarray, np.ndarray]:
         """Create a triangulated mesh from the polygon and raster points."""
         if not self.raster_points_buffer:
             raise ValueError("No raster points found for area")
 
-        self.raster_points_buffer = np.vstack(self.raster_points_buffer)
-        if self.raster_points_within:
-            self.raster_points_within = np.vstack(self.raster_points_within)
-
-        grid = Grid(self.raster_points_buffer)
+        raster_points_buffer = self.stack_raster_points(self.raster_points_buffer)
+        raster_points_within = self.stack_raster_points(self.raster_points_within)
 
-        exterior = self.densify_linearring_by_raster(self.polygon.exterior, grid)
-        interiors = [self.densify_linearring_by_raster(interior, grid) for interior in
-                     self.polygon.interiors]
-        points_within_2d = [arr[:2] for arr in self.raster_points_within]
+        grid = Grid(raster_points_buffer, config.tin.grid_size.value)
 
-        vertices, faces = self.constrained_delaunay_2d(exterior, interiors, points_within_2d)
+        exterior, *interiors = self.densify_linearrings_by_raster(
+            [self.polygon.exterior] + list(self.polygon.interiors), grid)
+        if config.tin.mesh_strategy == MeshStrategy.ADAPTIVE:
+            adaptive_tin = AdaptiveTin(self.triangulator, grid, config.tin.max_height_error)
+            vertices, faces = adaptive_tin.triangulate(self.polygon, exterior, interiors, raster_points_within)
+        else:
+            vertices, faces = self.constrained_delaunay_2d(exterior, interiors, raster_points_within[:, :2])
 
-        vertices_z = []
-        for vertex in vertices:
-            z = grid.get_height_for_vertex(np.array(vertex[:-1]))
-            vertices_z.append([vertex[0], vertex[1], z])
-        vertices_z = np.array(vertices_z)
+        heights, valid = grid.get_heights_for_vertices(vertices)
+        if not np.all(valid):
+            raise Exception(f"no height for {np.count_nonzero(~valid)} vertices, outside the grid or raster points "
+                            f"missing, e.g. {vertices[np.argmin(valid)][:2]}")
+        vertices_z = np.column_stack([vertices[:, 0], vertices[:, 1], heights])
 
+        if config.tin.mesh_strategy == MeshStrategy.ADAPTIVE:
+            return vertices_z, faces
         return self.decimate(vertices_z, faces)
 
-    def densify_linearring_by_raster(self, linear_ring: LinearRing, grid: Grid) -> LinearRing:
-        """Add intersection points from the grid to the linear ring."""
-        coords = linear_ring.coords
-        points = []
-        for i in range(len(coords) - 1):
-            start, end = Point(coords[i]), Point(coords[i + 1])
-            intersection_points_sorted = grid.get_intersection_points_with_line(start, end)
-            points.append(start)
-            points.extend(intersection_points_sorted)
-
-        deduplicated_list = list({p.coords[0]: p for p in MultiPoint(points).geoms}.values())
-        return LinearRing(deduplicated_list)
+    def densify_linearrings_by_raster(self, linear_rings: list[LinearRing], grid: Grid) -> list[LinearRing]:
+        """Add intersection points from the grid to the linear rings."""
+        densified_rings = grid.densify_rings([np.asarray(linear_ring.coords)[:, :2] for linear_ring in linear_rings])
+        return [LinearRing(ring) for ring in densified_rings]
 
     def constrained_delaunay_2d(self, exterior: LinearRing, interiors: list[LinearRing],
-                                points_within: list[list[float]]):
+                                points_within: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
         """Perform constrained Delaunay triangulation with exterior, interiors, and interior points."""
-        def to_3d(pts: np.ndarray) -> np.ndarray:
-            return np.hstack([pts, np.zeros((pts.shape[0], 1))])
-
-        exterior_points_3d = to_3d(np.array(exterior.coords))
-        interiors_points_3d = [to_3d(np.array(interior.coords)) for interior in interiors]
-        points_within_3d = to_3d(np.array(points_within)) if len(points_within) > 0 else np.empty((0, 3))
-
-        all_points = np.vstack([exterior_points_3d] + interiors_points_3d + [points_within_3d])
-
-        lines = []
-        offset = 0
-        for loop in [exterior_points_3d] + interiors_points_3d:
-            n = len(loop)
-            for i in range(n):
-                lines.append([2, offset + i, offset + ((i + 1) % n)])
-            offset += n
-
-        edge_src = pv.PolyData(all_points[:offset])
-        edge_src.lines = np.hstack(lines)
-
-        mesh = pv.PolyData(all_points).delaunay_2d(edge_source=edge_src, tol=0)
-
-        faces_raw = mesh.faces.reshape(-1, 4)[:, 1:]
-        keep_indices = []
-
-        for i, face_idx in enumerate(faces_raw):
-            tri_coords = mesh.points[face_idx][:, :2]
-            tri_poly = Polygon(tri_coords)
-            if tri_poly.within(self.polygon.buffer(0.01)):
-                keep_indices.append(i)
-
-        final_mesh = mesh.extract_cells(keep_indices).extract_surface()
-        return final_mesh.points, final_mesh.faces.reshape(-1, 4)[:, 1:]
+        return self.triangulator.triangulate(self.polygon, exterior, interiors, points_within)
 
     def decimate(self, vertices: np.ndarray, faces: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
         """Reduce mesh complexity while preserving topology."""
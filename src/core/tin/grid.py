@@ -1,103 +1,163 @@
 import logging
 
 import numpy as np
-from shapely import MultiLineString, LineString, Point
+
+from core.tin import kernels
 
 logger = logging.getLogger(__name__)
 
 
 class Grid:
-    """Grid structure for managing raster points and performing interpolation for areas"""
-
-    def __init__(self, raster_points: np.ndarray):
-        self.raster_points = raster_points
-        self.x_coords = sorted(np.unique(raster_points[:, 0]))
-        self.y_coords = sorted(np.unique(raster_points[:, 1]))
-
-        x_to_idx = {x: i for i, x in enumerate(self.x_coords)}
-        y_to_idx = {y: j for j, y in enumerate(self.y_coords)}
-
-        self.grid = np.full((len(self.y_coords), len(self.x_coords)), -1, dtype=int)
-
-        for pt_idx, pt in enumerate(raster_points):
-            x, y = pt[0], pt[1]
-            i = x_to_idx[x]
-            j = y_to_idx[y]
-            self.grid[j, i] = pt_idx
-
-        min_x = np.min(self.x_coords)
-        min_y = np.min(self.y_coords)
-        max_x = np.max(self.x_coords)
-        max_y = np.max(self.y_coords)
-
-        self.x_grid_lines = MultiLineString([LineString([(x, min_y), (x, max_y)]) for x in self.x_coords])
-        self.y_grid_lines = MultiLineString([LineString([(min_x, y), (max_x, y)]) for y in self.y_coords])
-
-        diagonal_lines = []
-        for i in range(len(self.x_coords) - 1):
-            for j in range(len(self.y_coords) - 1):
-                diag = LineString([(self.x_coords[i], self.y_coords[j + 1]), (self.x_coords[i + 1], self.y_coords[j])])
-                diagonal_lines.append(diag)
-        self.xy_grid_lines = MultiLineString(diagonal_lines)
-
-    def get_intersection_points_with_line(self, start: Point, end: Point):
-        """Returns intersection points between a line and grid lines, sorted by distance from start."""
-        line = LineString([start, end])
-
-        def get_intersection_gridlines(line: LineString, grid_lines: MultiLineString):
-            inter = line.intersection(grid_lines)
-            if inter.geom_type == 'Point':
-                return [inter]
-            elif inter.geom_type == "MultiPoint":
-                return list(inter.geoms)
-            else:
-                return []
-
-        intersection_points = get_intersection_gridlines(line, self.x_grid_lines)
-        intersection_points.extend(get_intersection_gridlines(line, self.y_grid_lines))
-        intersection_points.extend(get_intersection_gridlines(line, self.xy_grid_lines))
-        return sorted(intersection_points, key=lambda p: p.distance(start))
-
-    def get_height_for_vertex(self, vertex: np.ndarray):
-        """Calculates interpolated height for a vertex anywhere on the grid."""
-        i = np.searchsorted(self.x_coords, vertex[0], side='right') - 1
-        j = np.searchsorted(self.y_coords, vertex[1], side='right') - 1
-        if i < 0 or i >= len(self.x_coords) - 1 or j < 0 or j >= len(self.y_coords) - 1:
-            raise Exception(f"vertex {vertex} is outside the grid bounds")
-
-        i00 = self.grid[j, i]
-        i10 = self.grid[j, i + 1]
-        i01 = self.grid[j + 1, i]
-        i11 = self.grid[j + 1, i + 1]
-
-        if i00 == -1 or i10 == -1 or i01 == -1 or i11 == -1:
-            raise Exception(f"raster points missing for vertex {vertex}")
-
-        p00 = self.raster_points[i00]
-        p10 = self.raster_points[i10]
-        p01 = self.raster_points[i01]
-        p11 = self.raster_points[i11]
-
-        dx = self.x_coords[i + 1] - self.x_coords[i]
-        dy = self.y_coords[j + 1] - self.y_coords[j]
-
-        u = (vertex[0] - self.x_coords[i]) / dx
-        v = (vertex[1] - self.y_coords[j]) / dy
-
-        if u + v <= 1:
-            return self.interpolate(vertex, np.array([p00, p10, p01]))
-        else:
-            return self.interpolate(vertex, np.array([p11, p10, p01]))
-
-    def interpolate(self, v: np.ndarray, triangle: np.ndarray):
-        """Performs barycentric interpolation for a 2D point within a 3D triangle."""
-        (x, y) = v
-        (x1, y1, z1), (x2, y2, z2), (x3, y3, z3) = triangle
-
+    """
+    Regular height raster for managing raster points and performing interpolation for areas.
+
+    The raster points of a DTM form a regular lattice, so the heights are stored as a dense 2D array (rows along y,
+    columns along x) defined by an origin and the grid spacing. Cells without a raster point are NaN.
+    """
+
+    TOLERANCE = 1e-6  # in grid units and segment parameters
+
+    def __init__(self, raster_points: np.ndarray, spacing: float):
+        self.spacing = float(spacing)
+        self.min_x = float(np.min(raster_points[:, 0]))
+        self.min_y = float(np.min(raster_points[:, 1]))
+
+        columns = np.rint((raster_points[:, 0] - self.min_x) / self.spacing).astype(np.int64)
+        rows = np.rint((raster_points[:, 1] - self.min_y) / self.spacing).astype(np.int64)
+        self.nx = int(columns.max()) + 1
+        self.ny = int(rows.max()) + 1
+
+        self.heights = np.full((self.ny, self.nx), np.nan)
+        self.heights[rows, columns] = raster_points[:, 2]
+
+        self.x_coords = self.min_x + np.arange(self.nx) * self.spacing
+        self.y_coords = self.min_y + np.arange(self.ny) * self.spacing
+        self.max_x = float(self.x_coords[-1])
+        self.max_y = float(self.y_coords[-1])
+
+    def densify_rings(self, rings: list[np.ndarray]) -> list[np.ndarray]:
+        """
+        Adds the intersection points with the grid lines (x, y and cell diagonals) to closed rings.
+
+        Args:
+            rings: Closed rings as arrays of shape (N, 2) with the first coordinate repeated at the end.
+
+        Returns:
+            The densified rings as arrays of shape (M, 2) without closing coordinate, in the input order.
+        """
+        starts = np.vstack([ring[:-1, :2] for ring in rings])
+        ends = np.vstack([ring[1:, :2] for ring in rings])
+        ring_sizes = np.array([len(ring) - 1 for ring in rings])
+
+        segments, points = self.densify_segments(starts, ends)
+
+        ring_ends = np.cumsum(ring_sizes)
+        split_indices = np.searchsorted(segments, ring_ends[:-1])
+        densified_rings = []
+        for ring_points in np.split(points, split_indices):
+            _, first_indices = np.unique(ring_points, axis=0, return_index=True)
+            densified_rings.append(ring_points[np.sort(first_indices)])
+        return densified_rings
+
+    def densify_segments(self, starts: np.ndarray, ends: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Computes the intersection points of segments with the grid lines (x, y and cell diagonals).
+
+        The intersections are computed analytically from the grid spacing and the segment parameters, vectorized
+        across all segments. Only grid lines within the grid extent are considered.
+
+        Args:
+            starts: The start points of the segments as array of shape (N, 2).
+            ends: The end points of the segments as array of shape (N, 2).
+
+        Returns:
+            The segment index and the point of the start points and the intersections (end points excluded), sorted
+            by segment and by the parameter t along the segment.
+        """
+        u0 = (starts[:, 0] - self.min_x) / self.spacing
+        v0 = (starts[:, 1] - self.min_y) / self.spacing
+        u1 = (ends[:, 0] - self.min_x) / self.spacing
+        v1 = (ends[:, 1] - self.min_y) / self.spacing
+
+        hits = [
+            self.get_line_hits(u0, u1, u0, v0, u1, v1, 0, self.nx - 1),
+            self.get_line_hits(v0, v1, u0, v0, u1, v1, 0, self.ny - 1),
+            self.get_line_hits(u0 + v0, u1 + v1, u0, v0, u1, v1, 1, self.nx + self.ny - 3),
+        ]
+        segments = np.concatenate([np.arange(len(starts))] + [h[0] for h in hits])
+        ts = np.concatenate([np.zeros(len(starts))] + [h[1] for h in hits])
+
+        order = np.lexsort((ts, segments))
+        segments = segments[order]
+        ts = ts[order]
+        keep = np.ones(len(ts), dtype=bool)
+        keep[1:] = (segments[1:] != segments[:-1]) | (ts[1:] - ts[:-1] > self.TOLERANCE)
+        segments = segments[keep]
+        ts = ts[keep]
+
+        points = starts[segments] + ts[:, np.newaxis] * (ends[segments] - starts[segments])
+        is_start = ts == 0
+        points[is_start] = starts[segments[is_start]]
+        return segments, points
+
+    def get_line_hits(self, f0: np.ndarray, f1: np.ndarray, u0: np.ndarray, v0: np.ndarray, u1: np.ndarray,
+                      v1: np.ndarray, min_value: int, max_value: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the crossings of segments with a family of grid lines.
+
+        The grid lines are the lines where the linear function f (in grid units) takes integer values between
+        `min_value` and `max_value`. Crossings outside the grid extent or at the segment end points are dropped.
+
+        Returns:
+            Segment indices and segment parameters t of the crossings.
+        """
+        df = f1 - f0
+        crossing = np.abs(df) > self.TOLERANCE
+        low = np.ceil(np.minimum(f0, f1) - self.TOLERANCE)
+        high = np.floor(np.maximum(f0, f1) + self.TOLERANCE)
+        low = np.maximum(low, min_value)
+        high = np.minimum(high, max_value)
+        counts = np.where(crossing, np.maximum(high - low + 1, 0), 0).astype(np.int64)
+
+        segments = np.repeat(np.arange(len(f0)), counts)
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        values = low[segments] + offsets
+        ts = (values - f0[segments]) / df[segments]
+
+        u = u0[segments] + ts * (u1[segments] - u0[segments])
+        v = v0[segments] + ts * (v1[segments] - v0[segments])
+        valid = ((ts > self.TOLERANCE) & (ts < 1 - self.TOLERANCE) &
+                 (u >= -self.TOLERANCE) & (u <= self.nx - 1 + self.TOLERANCE) &
+                 (v >= -self.TOLERANCE) & (v <= self.ny - 1 + self.TOLERANCE))
+        return segments[valid], ts[valid]
+
+    def get_heights_for_vertices(self, vertices: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Calculates interpolated heights for many vertices in one vectorized pass.
+
+        Every grid cell is split into a lower triangle (u + v <= 1) and an upper triangle, the height is interpolated
+        barycentrically in the triangle containing the vertex. Vertices outside the grid or in cells with missing
+        raster points are reported by the returned mask and get a NaN height. Runs the compiled kernel if numba is
+        installed (see `core.tin.kernels`).
+
+        Args:
+            vertices: Array of shape (N, 2) (further columns are ignored).
+
+        Returns:
+            The heights of shape (N,) and a boolean mask of shape (N,) which is True for valid heights.
+        """
+        x = np.ascontiguousarray(vertices[:, 0], dtype=np.float64)
+        y = np.ascontiguousarray(vertices[:, 1], dtype=np.float64)
+        return kernels.interpolate_grid(self.heights, self.min_x, self.min_y, self.spacing, self.TOLERANCE, x, y)
+
+    @staticmethod
+    def interpolate_vectorized(x: np.ndarray, y: np.ndarray,
+                               x1: np.ndarray, y1: np.ndarray, z1: np.ndarray,
+                               x2: np.ndarray, y2: np.ndarray, z2: np.ndarray,
+                               x3: np.ndarray, y3: np.ndarray, z3: np.ndarray) -> np.ndarray:
+        """Performs barycentric interpolation of 2D points within 3D triangles, given as arrays of coordinates."""
         den = (y2 - y3) * (x1 - x3) + (x3 - x2) * (y1 - y3)
         w1 = ((y2 - y3) * (x - x3) + (x3 - x2) * (y - y3)) / den
         w2 = ((y3 - y1) * (x - x3) + (x1 - x3) * (y - y3)) / den
         w3 = 1 - w1 - w2
-
-        z = w1 * z1 + w2 * z2 + w3 * z3
-        return z
+        return w1 * z1 + w2 * z2 + w3 * z3
@@ -0,0 +1,169 @@
+"""
+Kernels of the TIN hot paths with an optional JIT-compiled fast path.
+
+Every kernel has a vectorized numpy implementation and a loop implementation. If numba is installed the loop
+implementations are compiled and used, they avoid the temporary arrays of the vectorized implementations and compute
+the same results. Otherwise the numpy implementations are used. The kernels are compiled on their first call in
+every process and not cached on disk, the source directory is not writable in the container.
+"""
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+NUMBA_AVAILABLE = numba is not None
+
+
+def interpolate_grid_numpy(heights: np.ndarray, min_x: float, min_y: float, spacing: float, tolerance: float,
+                           x: np.ndarray, y: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Interpolate the heights of points in a regular height raster, vectorized with numpy.
+
+    Every raster cell is split into a lower triangle (u + v <= 1) and an upper triangle, the height is interpolated
+    barycentrically in the triangle containing the point.
+
+    Args:
+        heights: The heights of the raster of shape (ny, nx), NaN for missing raster points.
+        min_x: The x coordinate of the first column.
+        min_y: The y coordinate of the first row.
+        spacing: The raster spacing.
+        tolerance: Tolerance in raster units for points on the raster border.
+        x: The x coordinates of the points.
+        y: The y coordinates of the points.
+
+    Returns:
+        The heights of the points (NaN if invalid) and a boolean mask which is True for valid heights.
+    """
+    ny, nx = heights.shape
+    tx = (x - min_x) / spacing
+    ty = (y - min_y) / spacing
+
+    inside = ((tx >= -tolerance) & (tx <= nx - 1 + tolerance) &
+              (ty >= -tolerance) & (ty <= ny - 1 + tolerance))
+    if nx < 2 or ny < 2:
+        inside[:] = False
+    i = np.clip(np.floor(tx), 0, max(nx - 2, 0)).astype(np.int64)
+    j = np.clip(np.floor(ty), 0, max(ny - 2, 0)).astype(np.int64)
+    i1 = np.minimum(i + 1, nx - 1)
+    j1 = np.minimum(j + 1, ny - 1)
+
+    z00 = heights[j, i]
+    z10 = heights[j, i1]
+    z01 = heights[j1, i]
+    z11 = heights[j1, i1]
+
+    x0 = min_x + i * spacing
+    x1 = min_x + i1 * spacing
+    y0 = min_y + j * spacing
+    y1 = min_y + j1 * spacing
+    u = (x - x0) / spacing
+    v = (y - y0) / spacing
+    lower = u + v <= 1
+
+    # the vertices of the triangle containing the point
+    xa = np.where(lower, x0, x1)
+    ya = np.where(lower, y0, y1)
+    za = np.where(lower, z00, z11)
+    den = (y0 - y1) * (xa - x0) + (x0 - x1) * (ya - y1)
+    w1 = ((y0 - y1) * (x - x0) + (x0 - x1) * (y - y1)) / den
+    w2 = ((y1 - ya) * (x - x0) + (xa - x0) * (y - y1)) / den
+    w3 = 1 - w1 - w2
+    result = w1 * za + w2 * z10 + w3 * z01
+
+    valid = inside & ~(np.isnan(z00) | np.isnan(z10) | np.isnan(z01) | np.isnan(z11))
+    result[~valid] = np.nan
+    return result, valid
+
+
+def interpolate_grid_loop(heights: np.ndarray, min_x: float, min_y: float, spacing: float, tolerance: float,
+                          x: np.ndarray, y: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Loop implementation of `interpolate_grid_numpy`."""
+    ny, nx = heights.shape
+    result = np.full(len(x), np.nan)
+    valid = np.zeros(len(x), dtype=np.bool_)
+    if nx < 2 or ny < 2:
+        return result, valid
+
+    for k in range(len(x)):
+        tx = (x[k] - min_x) / spacing
+        ty = (y[k] - min_y) / spacing
+        if tx < -tolerance or tx > nx - 1 + tolerance or ty < -tolerance or ty > ny - 1 + tolerance:
+            continue
+        i = min(max(int(np.floor(tx)), 0), nx - 2)
+        j = min(max(int(np.floor(ty)), 0), ny - 2)
+
+        z00 = heights[j, i]
+        z10 = heights[j, i + 1]
+        z01 = heights[j + 1, i]
+        z11 = heights[j + 1, i + 1]
+        if np.isnan(z00) or np.isnan(z10) or np.isnan(z01) or np.isnan(z11):
+            continue
+
+        x0 = min_x + i * spacing
+        x1 = min_x + (i + 1) * spacing
+        y0 = min_y + j * spacing
+        y1 = min_y + (j + 1) * spacing
+        u = (x[k] - x0) / spacing
+        v = (y[k] - y0) / spacing
+        if u + v <= 1:
+            xa, ya, za = x0, y0, z00
+        else:
+            xa, ya, za = x1, y1, z11
+
+        den = (y0 - y1) * (xa - x0) + (x0 - x1) * (ya - y1)
+        w1 = ((y0 - y1) * (x[k] - x0) + (x0 - x1) * (y[k] - y1)) / den
+        w2 = ((y1 - ya) * (x[k] - x0) + (xa - x0) * (y[k] - y1)) / den
+        w3 = 1 - w1 - w2
+        result[k] = w1 * za + w2 * z10 + w3 * z01
+        valid[k] = True
+    return result, valid
+
+
+def weld_numpy(keys: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Weld equal rows of integer keys, vectorized with numpy.
+
+    Args:
+        keys: Array of shape (N, 3) with the quantized coordinates.
+
+    Returns:
+        The indices of the first occurrence of every unique key ordered by first occurrence and, for every row, the
+        index of its unique key in this order.
+    """
+    _, first_indices, inverse = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+    order = np.argsort(first_indices)
+    new_indices = np.empty_like(order)
+    new_indices[order] = np.arange(len(order))
+    return first_indices[order], new_indices[inverse.reshape(-1)]
+
+
+def weld_loop(keys: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Loop implementation of `weld_numpy` using a hash map instead of sorting."""
+    indices_by_key = dict()
+    first_indices = np.empty(len(keys), dtype=np.int64)
+    inverse = np.empty(len(keys), dtype=np.int64)
+    count = 0
+    for k in range(len(keys)):
+        key = (keys[k, 0], keys[k, 1], keys[k, 2])
+        if key in indices_by_key:
+            inverse[k] = indices_by_key[key]
+        else:
+            indices_by_key[key] = count
+            first_indices[count] = k
+            inverse[k] = count
+            count += 1
+    return first_indices[:count], inverse
+
+
+if NUMBA_AVAILABLE:
+    interpolate_grid = numba.njit(interpolate_grid_loop)
+    weld = numba.njit(weld_loop)
+else:
+    interpolate_grid = interpolate_grid_numpy
+    weld = weld_numpy
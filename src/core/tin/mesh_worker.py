@@ -0,0 +1,52 @@
+import logging
+
+import numpy as np
+
+from core.parallel import map_inputs
+from core.tin.area import Area
+from core.tin.partition import Partition
+
+logger = logging.getLogger(__name__)
+
+MeshInput = tuple[np.ndarray, list[np.ndarray], np.ndarray, np.ndarray]
+Mesh = tuple[np.ndarray, np.ndarray]
+
+
+def create_mesh(mesh_input: MeshInput) -> Mesh:
+    """Create the mesh of an area given by its compact array representation (see `Area.to_mesh_input`)."""
+    return Area.from_mesh_input(mesh_input).create_mesh()
+
+
+def create_partition_mesh(partition_input: list[MeshInput]) -> list[Mesh]:
+    """Create the meshes of the areas of a partition given by its compact array representation."""
+    return Partition.from_mesh_input(partition_input).create_meshes()
+
+
+def create_meshes(mesh_inputs: list[MeshInput], workers: int) -> list[Mesh]:
+    """
+    Create the meshes of many areas, in parallel if more than one worker is configured.
+
+    Only compact arrays are exchanged with the worker processes. The meshes are returned in the order of the inputs.
+
+    Args:
+        mesh_inputs: The compact array representations of the areas.
+        workers: Number of worker processes. With one worker the meshes are created in the current process.
+
+    Returns:
+        The vertices and faces of the mesh of every area.
+    """
+    return map_inputs(create_mesh, mesh_inputs, workers)
+
+
+def create_partition_meshes(partition_inputs: list[list[MeshInput]], workers: int) -> list[list[Mesh]]:
+    """
+    Create the meshes of many partitions, in parallel if more than one worker is configured.
+
+    Args:
+        partition_inputs: The compact array representations of the partitions.
+        workers: Number of worker processes. With one worker the meshes are created in the current process.
+
+    Returns:
+        The vertices and faces of the mesh of every area per partition.
+    """
+    return map_inputs(create_partition_mesh, partition_inputs, workers)
@@ -0,0 +1,130 @@
+import logging
+
+import numpy as np
+import shapely
+
+from config.configuration import config
+from config.mesh_strategy import MeshStrategy
+from core.tin.adaptive_tin import AdaptiveTin
+from core.tin.area import Area
+from core.tin.grid import Grid
+
+logger = logging.getLogger(__name__)
+
+
+class Partition:
+    """
+    Areas sharing boundaries (e.g. land cover or parcels) meshed together as one planar partition.
+
+    The boundaries of all areas are noded into one planar graph, so every shared edge is densified once. A single
+    constrained triangulation covers all areas and the triangles are assigned back to the areas by their centroid.
+    Neighbouring areas therefore share the vertices along their common boundaries and the terrain has no cracks.
+    """
+
+    def __init__(self, areas: list[Area]):
+        self.areas = areas
+
+    def to_mesh_input(self) -> list[tuple[np.ndarray, list[np.ndarray], np.ndarray, np.ndarray]]:
+        """Return the compact array representation of the partition (see `Area.to_mesh_input`)."""
+        return [area.to_mesh_input() for area in self.areas]
+
+    @classmethod
+    def from_mesh_input(cls, mesh_input: list[tuple[np.ndarray, list[np.ndarray], np.ndarray, np.ndarray]]) -> \
+            "Partition":
+        """Create a partition from its compact array representation (see `to_mesh_input`)."""
+        return cls([Area.from_mesh_input(area_mesh_input) for area_mesh_input in mesh_input])
+
+    def create_meshes(self) -> list[tuple[np.ndarray, np.ndarray]]:
+        """
+        Create the meshes of all areas of the partition.
+
+        Returns:
+            The vertices and faces of the mesh of every area in the order of the areas.
+        """
+        raster_points_buffer = self.stack_unique([Area.stack_raster_points(area.raster_points_buffer)
+                                                  for area in self.areas])
+        raster_points_within = self.stack_unique([Area.stack_raster_points(area.raster_points_within)
+                                                  for area in self.areas])
+        if len(raster_points_buffer) == 0:
+            raise ValueError("No raster points found for partition")
+
+        grid = Grid(raster_points_buffer, config.tin.grid_size.value)
+        graph_vertices, graph_segments = self.create_planar_graph(grid)
+
+        def triangulate(points: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+            return Area.triangulator.triangulate_segments(np.vstack([graph_vertices, points]), graph_segments)
+
+        if config.tin.mesh_strategy == MeshStrategy.ADAPTIVE:
+            adaptive_tin = AdaptiveTin(Area.triangulator, grid, config.tin.max_height_error)
+            vertices, faces = adaptive_tin.refine(triangulate, raster_points_within)
+        else:
+            vertices, faces = triangulate(raster_points_within[:, :2])
+
+        heights, valid = grid.get_heights_for_vertices(vertices)
+
+        meshes = []
+        for area, area_faces in zip(self.areas, self.assign_faces(vertices, faces)):
+            used_vertices, area_faces = np.unique(area_faces, return_inverse=True)
+            if not np.all(valid[used_vertices]):
+                invalid = used_vertices[~valid[used_vertices]]
+                raise Exception(f"no height for {len(invalid)} vertices, outside the grid or raster points "
+                                f"missing, e.g. {vertices[invalid[0]]}")
+            area_vertices = np.column_stack([vertices[used_vertices], heights[used_vertices]])
+            area_faces = area_faces.reshape(-1, 3)
+            if config.tin.mesh_strategy == MeshStrategy.DECIMATE and len(area_faces) > 0:
+                area_vertices, area_faces = area.decimate(area_vertices, area_faces)
+            meshes.append((area_vertices, area_faces))
+        logger.debug(f"created partition of {len(self.areas)} areas with {len(faces)} triangles")
+        return meshes
+
+    def create_planar_graph(self, grid: Grid) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Node the boundaries of all areas and densify every edge once by the grid.
+
+        Args:
+            grid: The height raster of the partition.
+
+        Returns:
+            The unique vertices as array of shape (N, 2) and the segments as array of shape (M, 2) of vertex indices.
+        """
+        boundaries = shapely.union_all([area.polygon.boundary for area in self.areas])
+        coordinates, line_indices = shapely.get_coordinates(shapely.get_parts(boundaries), return_index=True)
+        is_segment = line_indices[1:] == line_indices[:-1]
+        starts = coordinates[:-1][is_segment]
+        ends = coordinates[1:][is_segment]
+
+        segment_indices, points = grid.densify_segments(starts, ends)
+
+        # every point is connected to the next point of its segment, the last one to the end of the segment
+        next_indices = np.arange(1, len(points) + 1)
+        is_last = np.ones(len(points), dtype=bool)
+        is_last[:-1] = segment_indices[1:] != segment_indices[:-1]
+        next_indices[is_last] = len(points) + segment_indices[is_last]
+
+        vertices, inverse = np.unique(np.vstack([points, ends]), axis=0, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        segments = np.column_stack([inverse[:len(points)], inverse[next_indices]])
+        return vertices, segments[segments[:, 0] != segments[:, 1]]
+
+    def assign_faces(self, vertices: np.ndarray, faces: np.ndarray) -> list[np.ndarray]:
+        """
+        Assign the triangles to the areas containing their centroid.
+
+        Triangles outside all areas (gaps in the partition) are dropped. Overlapping areas each get the triangles of
+        the overlap.
+
+        Returns:
+            The faces of every area in the order of the areas.
+        """
+        centroids = shapely.points(vertices[faces].mean(axis=1))
+        tree = shapely.STRtree([area.polygon for area in self.areas])
+        face_indices, area_indices = tree.query(centroids, predicate="within")
+
+        order = np.argsort(area_indices, kind="stable")
+        split_indices = np.searchsorted(area_indices[order], np.arange(1, len(self.areas)))
+        return [faces[indices] for indices in np.split(face_indices[order], split_indices)]
+
+    @staticmethod
+    def stack_unique(raster_points: list[np.ndarray]) -> np.ndarray:
+        """Stack the raster points of several areas and remove the points collected by more than one area."""
+        return np.unique(np.vstack(raster_points), axis=0)
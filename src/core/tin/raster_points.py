@@ -1,39 +1,55 @@
 import numpy as np
 import shapely
-from shapely import Polygon, Point
+from shapely.geometry.base import BaseGeometry
+
+from service.dtm_tile_store import DtmTileStore
 
 
 class RasterPoints(object):
     """Class for handling raster points"""
 
-    def __init__(self, xyz_filepath: str):
-        self.data = np.loadtxt(xyz_filepath, delimiter=" ", skiprows=1)
-        if self.data.ndim == 1:
-            self.data = self.data.reshape((1, -1))
+    def __init__(self, dtm_filepath: str, region: BaseGeometry | None = None):
+        """
+        Args:
+            dtm_filepath: Path to the DTM tile.
+            region: If given, only the points within this region are read, streaming the tile in chunks.
+        """
+        self.dtm_filepath = dtm_filepath
+        if region is None:
+            self.data = DtmTileStore.open(dtm_filepath)
+        else:
+            self.data = DtmTileStore.read_within(dtm_filepath, region)
         self.xy = self.data[:, :2]
-
-    def within(self, polygon: Polygon, buffer_dist: float = 0) -> np.ndarray | None:
+        self.z = self.data[:, 2]
+        self.order = np.argsort(self.xy[:, 0], kind="stable")
+        self.sorted_x = self.xy[self.order, 0]
+        # extent (minx, miny, maxx, maxy) of the points, None if there are no points
+        self.bounds = None
+        if len(self.data) > 0:
+            self.bounds = (float(self.sorted_x[0]), float(np.min(self.xy[:, 1])),
+                           float(self.sorted_x[-1]), float(np.max(self.xy[:, 1])))
+
+    def within(self, geometry: BaseGeometry) -> np.ndarray | None:
         """
-        Return points within (or within buffer of) polygon.
-        First filters by polygon bounding box for speed.
+        Return the points within a (preferably prepared) geometry in the order of the tile.
+        First filters by the geometry's bounding box using the points sorted by x.
         """
-        geom = polygon.buffer(buffer_dist) if buffer_dist > 0 else polygon
+        if geometry.is_empty:
+            return None
 
-        minx, miny, maxx, maxy = geom.bounds
-        in_bbox = (
-                (self.xy[:, 0] >= minx) &
-                (self.xy[:, 0] <= maxx) &
-                (self.xy[:, 1] >= miny) &
-                (self.xy[:, 1] <= maxy)
-        )
+        minx, miny, maxx, maxy = geometry.bounds
+        start = np.searchsorted(self.sorted_x, minx, side="left")
+        end = np.searchsorted(self.sorted_x, maxx, side="right")
+        candidates = self.order[start:end]
+        y = self.xy[candidates, 1]
+        candidates = candidates[(y >= miny) & (y <= maxy)]
 
-        if not np.any(in_bbox):
+        if len(candidates) == 0:
             return None
 
-        candidate_points = shapely.points(self.xy[in_bbox])
-        mask = geom.contains(candidate_points)
+        mask = shapely.contains_xy(geometry, self.xy[candidates, 0], self.xy[candidates, 1])
 
         if np.any(mask):
-            return self.data[in_bbox][mask]
+            return self.data[np.sort(candidates[mask])]
         else:
             return None
@@ -0,0 +1,166 @@
+import logging
+from abc import ABC, abstractmethod
+
+import numpy as np
+import pyvista as pv
+import shapely
+from shapely.geometry.polygon import LinearRing, Polygon
+
+from config.triangulation_backend import TriangulationBackend
+
+logger = logging.getLogger(__name__)
+
+
+class Triangulator(ABC):
+    """
+    Abstract base class for the 2D triangulation of an area.
+    """
+
+    @abstractmethod
+    def triangulate(self, polygon: Polygon, exterior: LinearRing, interiors: list[LinearRing],
+                    points_within: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Perform a constrained Delaunay triangulation with exterior, interiors, and interior points.
+
+        The edges of the exterior and interior rings are part of the triangulation and no triangles are created
+        outside the exterior or inside the interiors.
+
+        Args:
+            polygon: The polygon of the area.
+            exterior: The densified exterior ring.
+            interiors: The densified interior rings.
+            points_within: Array of shape (N, 2) with the points within the polygon.
+
+        Returns:
+            The vertices as an array of shape (N, 2) and the faces as an array of shape (M, 3).
+
+        Raises:
+            NotImplementedError: Must be implemented by subclasses.
+        """
+        raise NotImplementedError("triangulate must be implemented by subclasses")
+
+    @abstractmethod
+    def triangulate_segments(self, vertices: np.ndarray, segments: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Perform a Delaunay triangulation of the convex hull of the vertices constrained by segments.
+
+        Used for planar partitions, where the triangles are assigned to the faces of the partition afterwards.
+
+        Args:
+            vertices: Array of shape (N, 2) with the vertices.
+            segments: Array of shape (M, 2) with the vertex indices of the constraining segments.
+
+        Returns:
+            The vertices as an array of shape (N, 2) and the faces as an array of shape (M, 3).
+
+        Raises:
+            NotImplementedError: Must be implemented by subclasses.
+        """
+        raise NotImplementedError("triangulate_segments must be implemented by subclasses")
+
+
+class PyvistaTriangulator(Triangulator):
+    """Triangulation using the Delaunay triangulation of VTK with a subsequent clipping pass to the polygon."""
+
+    def triangulate(self, polygon: Polygon, exterior: LinearRing, interiors: list[LinearRing],
+                    points_within: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        def to_3d(pts: np.ndarray) -> np.ndarray:
+            return np.hstack([pts, np.zeros((pts.shape[0], 1))])
+
+        exterior_points_3d = to_3d(np.array(exterior.coords))
+        interiors_points_3d = [to_3d(np.array(interior.coords)) for interior in interiors]
+        points_within_3d = to_3d(points_within) if len(points_within) > 0 else np.empty((0, 3))
+
+        all_points = np.vstack([exterior_points_3d] + interiors_points_3d + [points_within_3d])
+
+        lines = []
+        offset = 0
+        for loop in [exterior_points_3d] + interiors_points_3d:
+            n = len(loop)
+            for i in range(n):
+                lines.append([2, offset + i, offset + ((i + 1) % n)])
+            offset += n
+
+        edge_src = pv.PolyData(all_points[:offset])
+        edge_src.lines = np.hstack(lines)
+
+        mesh = pv.PolyData(all_points).delaunay_2d(edge_source=edge_src, tol=0)
+
+        faces_raw = mesh.faces.reshape(-1, 4)[:, 1:]
+        keep_indices = np.flatnonzero(self.clip_triangles(polygon, mesh.points[faces_raw][:, :, :2]))
+
+        final_mesh = mesh.extract_cells(keep_indices).extract_surface()
+        return final_mesh.points[:, :2], final_mesh.faces.reshape(-1, 4)[:, 1:]
+
+    def triangulate_segments(self, vertices: np.ndarray, segments: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        points_3d = np.column_stack([vertices, np.zeros(len(vertices))])
+        edge_src = pv.PolyData(points_3d)
+        edge_src.lines = np.insert(segments, 0, 2, axis=1).ravel()
+
+        mesh = pv.PolyData(points_3d).delaunay_2d(edge_source=edge_src, tol=0)
+        return mesh.points[:, :2], mesh.faces.reshape(-1, 4)[:, 1:]
+
+    def clip_triangles(self, polygon: Polygon, triangles: np.ndarray) -> np.ndarray:
+        """Return a mask of the triangles (array of shape (N, 3, 2)) lying within the slightly buffered polygon."""
+        polygon_buffer = polygon.buffer(0.01)
+        shapely.prepare(polygon_buffer)
+        return shapely.within(shapely.polygons(triangles), polygon_buffer)
+
+
+class TriangleTriangulator(Triangulator):
+    """
+    True constrained Delaunay triangulation using the triangle library (J. R. Shewchuk).
+
+    The rings are passed as segments of a planar straight line graph and the holes are removed by the library, so no
+    clipping pass is required.
+    """
+
+    def triangulate(self, polygon: Polygon, exterior: LinearRing, interiors: list[LinearRing],
+                    points_within: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        rings = [np.asarray(ring.coords)[:-1, :2] for ring in [exterior] + interiors]
+        segments = []
+        offset = 0
+        for ring in rings:
+            n = len(ring)
+            indices = np.arange(offset, offset + n)
+            segments.append(np.column_stack([indices, np.roll(indices, -1)]))
+            offset += n
+
+        holes = [Polygon(interior).representative_point().coords[0] for interior in interiors]
+        return self.triangulate_segments(np.vstack(rings + [np.reshape(points_within, (-1, 2))]),
+                                         np.vstack(segments), holes)
+
+    def triangulate_segments(self, vertices: np.ndarray, segments: np.ndarray,
+                             holes: list[tuple[float, float]] | None = None) -> tuple[np.ndarray, np.ndarray]:
+        import triangle
+
+        pslg = {"vertices": vertices, "segments": segments}
+        if holes:
+            pslg["holes"] = np.array(holes)
+
+        # p: triangulate the planar straight line graph, Q: quiet
+        result = triangle.triangulate(pslg, "pQ")
+        if "triangles" not in result:
+            return np.empty((0, 2)), np.empty((0, 3), dtype=np.int64)
+        return result["vertices"], result["triangles"]
+
+
+def create_triangulator(backend: TriangulationBackend) -> Triangulator:
+    """
+    Create the triangulator for the configured backend.
+
+    The pyvista triangulator is used as fallback if the triangle library is not installed.
+
+    Args:
+        backend: The configured triangulation backend.
+
+    Returns:
+        The triangulator instance.
+    """
+    if backend == TriangulationBackend.TRIANGLE:
+        try:
+            import triangle  # noqa: F401
+            return TriangleTriangulator()
+        except ImportError:
+            logger.warning("triangle library not installed, falling back to pyvista triangulation")
+    return PyvistaTriangulator()
@@ -0,0 +1,53 @@
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator
+from zipfile import ZipFile
+
+
+class AssetFile:
+    """
+    Access to cached asset files, which are either plain files or members of a stored ZIP file.
+
+    A ZIP member is addressed as `<zip path>!/<member name>`. Opening it streams the member through the decompressor,
+    so the ZIP is stored once and never extracted. Members support forward seeks (decompressing and discarding the
+    skipped bytes), so they should be read in the order of the file.
+    """
+
+    ZIP_MEMBER_SEPARATOR = "!/"
+
+    @classmethod
+    def join(cls, zip_path: str, member: str) -> str:
+        """Return the path of a member of a ZIP file."""
+        return f"{zip_path}{cls.ZIP_MEMBER_SEPARATOR}{member}"
+
+    @classmethod
+    def split(cls, path: str) -> tuple[str, str | None]:
+        """Return the path of the file on disk and the member name, which is None for plain files."""
+        if cls.ZIP_MEMBER_SEPARATOR not in path:
+            return path, None
+        zip_path, member = path.split(cls.ZIP_MEMBER_SEPARATOR, 1)
+        return zip_path, member
+
+    @classmethod
+    def get_file_path(cls, path: str) -> str:
+        """Return the path of the file on disk holding the asset, i.e. the ZIP file for members."""
+        return cls.split(path)[0]
+
+    @classmethod
+    @contextmanager
+    def open(cls, path: str) -> Iterator[BinaryIO]:
+        """
+        Open an asset file or ZIP member for binary reading.
+
+        Args:
+            path: Path to the file or ZIP member (see `join`).
+
+        Returns:
+            Context manager yielding the binary stream.
+        """
+        file_path, member = cls.split(path)
+        if member is None:
+            with open(file_path, "rb") as file:
+                yield file
+            return
+        with ZipFile(file_path) as zip_file, zip_file.open(member) as file:
+            yield file
@@ -0,0 +1,69 @@
+import hashlib
+import json
+from typing import Any
+
+import numpy as np
+
+from config.configuration import BuildingFeatureType
+from service.disk_cache import DiskCache
+
+
+class BuildingCache(DiskCache):
+    """
+    Size-bounded disk cache for the buildings converted from CityGML.
+
+    An entry holds the buildings of one EGID in one CityGML asset: the coordinates of all rings as one array without
+    the project origin applied, the ring sizes and a JSON layout describing the geometry structure and the values of
+    the CITY_GML sources. The key is a hash of the EGID, the STAC asset identity (a new asset version yields a new key)
+    and the building feature type configuration.
+    """
+
+    def __init__(self, max_size_mb: int, cache_dir: str = "/workspace/cache/buildings"):
+        super().__init__(max_size_mb, cache_dir)
+
+    @staticmethod
+    def create_key(egid: str, asset_id: str, feature_type: BuildingFeatureType) -> str:
+        """
+        Create the cache key of the buildings of an EGID.
+
+        Args:
+            egid: The EGID of the buildings.
+            asset_id: The STAC asset identity of the CityGML file.
+            feature_type: The building feature type configuration.
+
+        Returns:
+            The hex digest identifying the buildings.
+        """
+        key_hash = hashlib.sha256(feature_type.model_dump_json().encode())
+        key_hash.update(f"|{asset_id}|{egid}".encode())
+        return key_hash.hexdigest()
+
+    def get(self, key: str) -> tuple[Any, list[np.ndarray]] | None:
+        """
+        Return the cached buildings for a key.
+
+        Args:
+            key: The cache key.
+
+        Returns:
+            The layout and the ring coordinates as arrays of shape (N, 3), or None if not cached.
+        """
+        arrays = self.load(key)
+        if arrays is None:
+            return None
+        ring_ends = np.cumsum(arrays["ring_sizes"])
+        rings = np.split(arrays["coordinates"], ring_ends[:-1]) if len(ring_ends) > 0 else []
+        return json.loads(str(arrays["layout"])), rings
+
+    def add(self, key: str, layout: Any, rings: list[np.ndarray]):
+        """
+        Add buildings to the cache. The size limit is enforced by `evict`, which is called once after adding a batch.
+
+        Args:
+            key: The cache key.
+            layout: The JSON serializable layout of the buildings.
+            rings: The ring coordinates as arrays of shape (N, 3) in the order referenced by the layout.
+        """
+        coordinates = np.vstack(rings) if rings else np.empty((0, 3))
+        ring_sizes = np.array([len(ring) for ring in rings], dtype=np.int64)
+        self.save(key, coordinates=coordinates, ring_sizes=ring_sizes, layout=np.array(json.dumps(layout)))
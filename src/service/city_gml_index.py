@@ -0,0 +1,249 @@
+import glob
+import hashlib
+import json
+import logging
+import os
+import re
+from pathlib import Path
+from typing import BinaryIO, Iterator
+
+from lxml import etree
+from lxml.etree import _Element as XmlElement
+
+from service.asset_file import AssetFile
+from utils.namespace import namespace
+from utils.xpath import find_text
+
+logger = logging.getLogger(__name__)
+
+
+class CityGmlIndex:
+    """
+    Persistent index from EGID to the byte ranges of the `bldg:Building` elements of a cached CityGML file.
+
+    The index is built once per CityGML file and EGID XPath by scanning the file for building elements and is stored
+    as JSON sidecar next to the file. It is rebuilt if the size or modification time of the file changed. Jobs then
+    read and parse only the fragments of the requested buildings instead of the whole file. CityGML members of stored
+    ZIP files (see `AssetFile`) are indexed by their uncompressed offsets and streamed through the decompressor.
+
+    A fragment is parsed within the start tag of the root element, so the namespace declarations of the root apply.
+    Namespaces declared on other ancestors of the buildings (e.g. `core:cityObjectMember`) are collected while scanning
+    and added to that start tag. A fragment which can not be parsed nevertheless is skipped with a warning instead of
+    aborting the file.
+    """
+
+    INDEX_VERSION = 2
+    INDEX_SUFFIX = ".egid.json"
+    SCAN_CHUNK_SIZE = 16 * 1024 * 1024
+    MAX_TAG_LENGTH = 256  # bytes kept at the end of a scanned chunk, which may contain an incomplete start tag
+    BUILDING_TAG = f"{{{namespace['bldg']}}}Building"
+    BUILDING_START = re.compile(rb"<(?:[\w.-]+:)?Building[\s>]")
+    BUILDING_END = re.compile(rb"</(?:[\w.-]+:)?Building\s*>")
+    ROOT_START = re.compile(rb"<([\w.:-]+)[^>]*>")
+    NAMESPACE_DECLARATION = re.compile(rb"xmlns(?::([\w.-]+))?\s*=\s*([\"'])(.*?)\2")
+
+    def __init__(self, city_gml_path: str, root_start_tag: str, ranges_by_egid: dict[str, list[list[int]]]):
+        self.city_gml_path = city_gml_path
+        self.root_start_tag = root_start_tag
+        self.ranges_by_egid = ranges_by_egid
+
+    @classmethod
+    def open(cls, city_gml_path: str, egid_xpath: str) -> "CityGmlIndex":
+        """
+        Load the index of a CityGML file, building and storing it if it does not exist or is outdated.
+
+        Args:
+            city_gml_path: Path to the CityGML file or ZIP member.
+            egid_xpath: XPath expression to the EGID relative to the building element.
+
+        Returns:
+            The index of the file.
+        """
+        index_path = cls.get_index_path(city_gml_path, egid_xpath)
+        stat = os.stat(AssetFile.get_file_path(city_gml_path))
+        try:
+            with open(index_path, "r") as file:
+                data = json.load(file)
+            if (data["version"] == cls.INDEX_VERSION and data["size"] == stat.st_size
+                    and data["mtime"] == stat.st_mtime):
+                return cls(city_gml_path, data["root_start_tag"], data["ranges_by_egid"])
+            logger.debug(f"outdated city gml index {index_path}")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"invalid city gml index {index_path}: {e}")
+
+        index = cls.build(city_gml_path, egid_xpath)
+        data = {"version": cls.INDEX_VERSION, "size": stat.st_size, "mtime": stat.st_mtime,
+                "root_start_tag": index.root_start_tag, "ranges_by_egid": index.ranges_by_egid}
+        tmp_path = f"{index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(data, file)
+        os.replace(tmp_path, index_path)
+        return index
+
+    @classmethod
+    def build(cls, city_gml_path: str, egid_xpath: str) -> "CityGmlIndex":
+        """
+        Build the index of a CityGML file by scanning it for building elements and evaluating their EGID.
+
+        Args:
+            city_gml_path: Path to the CityGML file or ZIP member.
+            egid_xpath: XPath expression to the EGID relative to the building element.
+
+        Returns:
+            The index of the file.
+        """
+        with AssetFile.open(city_gml_path) as file:
+            head = file.read(cls.SCAN_CHUNK_SIZE)
+            root_start_tag = cls.find_root_start_tag(head)
+            index = cls(city_gml_path, root_start_tag, {})
+            declarations = {}
+            declared_count = 0
+            for start, end, fragment in cls.iter_fragments(file, head, declarations):
+                # the declarations of the ancestors precede the fragment
+                if len(declarations) != declared_count:
+                    index.root_start_tag = cls.add_declarations(root_start_tag, declarations)
+                    declared_count = len(declarations)
+                building_gml = index.parse_fragment(fragment)
+                if building_gml is None:
+                    continue
+                egid = find_text(building_gml, egid_xpath)
+                if egid is not None:
+                    index.ranges_by_egid.setdefault(egid, []).append([start, end])
+
+        logger.info(f"indexed {len(index.ranges_by_egid)} buildings of {city_gml_path}")
+        return index
+
+    @classmethod
+    def iter_fragments(cls, file: BinaryIO, buffer: bytes = b"", declarations: dict[str, str] | None = None) -> \
+            Iterator[tuple[int, int, bytes]]:
+        """
+        Scan a file for building elements in chunks of `SCAN_CHUNK_SIZE` bytes.
+
+        Args:
+            file: The binary stream, positioned after the bytes of buffer.
+            buffer: The bytes already read from the start of the file.
+            declarations: Optional dictionary, which is updated with the namespace declarations (prefix to URI, empty
+                prefix for the default namespace) outside of the building elements before every building is yielded.
+
+        Returns:
+            Iterator over the start offset, end offset and bytes of the building elements in the order of the file.
+        """
+        offset = 0  # file offset of the buffer
+        while True:
+            position = 0
+            while True:
+                start_match = cls.BUILDING_START.search(buffer, position)
+                if start_match is None:
+                    end_position = max(position, len(buffer) - cls.MAX_TAG_LENGTH)
+                    cls.find_declarations(buffer, position, end_position, declarations)
+                    position = end_position
+                    break
+                cls.find_declarations(buffer, position, start_match.start(), declarations)
+                end_match = cls.BUILDING_END.search(buffer, start_match.end())
+                if end_match is None:
+                    position = start_match.start()
+                    break
+                start, end = start_match.start(), end_match.end()
+                yield offset + start, offset + end, buffer[start:end]
+                position = end
+
+            chunk = file.read(cls.SCAN_CHUNK_SIZE)
+            if not chunk:
+                return
+            buffer = buffer[position:] + chunk
+            offset += position
+
+    def get_ranges(self, egids: set[str]) -> list[tuple[int, int]]:
+        """Return the byte ranges of the buildings with the given EGIDs."""
+        return [(start, end) for egid in egids for start, end in self.ranges_by_egid.get(egid, [])]
+
+    def read_buildings(self, ranges: list[tuple[int, int]]) -> Iterator[XmlElement]:
+        """
+        Read and parse the building elements of byte ranges in the order of the file.
+
+        Args:
+            ranges: The byte ranges of the buildings.
+
+        Returns:
+            Iterator over the `bldg:Building` elements.
+        """
+        with AssetFile.open(self.city_gml_path) as file:
+            for start, end in sorted(set(ranges)):
+                building_gml = self.read_building(file, start, end)
+                if building_gml is not None:
+                    yield building_gml
+
+    def read_building(self, file: BinaryIO, start: int, end: int) -> XmlElement | None:
+        """
+        Read and parse the building element of a byte range, or return None if it is not a building element.
+
+        Args:
+            file: The binary stream of the file (see `AssetFile.open`). ZIP members only seek forward efficiently,
+                so the ranges should be read in the order of the file.
+            start: The start offset of the building element.
+            end: The end offset of the building element.
+        """
+        file.seek(start)
+        return self.parse_fragment(file.read(end - start))
+
+    def parse_fragment(self, fragment: bytes) -> XmlElement | None:
+        """Parse a building element within the root element of the file, so the namespace declarations apply."""
+        root_name = self.ROOT_START.match(self.root_start_tag.encode()).group(1)
+        document = self.root_start_tag.encode() + fragment + b"</" + root_name + b">"
+        try:
+            root = etree.fromstring(document)
+        except etree.XMLSyntaxError as e:
+            logger.warning(f"skip building fragment of {self.city_gml_path} which can not be parsed: {e}")
+            return None
+        if len(root) != 1 or root[0].tag != self.BUILDING_TAG:
+            return None
+        return root[0]
+
+    @classmethod
+    def find_root_start_tag(cls, content: bytes) -> str:
+        """Return the start tag of the root element including its namespace declarations."""
+        # the pattern requires a name after "<", so the XML declaration and comments are skipped
+        match = cls.ROOT_START.search(content)
+        if match is None:
+            raise ValueError("no root element found")
+        return match.group(0).decode()
+
+    @classmethod
+    def find_declarations(cls, buffer: bytes, start: int, end: int, declarations: dict[str, str] | None):
+        """Add the namespace declarations in a range of the buffer, keeping the first URI of every prefix."""
+        if declarations is None:
+            return
+        for match in cls.NAMESPACE_DECLARATION.finditer(buffer, start, end):
+            prefix = (match.group(1) or b"").decode()
+            uri = match.group(3).decode()
+            if declarations.setdefault(prefix, uri) != uri:
+                logger.warning(f"namespace prefix '{prefix}' is declared for {declarations[prefix]} and {uri}, "
+                               f"the first declaration is used")
+
+    @classmethod
+    def add_declarations(cls, root_start_tag: str, declarations: dict[str, str]) -> str:
+        """Return the root start tag with the namespace declarations of prefixes not declared by the root."""
+        declared = {(match.group(1) or b"").decode()
+                    for match in cls.NAMESPACE_DECLARATION.finditer(root_start_tag.encode())}
+        added = "".join(f' xmlns{":" + prefix if prefix else ""}="{uri}"'
+                        for prefix, uri in declarations.items() if prefix not in declared)
+        if not added:
+            return root_start_tag
+        end = -2 if root_start_tag.endswith("/>") else -1
+        return root_start_tag[:end] + added + root_start_tag[end:]
+
+    @staticmethod
+    def get_index_path(city_gml_path: str, egid_xpath: str) -> str:
+        xpath_hash = hashlib.sha256(egid_xpath.encode()).hexdigest()[:16]
+        file_path, member = AssetFile.split(city_gml_path)
+        name = Path(file_path).name if member is None else f"{Path(file_path).name}.{Path(member).name}"
+        return str(Path(file_path).with_name(f"{name}.{xpath_hash}{CityGmlIndex.INDEX_SUFFIX}"))
+
+    @classmethod
+    def remove_indexes(cls, file_path: str):
+        """Remove the indexes of a CityGML file or of the members of a ZIP file for all EGID XPath expressions."""
+        path = Path(file_path)
+        for index_path in path.parent.glob(f"{glob.escape(path.name)}.*{cls.INDEX_SUFFIX}"):
+            index_path.unlink(missing_ok=True)
@@ -0,0 +1,92 @@
+import logging
+import os
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class DiskCache:
+    """
+    Size-bounded disk cache of numpy arrays.
+
+    An entry is stored as uncompressed `.npz` file named after its key. When the cache exceeds its size, the least
+    recently used entries (by modification time, which is updated on every hit) are removed by `evict`.
+    """
+
+    FILE_EXTENSION = ".npz"
+
+    def __init__(self, max_size_mb: int, cache_dir: str):
+        self.max_size = max_size_mb * 1024 * 1024
+        self.cache_dir = Path(cache_dir)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def load(self, key: str) -> dict[str, np.ndarray] | None:
+        """
+        Return the arrays of the entry for a key.
+
+        Args:
+            key: The cache key.
+
+        Returns:
+            The arrays by name, or None if not cached. Invalid entries are removed.
+        """
+        if not self.enabled:
+            return None
+        file_path = self.get_file_path(key)
+        try:
+            with np.load(file_path) as data:
+                arrays = {name: data[name] for name in data.files}
+            os.utime(file_path)
+            return arrays
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"invalid cache entry {file_path}: {e}")
+            file_path.unlink(missing_ok=True)
+            return None
+
+    def save(self, key: str, **arrays: np.ndarray):
+        """
+        Store arrays as the entry for a key. The size limit is enforced by `evict`, which is called once after adding
+        a batch.
+
+        Args:
+            key: The cache key.
+            arrays: The arrays by name.
+        """
+        if not self.enabled:
+            return
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        file_path = self.get_file_path(key)
+        tmp_path = file_path.with_name(f"{key}.{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as file:
+            np.savez(file, **arrays)
+        os.replace(tmp_path, file_path)
+
+    def evict(self):
+        """Remove the least recently used entries until the cache size is within its limit."""
+        if not self.enabled or not self.cache_dir.exists():
+            return
+        entries = []
+        for file_path in self.cache_dir.glob(f"*{self.FILE_EXTENSION}"):
+            try:
+                stat = file_path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, file_path))
+
+        size = sum(entry[1] for entry in entries)
+        for _, file_size, file_path in sorted(entries, key=lambda entry: entry[0]):
+            if size <= self.max_size:
+                break
+            file_path.unlink(missing_ok=True)
+            size -= file_size
+            logger.debug(f"evicted cache entry {file_path}")
+
+    def get_file_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}{self.FILE_EXTENSION}"
@@ -0,0 +1,243 @@
+import io
+import itertools
+import logging
+import os
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+import shapely
+from shapely.geometry.base import BaseGeometry
+
+from service.asset_file import AssetFile
+
+logger = logging.getLogger(__name__)
+
+
+class DtmTileStore:
+    """
+    Store for DTM tiles in a compact binary layout.
+
+    The swissALTI3D ASCII XYZ files are parsed once when they are downloaded and written as a float64 array of shape
+    (N, 3) in numpy's `.npy` format. Stored tiles are opened memory-mapped, so repeated jobs skip text parsing
+    entirely and worker processes share the page cache of the same tile. XYZ files can also be read directly from
+    a stored ZIP (see `AssetFile`).
+    """
+
+    TILE_EXTENSION = ".npy"
+    COG_EXTENSIONS = (".tif", ".tiff")
+    CHUNK_ROWS = 250_000
+
+    @classmethod
+    def convert(cls, xyz_file_path: str) -> str:
+        """
+        Convert an ASCII XYZ file into the binary tile layout and remove the text file.
+
+        XYZ members of a ZIP file are streamed through the decompressor and the tile is written next to the ZIP, the
+        ZIP itself is left in place.
+
+        Args:
+            xyz_file_path: Path to the extracted XYZ file or ZIP member (space delimited, one header line).
+
+        Returns:
+            File path of the binary tile.
+        """
+        file_path, member = AssetFile.split(xyz_file_path)
+        tile_name = Path(member if member is not None else file_path).with_suffix(cls.TILE_EXTENSION).name
+        tile_path = str(Path(file_path).with_name(tile_name))
+        data = cls.read_xyz(xyz_file_path)
+        tmp_path = f"{tile_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as file:
+            np.save(file, data)
+        os.replace(tmp_path, tile_path)
+        if member is None:
+            Path(xyz_file_path).unlink(missing_ok=True)
+        logger.debug(f"converted dtm tile {xyz_file_path} with {len(data)} points")
+        return tile_path
+
+    @classmethod
+    def open(cls, tile_path: str) -> np.ndarray:
+        """
+        Open a DTM tile as an array of shape (N, 3).
+
+        Binary tiles are memory-mapped read-only. Files which are not in the binary layout (e.g. cache entries created
+        before the tile store existed or XYZ members of stored ZIP files) are parsed as ASCII XYZ.
+
+        Args:
+            tile_path: Path to the binary tile, XYZ file or XYZ ZIP member.
+
+        Returns:
+            The xyz coordinates of the tile.
+        """
+        if tile_path.endswith(cls.TILE_EXTENSION):
+            return np.load(tile_path, mmap_mode="r")
+        if tile_path.lower().endswith(cls.COG_EXTENSIONS):
+            return cls.read_cog(tile_path)
+        return cls.read_xyz(tile_path)
+
+    @classmethod
+    def read_within(cls, tile_path: str, region: BaseGeometry) -> np.ndarray:
+        """
+        Read only the points of a DTM tile within a region.
+
+        The tile is streamed in chunks of `CHUNK_ROWS` rows and only the rows inside the region (boundary included)
+        are kept, so the peak memory scales with the region instead of the tile size. Of cloud optimized GeoTIFFs only
+        the windows covering the region are read.
+
+        Args:
+            tile_path: Path or URL to the binary tile, XYZ file or cloud optimized GeoTIFF.
+            region: The region of interest, e.g. the union of the envelopes of all areas of a job.
+
+        Returns:
+            The xyz coordinates of the tile within the region as an array of shape (N, 3).
+        """
+        if tile_path.lower().endswith(cls.COG_EXTENSIONS):
+            return cls.read_cog(tile_path, region)
+
+        shapely.prepare(region)
+        minx, miny, maxx, maxy = region.bounds
+        selected = []
+        for chunk in cls.iter_chunks(tile_path):
+            x = chunk[:, 0]
+            y = chunk[:, 1]
+            candidates = np.flatnonzero((x >= minx) & (x <= maxx) & (y >= miny) & (y <= maxy))
+            if len(candidates) == 0:
+                continue
+            mask = shapely.intersects_xy(region, x[candidates], y[candidates])
+            selected.append(np.array(chunk[candidates[mask]]))
+        if not selected:
+            return np.empty((0, 3))
+        return np.vstack(selected)
+
+    @classmethod
+    def iter_chunks(cls, tile_path: str) -> Iterator[np.ndarray]:
+        """
+        Iterate over a DTM tile in chunks of at most `CHUNK_ROWS` rows of shape (N, 3).
+
+        Binary tiles are sliced from the memory map, XYZ files and ZIP members are parsed chunk by chunk.
+        """
+        if tile_path.endswith(cls.TILE_EXTENSION):
+            data = np.load(tile_path, mmap_mode="r")
+            for start in range(0, len(data), cls.CHUNK_ROWS):
+                yield data[start:start + cls.CHUNK_ROWS]
+            return
+
+        with AssetFile.open(tile_path) as binary_file, io.TextIOWrapper(binary_file) as file:
+            next(file, None)
+            while True:
+                lines = list(itertools.islice(file, cls.CHUNK_ROWS))
+                if not lines:
+                    return
+                yield np.loadtxt(lines, delimiter=" ", dtype=np.float64, ndmin=2)
+
+    @classmethod
+    def read_cog(cls, cog_path: str, region: BaseGeometry | None = None) -> np.ndarray:
+        """
+        Read the pixel centers of a single band GeoTIFF as an array of shape (N, 3).
+
+        For every part of the region only the pixel window covering its bounds is read. Remote files (URLs, as returned
+        by `STACService.fetch_dtm_assets` for the COG DTM source) are opened by GDAL with HTTP range requests for the
+        internal tiles of the windows, consecutive ranges are merged and the fetched blocks are kept in the GDAL cache
+        for the other parts. Pixels without data are dropped.
+
+        Args:
+            cog_path: Path or URL to the GeoTIFF.
+            region: If given, only the pixel centers within this region are returned.
+
+        Returns:
+            The xyz coordinates of the pixel centers.
+        """
+        import rasterio
+        from rasterio.windows import Window
+
+        with rasterio.Env(GDAL_DISABLE_READDIR_ON_OPEN="EMPTY_DIR", GDAL_HTTP_MERGE_CONSECUTIVE_RANGES="YES",
+                          VSI_CACHE=True), rasterio.open(cog_path) as dataset:
+            transform = dataset.transform
+            parts = [None] if region is None else shapely.get_parts(region)
+            selected = []
+            for part in parts:
+                if part is None:
+                    col_off, row_off, width, height = 0, 0, dataset.width, dataset.height
+                else:
+                    col_off, row_off, width, height = cls.get_pixel_window(
+                        part.bounds, (transform.c, transform.a, transform.f, transform.e),
+                        dataset.width, dataset.height)
+                if width <= 0 or height <= 0:
+                    continue
+                heights = dataset.read(1, window=Window(col_off, row_off, width, height))
+                points = cls.pixels_to_xyz(heights, (transform.c, transform.a, transform.f, transform.e), col_off,
+                                           row_off, dataset.nodata)
+                if part is not None:
+                    points = points[shapely.intersects_xy(part, points[:, 0], points[:, 1])]
+                selected.append(points)
+
+        logger.debug(f"read {sum(len(points) for points in selected)} points of {cog_path}")
+        if not selected:
+            return np.empty((0, 3))
+        if len(selected) == 1:
+            return selected[0]
+        # windows of different parts may overlap
+        return np.unique(np.vstack(selected), axis=0)
+
+    @staticmethod
+    def get_pixel_window(bounds: tuple[float, float, float, float], transform: tuple[float, float, float, float],
+                         width: int, height: int) -> tuple[int, int, int, int]:
+        """
+        Return the pixel window (col_off, row_off, width, height) covering bounds, clipped to the raster.
+
+        Args:
+            bounds: The bounds (minx, miny, maxx, maxy).
+            transform: The origin and pixel size of the north-up raster as (x0, pixel width, y0, -pixel height).
+            width: The raster width in pixels.
+            height: The raster height in pixels.
+        """
+        x0, pixel_width, y0, pixel_height = transform
+        minx, miny, maxx, maxy = bounds
+        col_start = max(int(np.floor((minx - x0) / pixel_width)), 0)
+        col_end = min(int(np.ceil((maxx - x0) / pixel_width)), width)
+        row_start = max(int(np.floor((maxy - y0) / pixel_height)), 0)
+        row_end = min(int(np.ceil((miny - y0) / pixel_height)), height)
+        return col_start, row_start, col_end - col_start, row_end - row_start
+
+    @staticmethod
+    def pixels_to_xyz(heights: np.ndarray, transform: tuple[float, float, float, float], col_off: int, row_off: int,
+                      nodata: float | None) -> np.ndarray:
+        """
+        Convert a window of a north-up height raster into the xyz coordinates of the pixel centers.
+
+        Args:
+            heights: The heights of the window as array of shape (rows, columns).
+            transform: The origin and pixel size of the raster as (x0, pixel width, y0, -pixel height).
+            col_off: The column offset of the window.
+            row_off: The row offset of the window.
+            nodata: The nodata value of the raster, pixels with this value or NaN are dropped.
+
+        Returns:
+            The xyz coordinates as array of shape (N, 3).
+        """
+        x0, pixel_width, y0, pixel_height = transform
+        rows, cols = np.indices(heights.shape)
+        xs = x0 + (cols + col_off + 0.5) * pixel_width
+        ys = y0 + (rows + row_off + 0.5) * pixel_height
+        points = np.column_stack([xs.ravel(), ys.ravel(), heights.ravel().astype(np.float64)])
+        valid = ~np.isnan(points[:, 2])
+        if nodata is not None:
+            valid &= points[:, 2] != nodata
+        return points[valid]
+
+    @staticmethod
+    def read_xyz(xyz_file_path: str) -> np.ndarray:
+        """
+        Parse an ASCII XYZ file or ZIP member into an array of shape (N, 3).
+
+        Args:
+            xyz_file_path: Path to the XYZ file or ZIP member (space delimited, one header line).
+
+        Returns:
+            The xyz coordinates of the file.
+        """
+        with AssetFile.open(xyz_file_path) as binary_file, io.TextIOWrapper(binary_file) as file:
+            data = np.loadtxt(file, delimiter=" ", skiprows=1, dtype=np.float64)
+        if data.ndim == 1:
+            data = data.reshape((1, -1))
+        return np.ascontiguousarray(data)
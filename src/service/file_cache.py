@@ -6,6 +6,8 @@ from pathlib import Path
 import redis
 
 from config.configuration import config
+from service.asset_file import AssetFile
+from service.city_gml_index import CityGmlIndex
 
 logger = logging.getLogger(__name__)
 
@@ -82,14 +84,22 @@ class FileCache:
             data = json.loads(self.file_cache.get(key))
             entry = CacheEntry.from_dict(data)
             if entry.expire_at > time.time():
-                if Path(entry.file_path).exists():
+                if Path(AssetFile.get_file_path(entry.file_path)).exists():
                     logger.debug(f"using cached file: {key}")
                     return entry
                 else:
                     logger.debug(f"cached file not found: {key}")
                     self.file_cache.delete(key)
+                    self.remove_file(entry.file_path)
             else:
                 logger.debug(f"remove expired file at cache fetch: {key}")
                 self.file_cache.delete(key)
-                Path(entry.file_path).unlink(missing_ok=True)
+                self.remove_file(entry.file_path)
         return None
+
+    @staticmethod
+    def remove_file(file_path: str):
+        """Remove a cached file (the ZIP file for ZIP members) and the EGID index sidecars next to it."""
+        file_path = AssetFile.get_file_path(file_path)
+        Path(file_path).unlink(missing_ok=True)
+        CityGmlIndex.remove_indexes(file_path)
@@ -0,0 +1,66 @@
+import hashlib
+
+import numpy as np
+from shapely.geometry.base import BaseGeometry
+
+from config.configuration import config
+from service.disk_cache import DiskCache
+
+
+class MeshCache(DiskCache):
+    """
+    Size-bounded disk cache for the meshes of areas.
+
+    A mesh is stored as compact vertex and face arrays. The key is a hash of everything the mesh depends on: the
+    polygon, the TIN configuration, the triangulator in effect (the configured backend may fall back to another one,
+    so the caller passes the triangulator actually used) and the STAC assets of the contributing DTM tiles, so a new
+    DTM version yields a new key.
+    """
+
+    def __init__(self, max_size_mb: int, cache_dir: str = "/workspace/cache/meshes"):
+        super().__init__(max_size_mb, cache_dir)
+
+    @staticmethod
+    def create_key(polygon: BaseGeometry, triangulator: str, asset_ids: list[str]) -> str:
+        """
+        Create the cache key of an area mesh.
+
+        Args:
+            polygon: The polygon of the area.
+            triangulator: The name of the triangulator creating the mesh.
+            asset_ids: The STAC asset identities of the DTM tiles contributing raster points to the area.
+
+        Returns:
+            The hex digest identifying the mesh.
+        """
+        key_hash = hashlib.sha256(polygon.wkb)
+        settings = [config.tin.grid_size.value, config.tin.max_height_error, config.tin.mesh_strategy.value,
+                    triangulator] + sorted(asset_ids)
+        key_hash.update("|".join(str(setting) for setting in settings).encode())
+        return key_hash.hexdigest()
+
+    def get(self, key: str) -> tuple[np.ndarray, np.ndarray] | None:
+        """
+        Return the cached mesh for a key.
+
+        Args:
+            key: The cache key.
+
+        Returns:
+            The vertices and faces of the mesh, or None if not cached.
+        """
+        arrays = self.load(key)
+        if arrays is None:
+            return None
+        return arrays["vertices"], arrays["faces"]
+
+    def add(self, key: str, vertices: np.ndarray, faces: np.ndarray):
+        """
+        Add a mesh to the cache. The size limit is enforced by `evict`, which is called once after adding a batch.
+
+        Args:
+            key: The cache key.
+            vertices: The vertices of the mesh.
+            faces: The faces of the mesh.
+        """
+        self.save(key, vertices=vertices, faces=faces)
@@ -2,12 +2,16 @@ import logging
 import os
 import requests
 from dateutil import parser
-from io import BytesIO
+from pathlib import Path
 from typing import Callable
 from zipfile import ZipFile
 
+from config.asset_storage import AssetStorage
 from config.configuration import config
+from config.dtm_source import DtmSource
+from service.asset_file import AssetFile
 from service.bounding_box import BoundingBox
+from service.dtm_tile_store import DtmTileStore
 from service.file_cache import FileCache
 
 logger = logging.getLogger(__name__)
@@ -17,13 +21,18 @@ class STACService:
     """
     Service class for interacting with SpatioTemporal Asset Catalog (STAC) endpoints, retrieving geospatial assets,
     and caching downloaded files.
+
+    Attributes:
+        asset_ids_by_file: The asset identity (versioned asset file name) of every file returned by this service.
     """
 
     FILE_TTL_SECONDS = 86400
+    DOWNLOAD_CHUNK_SIZE = 1024 * 1024
 
     def __init__(self):
         self.cache_dir = "/workspace/cache"
         self.file_cache = FileCache()
+        self.asset_ids_by_file: dict[str, str] = {}
 
     def fetch_city_gml_assets(self, bounding_box: BoundingBox) -> list[str]:
         """
@@ -43,19 +52,30 @@ class STACService:
     def fetch_dtm_assets(self, bounding_box: BoundingBox, grid_size: float) -> list[str]:
         """
         Retrieves and extracts DTM (ASCII XYZ ZIP) asset files from the STAC endpoint that intersect
-        with the specified bounding box and match the grid size.
+        with the specified bounding box and match the grid size. The extracted files are converted into binary
+        tiles of the `DtmTileStore`. With the COG DTM source the URLs of the cloud optimized GeoTIFF assets are
+        returned instead and nothing is downloaded, only the windows covering the areas are read later (see
+        `DtmTileStore.read_cog`).
 
         Args:
             bounding_box: The bounding box used to query features.
             grid_size: Desired ground sampling distance for the DTM assets.
 
         Returns:
-            List of file paths to the extracted DTM files.
+            List of file paths to the binary DTM tiles or URLs to the COG assets.
         """
+        if config.stac.dtm_source == DtmSource.COG:
+            asset_filter = lambda asset: (asset["type"].startswith("image/tiff") and (
+                    asset.get("gsd") == grid_size or asset.get("eo:gsd") == grid_size))
+            hrefs = self.fetch_latest_assets(config.stac.dtm_items_url, bounding_box, asset_filter)
+            for href in hrefs:
+                self.asset_ids_by_file[href] = os.path.basename(href)
+            return hrefs
+
         asset_filter = lambda asset: (asset["type"] == "application/x.ascii-xyz+zip" and (
                 asset.get("gsd") == grid_size or asset.get("eo:gsd") == grid_size))
         hrefs = self.fetch_latest_assets(config.stac.dtm_items_url, bounding_box, asset_filter)
-        return [self.fetch_and_extract_zip(href, "xyz") for href in hrefs]
+        return [self.fetch_and_extract_zip(href, "xyz", DtmTileStore.convert) for href in hrefs]
 
     def fetch_features(self, stac_collection_items_url: str, bounding_box: BoundingBox) -> list[dict]:
         """
@@ -127,17 +147,25 @@ class STACService:
 
         return [asset["href"] for asset in feature_assets.values()]
 
-    def fetch_and_extract_zip(self, zip_href: str, target_extension: str) -> str:
+    def fetch_and_extract_zip(self, zip_href: str, target_extension: str,
+                              converter: Callable[[str], str] | None = None) -> str:
         """
-        Downloads a ZIP file from the given URL, extracts its contents to the cache directory,
-        and caches the resulting file for later reuse.
+        Downloads a ZIP file from the given URL to the cache directory and caches the file with the target extension
+        for later reuse.
+
+        The download is streamed to disk. With a converter the member is converted and the ZIP is removed with every
+        asset storage, so converted files are never parsed again. Otherwise with the EXTRACT asset storage the member
+        is extracted and the ZIP is removed. With the ZIP asset storage the ZIP is kept and the path of its member is
+        cached (see `AssetFile`), the member is streamed through the decompressor when it is read.
 
         Args:
             zip_href: HREF/URL of the remote ZIP asset.
             target_extension: expected extension
+            converter: Optional function converting the member once after download. It receives the path of the ZIP
+                member and returns the path of the file to cache.
 
         Returns:
-            File path to the extracted file in the cache directory.
+            File path to the cached file or ZIP member in the cache directory.
 
         Raises:
             Exception: If the HTTP request to download the asset fails.
@@ -146,25 +174,57 @@ class STACService:
 
         entry = self.file_cache.get(file_id)
         if entry is not None:
+            self.asset_ids_by_file[entry.file_path] = file_id
             return entry.file_path
 
         logger.debug(f"downloading asset from {zip_href}")
 
-        resp = requests.get(zip_href, timeout=60)
-        if resp.status_code != 200:
-            raise Exception(f"requesting assets failed with HTTP error {resp.status_code}")
+        zip_path = self.download(zip_href, os.path.join(self.cache_dir, file_id))
 
-        file_path = None
-        with ZipFile(BytesIO(resp.content)) as zip_file:
+        with ZipFile(zip_path) as zip_file:
             all_files = zip_file.namelist()
             matching_files = [f for f in all_files if f.lower().endswith(target_extension.lower())]
             if not matching_files:
+                Path(zip_path).unlink(missing_ok=True)
                 raise Exception(f"No .{target_extension} file found in ZIP: {zip_href}")
             file_name = matching_files[0]
             if len(matching_files) > 1:
                 logger.warning(f"Multiple {target_extension} files found. Using: {file_name}")
-            file_path = zip_file.extract(member=file_name, path=self.cache_dir)
-            self.file_cache.add(file_id, file_path, self.FILE_TTL_SECONDS)
+            if converter is not None:
+                file_path = converter(AssetFile.join(zip_path, file_name))
+            elif config.stac.asset_storage == AssetStorage.ZIP:
+                file_path = AssetFile.join(zip_path, file_name)
+            else:
+                file_path = zip_file.extract(member=file_name, path=self.cache_dir)
+        if AssetFile.split(file_path)[1] is None:
+            Path(zip_path).unlink(missing_ok=True)
+        self.file_cache.add(file_id, file_path, self.FILE_TTL_SECONDS)
+        self.asset_ids_by_file[file_path] = file_id
 
         logger.info(f"cached new file {file_id}")
         return file_path
+
+    def download(self, href: str, file_path: str) -> str:
+        """
+        Downloads a file in chunks to the given path without buffering it in memory.
+
+        Args:
+            href: HREF/URL of the remote file.
+            file_path: Path of the downloaded file.
+
+        Returns:
+            The path of the downloaded file.
+
+        Raises:
+            Exception: If the HTTP request fails.
+        """
+        with requests.get(href, stream=True, timeout=60) as resp:
+            if resp.status_code != 200:
+                raise Exception(f"requesting assets failed with HTTP error {resp.status_code}")
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            tmp_path = f"{file_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as file:
+                for chunk in resp.iter_content(chunk_size=self.DOWNLOAD_CHUNK_SIZE):
+                    file.write(chunk)
+        os.replace(tmp_path, file_path)
+        return file_path
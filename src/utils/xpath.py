@@ -0,0 +1,50 @@
+from functools import lru_cache
+
+from lxml import etree
+from lxml.etree import _Element as XmlElement
+
+from utils.namespace import namespace
+
+
+@lru_cache(maxsize=None)
+def compile_xpath(expression: str) -> etree.XPath:
+    """
+    Compile an XPath expression with the CityGML namespaces once and return the cached compiled expression.
+
+    The configured expressions are compiled when the configuration is validated, so every building reuses the same
+    compiled expression. Compiled expressions can not be pickled, worker processes compile them on first use. The
+    expression is evaluated once on an empty element, so undefined namespace prefixes are rejected as well.
+
+    Args:
+        expression: The XPath expression, e.g. `.//gen:intAttribute[@name='EGID']/gen:value`.
+
+    Returns:
+        The compiled expression.
+
+    Raises:
+        ValueError: If the expression is not a valid XPath expression.
+    """
+    try:
+        xpath = etree.XPath(expression, namespaces=namespace)
+        xpath(etree.Element("empty"))
+        return xpath
+    except etree.XPathError as e:
+        raise ValueError(f"invalid XPath expression '{expression}': {e}") from e
+
+
+def find_text(gml: XmlElement, expression: str) -> str | None:
+    """
+    Return the stripped text of the first result of an XPath expression, or None if there is no result.
+
+    Results can be elements (their text is used) or strings, e.g. of `text()` or attribute expressions.
+    """
+    result = compile_xpath(expression)(gml)
+    if isinstance(result, list):
+        if not result:
+            return None
+        result = result[0]
+    if isinstance(result, XmlElement):
+        result = result.text
+    if result is None:
+        return None
+    return str(result).strip()
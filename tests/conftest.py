@@ -0,0 +1,17 @@
+from typing import Callable
+
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def create_raster_points() -> Callable[..., np.ndarray]:
+    """Return a function creating the raster points of a surface z = surface(x, y) on a regular grid."""
+
+    def create(surface: Callable[[np.ndarray, np.ndarray], np.ndarray], nx: int, ny: int | None = None,
+               spacing: float = 0.5, origin: tuple[float, float] = (0.0, 0.0)) -> np.ndarray:
+        ny = nx if ny is None else ny
+        xs, ys = np.meshgrid(origin[0] + np.arange(nx) * spacing, origin[1] + np.arange(ny) * spacing)
+        return np.column_stack([xs.ravel(), ys.ravel(), surface(xs.ravel(), ys.ravel())])
+
+    return create
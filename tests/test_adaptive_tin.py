@@ -0,0 +1,108 @@
+import logging
+
+import numpy as np
+import shapely
+from shapely.geometry.polygon import LinearRing
+
+from core.tin.adaptive_tin import AdaptiveTin
+from core.tin.grid import Grid
+from core.tin.triangulator import TriangleTriangulator
+
+
+class TestAdaptiveTin:
+    polygon = shapely.box(1.0, 1.0, 9.0, 9.0)
+
+    def create_tin(self, raster_points: np.ndarray, max_height_error: float):
+        grid = Grid(raster_points, 0.5)
+        rings = [LinearRing(ring) for ring in grid.densify_rings([np.asarray(self.polygon.exterior.coords)])]
+        within = raster_points[shapely.contains_xy(self.polygon, raster_points[:, 0], raster_points[:, 1])]
+        vertices, faces = AdaptiveTin(TriangleTriangulator(), grid, max_height_error).triangulate(
+            self.polygon, rings[0], [], within)
+        heights, valid = grid.get_heights_for_vertices(vertices)
+        assert valid.all()
+        return vertices, faces, heights, within
+
+    def test_plane_needs_no_interior_points(self, create_raster_points):
+        raster_points = create_raster_points(lambda x, y: 400.0 + 0.1 * x + 0.2 * y, 21)
+
+        vertices, faces, _, within = self.create_tin(raster_points, 0.01)
+
+        assert len(faces) > 0
+        assert not shapely.contains_xy(self.polygon.buffer(-1e-6), vertices[:, 0], vertices[:, 1]).any()
+
+    def test_max_height_error_is_met_at_every_raster_point(self, create_raster_points):
+        raster_points = create_raster_points(lambda x, y: 400.0 + np.sin(x) * np.cos(0.7 * y), 21)
+        max_height_error = 0.05
+
+        vertices, faces, heights, within = self.create_tin(raster_points, max_height_error)
+
+        triangles = shapely.polygons(vertices[faces])
+        point_indices, face_indices = shapely.STRtree(triangles).query(shapely.points(within[:, :2]),
+                                                                       predicate="intersects")
+        assert set(point_indices) == set(range(len(within)))
+        corners = vertices[faces[face_indices]]
+        corner_heights = heights[faces[face_indices]]
+        tin_heights = Grid.interpolate_vectorized(
+            within[point_indices, 0], within[point_indices, 1],
+            corners[:, 0, 0], corners[:, 0, 1], corner_heights[:, 0],
+            corners[:, 1, 0], corners[:, 1, 1], corner_heights[:, 1],
+            corners[:, 2, 0], corners[:, 2, 1], corner_heights[:, 2])
+        assert np.max(np.abs(tin_heights - within[point_indices, 2])) <= max_height_error + 1e-9
+        assert len(vertices) < len(within)
+
+    def test_zero_max_height_error_inserts_points_until_exact(self, create_raster_points):
+        raster_points = create_raster_points(lambda x, y: 400.0 + np.sin(3 * x) * np.cos(2 * y), 21)
+
+        vertices, faces, heights, within = self.create_tin(raster_points, 0.0)
+
+        # every raster point is inserted at most once, so the refinement ends even without tolerance
+        assert len(faces) > 0
+        assert len(vertices) <= len(within) + len(self.polygon.exterior.coords) * 16
+
+    def test_locate_points_finds_every_point_within_the_triangles(self, create_raster_points):
+        raster_points = create_raster_points(lambda x, y: 400.0 + x, 21)
+        grid = Grid(raster_points, 0.5)
+        tin = AdaptiveTin(TriangleTriangulator(), grid, 0.05)
+        vertices = np.array([[0.25, 0.25], [9.75, 0.25], [9.75, 9.75], [0.25, 9.75]])
+        faces = np.array([[0, 1, 2], [0, 2, 3]])
+
+        point_indices, face_indices = tin.locate_points(vertices, faces, tin.create_point_grid(raster_points))
+
+        inside = (raster_points[:, :2] > 0.25).all(axis=1) & (raster_points[:, :2] < 9.75).all(axis=1)
+        assert set(point_indices) == set(np.flatnonzero(inside))
+        # points on the shared diagonal are returned for both triangles
+        diagonal = raster_points[point_indices, 0] == raster_points[point_indices, 1]
+        assert set(face_indices[diagonal]) == {0, 1}
+
+    def test_points_outside_the_triangulation_are_reported(self, create_raster_points, caplog):
+        raster_points = create_raster_points(lambda x, y: 400.0 + np.sin(x), 21)
+        grid = Grid(raster_points, 0.5)
+        corners = np.array([[0.0, 0.0], [10.0, 0.0], [10.0, 10.0], [0.0, 10.0]])
+
+        def triangulate(points):
+            # a triangulator losing the triangles at the left edge, like a clipping pass removing triangles
+            vertices, faces = TriangleTriangulator().triangulate_segments(
+                np.vstack([corners, points]), np.array([[0, 1], [1, 2], [2, 3], [3, 0]]))
+            centroids = vertices[faces].mean(axis=1)
+            return vertices, faces[centroids[:, 0] > 3.0]
+
+        with caplog.at_level(logging.WARNING):
+            _, faces = AdaptiveTin(TriangleTriangulator(), grid, 0.05).refine(triangulate, raster_points)
+
+        assert len(faces) > 0
+        assert "raster points outside the adaptive tin" in caplog.text
+        assert "exceed the maximum height error" not in caplog.text
+
+    def test_error_bound_violation_is_reported(self, create_raster_points, caplog):
+        raster_points = create_raster_points(lambda x, y: 400.0 + np.sin(x), 21)
+        grid = Grid(raster_points, 0.5)
+        vertices = np.array([[0.0, 0.0], [10.0, 0.0], [10.0, 10.0], [0.0, 10.0]])
+
+        def triangulate(points):
+            # a triangulator ignoring the inserted points can not meet the bound
+            return vertices, np.array([[0, 1, 2], [0, 2, 3]])
+
+        with caplog.at_level(logging.WARNING):
+            AdaptiveTin(TriangleTriangulator(), grid, 0.05).refine(triangulate, raster_points)
+
+        assert "exceed the maximum height error" in caplog.text
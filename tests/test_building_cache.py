@@ -0,0 +1,38 @@
+import numpy as np
+
+from config.configuration import config
+from service.building_cache import BuildingCache
+
+
+class TestBuildingCache:
+
+    def test_key_depends_on_egid_asset_and_feature_type(self):
+        feature_type = config.ifc.building_feature_types[0]
+        key = BuildingCache.create_key("1", "buildings_2024.gml.zip", feature_type)
+
+        assert key == BuildingCache.create_key("1", "buildings_2024.gml.zip", feature_type.model_copy())
+        assert key != BuildingCache.create_key("2", "buildings_2024.gml.zip", feature_type)
+        assert key != BuildingCache.create_key("1", "buildings_2025.gml.zip", feature_type)
+        assert key != BuildingCache.create_key("1", "buildings_2024.gml.zip",
+                                               feature_type.model_copy(update={"egid_xpath": ".//gen:value"}))
+
+    def test_add_and_get_round_trip(self, tmp_path):
+        cache = BuildingCache(1, str(tmp_path))
+        rings = [np.array([[0.0, 0.0, 1.0], [1.0, 0.0, 2.0], [0.0, 1.0, 3.0]]), np.zeros((4, 3))]
+        layout = [{"values": {"./gen:value": "1", "./gen:other": None}, "geometries": [[[2]]]}]
+
+        assert cache.get("a") is None
+        cache.add("a", layout, rings)
+        cached_layout, cached_rings = cache.get("a")
+
+        assert cached_layout == layout
+        assert len(cached_rings) == 2
+        for cached_ring, ring in zip(cached_rings, rings):
+            np.testing.assert_array_equal(cached_ring, ring)
+
+    def test_add_without_rings(self, tmp_path):
+        cache = BuildingCache(1, str(tmp_path))
+
+        cache.add("a", [{"values": {}, "geometries": [[]]}], [])
+
+        assert cache.get("a") == ([{"values": {}, "geometries": [[]]}], [])
@@ -0,0 +1,211 @@
+import numpy as np
+from shapely import Point
+
+from config.configuration import config
+from core.processors.building_processor import BuildingProcessor
+from core.processors.city_gml_reader import CityGmlReader
+from service.building_cache import BuildingCache
+from service.city_gml_index import CityGmlIndex
+
+CITY_GML_HEADER = """<?xml version="1.0" encoding="UTF-8"?>
+<core:CityModel xmlns:core="http://www.opengis.net/citygml/2.0" xmlns:bldg="http://www.opengis.net/citygml/building/2.0"
+  xmlns:gen="http://www.opengis.net/citygml/generics/2.0" xmlns:gml="http://www.opengis.net/gml">
+"""
+
+
+def create_cube_polygons(x: float, y: float) -> list[list[tuple[float, float, float]]]:
+    corners = [(x, y), (x + 1, y), (x + 1, y + 1), (x, y + 1)]
+    bottom = [(cx, cy, 0.0) for cx, cy in reversed(corners)]
+    top = [(cx, cy, 1.0) for cx, cy in corners]
+    sides = [[(*corners[i], 0.0), (*corners[(i + 1) % 4], 0.0), (*corners[(i + 1) % 4], 1.0), (*corners[i], 1.0)]
+             for i in range(4)]
+    return [bottom, top] + sides
+
+
+def create_building_gml(egid: str, x: float, y: float) -> str:
+    surface_members = "".join(
+        "<gml:surfaceMember><gml:Polygon><gml:exterior><gml:LinearRing><gml:posList>"
+        + " ".join(f"{c}" for point in polygon + [polygon[0]] for c in point)
+        + "</gml:posList></gml:LinearRing></gml:exterior></gml:Polygon></gml:surfaceMember>"
+        for polygon in create_cube_polygons(x, y))
+    return f"""<core:cityObjectMember><bldg:Building gml:id="b{egid}">
+  <gen:intAttribute name="EGID"><gen:value>{egid}</gen:value></gen:intAttribute>
+  <bldg:lod2Solid><gml:Solid srsName="EPSG:2056" srsDimension="3"><gml:exterior><gml:CompositeSurface>
+  {surface_members}
+  </gml:CompositeSurface></gml:exterior></gml:Solid></bldg:lod2Solid>
+</bldg:Building></core:cityObjectMember>
+"""
+
+
+def create_city_gml(path, buildings: dict[str, tuple[float, float]]) -> str:
+    content = CITY_GML_HEADER + "".join(create_building_gml(egid, x, y) for egid, (x, y) in buildings.items())
+    path.write_text(content + "</core:CityModel>\n")
+    return str(path)
+
+
+class DummyPostgisService:
+    def __init__(self, egids_by_sql: dict[str, list[str]]):
+        self.egids_by_sql = egids_by_sql
+
+    def fetch_feature_type_elements(self, sql, polygon):
+        return [{"egid": egid} for egid in self.egids_by_sql[sql]]
+
+
+class DummyStacService:
+    def __init__(self, city_gmls: list[str]):
+        self.city_gmls = city_gmls
+        self.asset_ids_by_file = {}
+
+    def fetch_city_gml_assets(self, bounding_box):
+        return self.city_gmls
+
+
+class TestBuildingProcessor:
+
+    def test_process_indexes_every_file_once_and_dispatches_to_feature_types(self, tmp_path, monkeypatch):
+        city_gml = create_city_gml(tmp_path / "tile.gml", {"1": (0, 0), "2": (5, 0), "3": (10, 0)})
+        template = config.ifc.building_feature_types[0]
+        feature_types = []
+        for name, sql in [("residential", "residential"), ("industrial", "industrial")]:
+            sql_path = tmp_path / f"{name}.sql"
+            sql_path.write_text(sql)
+            feature_types.append(template.model_copy(update={"name": name, "sql_path": str(sql_path)}))
+        monkeypatch.setattr(config.ifc, "building_feature_types", feature_types)
+
+        builds = []
+        build = CityGmlIndex.build.__func__
+
+        def counting_build(cls, *args):
+            builds.append(args[0])
+            return build(cls, *args)
+
+        monkeypatch.setattr(CityGmlIndex, "build", classmethod(counting_build))
+
+        processor = BuildingProcessor.__new__(BuildingProcessor)
+        processor.postgis_service = DummyPostgisService({"residential": ["1", "3"], "industrial": ["2", "3"]})
+        processor.stac_service = DummyStacService([city_gml])
+        processor.building_cache = BuildingCache(0, str(tmp_path / "buildings"))
+
+        buildings_by_key = processor.process("POLYGON((0 0, 20 0, 20 20, 0 20, 0 0))", Point(0, 0, 0))
+        processor.process("POLYGON((0 0, 20 0, 20 20, 0 20, 0 0))", Point(0, 0, 0))
+
+        assert builds == [city_gml]
+        assert list(buildings_by_key.keys()) == ["residential", "industrial"]
+        names = {key: [building.attributes["Name"] for building in buildings]
+                 for key, buildings in buildings_by_key.items()}
+        assert names == {"residential": ["1", "3"], "industrial": ["2", "3"]}
+        assert len(buildings_by_key["residential"][0].building_parts) == 1
+
+    def test_process_reads_requested_buildings_of_every_file(self, tmp_path, monkeypatch):
+        city_gmls = [create_city_gml(tmp_path / "tile_1.gml", {"1": (0, 0), "2": (5, 0)}),
+                     create_city_gml(tmp_path / "tile_2.gml", {"3": (10, 0), "4": (15, 0)})]
+        sql_path = tmp_path / "residential.sql"
+        sql_path.write_text("residential")
+        template = config.ifc.building_feature_types[0]
+        monkeypatch.setattr(config.ifc, "building_feature_types",
+                            [template.model_copy(update={"name": "residential", "sql_path": str(sql_path)})])
+
+        processor = BuildingProcessor.__new__(BuildingProcessor)
+        processor.postgis_service = DummyPostgisService({"residential": ["2", "3", "4"]})
+        processor.stac_service = DummyStacService(city_gmls)
+        processor.building_cache = BuildingCache(0, str(tmp_path / "buildings"))
+
+        buildings_by_key = processor.process("POLYGON((0 0, 20 0, 20 20, 0 20, 0 0))", Point(0, 0, 0))
+
+        assert [building.attributes["Name"] for building in buildings_by_key["residential"]] == ["2", "3", "4"]
+
+    def test_process_reads_files_in_worker_processes_in_file_order(self, tmp_path, monkeypatch):
+        city_gmls = [create_city_gml(tmp_path / f"tile_{index}.gml", {str(10 * index + i): (5 * i, 5 * index)
+                                                                       for i in range(3)}) for index in range(3)]
+        sql_path = tmp_path / "all.sql"
+        sql_path.write_text("all")
+        feature_type = config.ifc.building_feature_types[0].model_copy(update={"name": "all",
+                                                                               "sql_path": str(sql_path)})
+        monkeypatch.setattr(config.ifc, "building_feature_types", [feature_type])
+
+        processor = BuildingProcessor.__new__(BuildingProcessor)
+        processor.postgis_service = DummyPostgisService({"all": ["21", "1", "12", "0", "20"]})
+        processor.stac_service = DummyStacService(city_gmls)
+        processor.building_cache = BuildingCache(0, str(tmp_path / "buildings"))
+
+        results = []
+        for workers in [1, 3]:
+            monkeypatch.setattr(config.processing, "workers", workers)
+            buildings = processor.process("POLYGON((0 0, 20 0, 20 20, 0 20, 0 0))", Point(1, 2, 3))["all"]
+            results.append([(building.attributes["Name"], [tuple(vertex) for polygon in
+                                                           building.building_parts[0].gml_geometry.exterior.polygons
+                                                           for vertex in polygon.exterior.coordinates.tolist()])
+                            for building in buildings])
+
+        assert [name for name, _ in results[0]] == ["0", "1", "12", "20", "21"]
+        assert results[0] == results[1]
+        assert results[0][0][1][0] == (-1.0, -1.0, -3.0)
+
+    def test_process_reuses_cached_buildings_with_project_origin(self, tmp_path, monkeypatch):
+        city_gml = create_city_gml(tmp_path / "tile.gml", {"1": (0, 0), "2": (5, 0), "3": (10, 0)})
+        sql_path = tmp_path / "all.sql"
+        sql_path.write_text("all")
+        feature_type = config.ifc.building_feature_types[0].model_copy(update={"name": "all",
+                                                                               "sql_path": str(sql_path)})
+        monkeypatch.setattr(config.ifc, "building_feature_types", [feature_type])
+
+        reads = []
+        read_building = CityGmlIndex.read_building
+
+        def counting_read_building(index, file, start, end):
+            reads.append(start)
+            return read_building(index, file, start, end)
+
+        monkeypatch.setattr(CityGmlIndex, "read_building", counting_read_building)
+
+        processor = BuildingProcessor.__new__(BuildingProcessor)
+        processor.postgis_service = DummyPostgisService({"all": ["3", "1"]})
+        processor.stac_service = DummyStacService([city_gml])
+        processor.stac_service.asset_ids_by_file[city_gml] = "buildings_2024.gml.zip"
+        processor.building_cache = BuildingCache(1, str(tmp_path / "buildings"))
+
+        def get_vertices(buildings):
+            return [[polygon.exterior.coordinates for polygon in
+                     building.building_parts[0].gml_geometry.exterior.polygons] for building in buildings]
+
+        created = processor.process("POLYGON((0 0, 20 0, 20 20, 0 20, 0 0))", Point(1, 2, 3))["all"]
+        assert len(reads) == 2
+        cached = processor.process("POLYGON((0 0, 20 0, 20 20, 0 20, 0 0))", Point(1, 2, 3))["all"]
+        assert len(reads) == 2
+        shifted = processor.process("POLYGON((0 0, 20 0, 20 20, 0 20, 0 0))", Point(0, 0, 0))["all"]
+        assert len(reads) == 2
+
+        assert [building.attributes["Name"] for building in cached] == ["1", "3"]
+        for created_rings, cached_rings, shifted_rings in zip(get_vertices(created), get_vertices(cached),
+                                                              get_vertices(shifted)):
+            for created_ring, cached_ring, shifted_ring in zip(created_rings, cached_rings, shifted_rings):
+                np.testing.assert_array_equal(cached_ring, created_ring)
+                np.testing.assert_array_equal(shifted_ring, created_ring + [1, 2, 3])
+
+        processor.stac_service.asset_ids_by_file[city_gml] = "buildings_2025.gml.zip"
+        processor.process("POLYGON((0 0, 20 0, 20 20, 0 20, 0 0))", Point(1, 2, 3))
+        assert len(reads) == 4
+
+    def test_read_returns_compact_buildings_and_splits_cached_rings_per_building(self, tmp_path):
+        city_gml = tmp_path / "tile.gml"
+        city_gml.write_text(CITY_GML_HEADER + create_building_gml("1", 0, 0) + create_building_gml("2", 5, 0)
+                            + create_building_gml("1", 10, 0) + "</core:CityModel>\n")
+        reader = CityGmlReader({"all": config.ifc.building_feature_types[0]},
+                               {"all": {"1": {"egid": "1"}, "2": {"egid": "2"}}}, Point(1, 2, 3),
+                               BuildingCache(1, str(tmp_path / "buildings")), {})
+
+        created = reader.read(str(city_gml))
+        cached = reader.read(str(city_gml))
+
+        for city_gml_buildings in [created, cached]:
+            assert [egid for egid, _ in city_gml_buildings.buildings_by_key["all"]] == ["1", "2", "1"]
+            # six rings of four vertices per cube, packed into one array
+            assert city_gml_buildings.coordinates_by_key["all"].shape == (3 * 6 * 4, 3)
+            assert city_gml_buildings.ring_sizes_by_key["all"].tolist() == [4] * 3 * 6
+        np.testing.assert_array_equal(cached.coordinates_by_key["all"], created.coordinates_by_key["all"])
+
+        buildings = reader.create_buildings(cached)["all"]
+        corners = [np.vstack([polygon.exterior.coordinates for polygon in
+                              building.building_parts[0].gml_geometry.exterior.polygons]).min(axis=0).tolist()
+                   for building in buildings]
+        assert corners == [[-1.0, -2.0, -3.0], [4.0, -2.0, -3.0], [9.0, -2.0, -3.0]]
@@ -0,0 +1,80 @@
+import os
+from zipfile import ZipFile, ZIP_DEFLATED
+
+from service.asset_file import AssetFile
+from service.city_gml_index import CityGmlIndex
+from tests.test_building_processor import create_city_gml
+from utils.namespace import namespace
+
+EGID_XPATH = ".//gen:intAttribute[@name='EGID']/gen:value"
+
+
+class TestCityGmlIndex:
+
+    def test_build_maps_egids_to_building_fragments(self, tmp_path):
+        city_gml = create_city_gml(tmp_path / "tile.gml", {"1": (0, 0), "2": (5, 0), "3": (10, 0)})
+
+        index = CityGmlIndex.build(city_gml, EGID_XPATH)
+        buildings = list(index.read_buildings(index.get_ranges({"3", "1", "4"})))
+
+        assert sorted(index.ranges_by_egid.keys()) == ["1", "2", "3"]
+        assert [building.get("{http://www.opengis.net/gml}id") for building in buildings] == ["b1", "b3"]
+        assert buildings[0].find(EGID_XPATH, namespaces=namespace).text == "1"
+
+    def test_open_stores_index_and_rebuilds_outdated_index(self, tmp_path):
+        city_gml = create_city_gml(tmp_path / "tile.gml", {"1": (0, 0)})
+
+        index = CityGmlIndex.open(city_gml, EGID_XPATH)
+        assert os.path.exists(CityGmlIndex.get_index_path(city_gml, EGID_XPATH))
+        assert CityGmlIndex.open(city_gml, EGID_XPATH).ranges_by_egid == index.ranges_by_egid
+
+        create_city_gml(tmp_path / "tile.gml", {"7": (0, 0), "8": (5, 0)})
+        os.utime(city_gml, (0, 0))
+
+        assert sorted(CityGmlIndex.open(city_gml, EGID_XPATH).ranges_by_egid.keys()) == ["7", "8"]
+
+    def test_build_scans_chunks_and_zip_members(self, tmp_path, monkeypatch):
+        city_gml = create_city_gml(tmp_path / "tile.gml", {str(egid): (5 * egid, 0) for egid in range(10)})
+        zip_path = tmp_path / "tile.gml.zip"
+        with ZipFile(zip_path, "w", ZIP_DEFLATED) as zip_file:
+            zip_file.write(city_gml, "tile.gml")
+        city_gml_member = AssetFile.join(str(zip_path), "tile.gml")
+        index = CityGmlIndex.build(city_gml, EGID_XPATH)
+
+        monkeypatch.setattr(CityGmlIndex, "SCAN_CHUNK_SIZE", 300)
+        for path in [city_gml, city_gml_member]:
+            assert CityGmlIndex.build(path, EGID_XPATH).ranges_by_egid == index.ranges_by_egid
+
+        member_index = CityGmlIndex.open(city_gml_member, EGID_XPATH)
+        buildings = list(member_index.read_buildings(member_index.get_ranges({"8", "2"})))
+
+        index_path = CityGmlIndex.get_index_path(city_gml_member, EGID_XPATH)
+        assert os.path.dirname(index_path) == str(tmp_path)
+        assert os.path.basename(index_path).startswith("tile.gml.zip.tile.gml.")
+        assert os.path.exists(index_path)
+        assert [building.get("{http://www.opengis.net/gml}id") for building in buildings] == ["b2", "b8"]
+
+    def test_build_applies_namespaces_declared_below_the_root(self, tmp_path):
+        city_gml = create_city_gml(tmp_path / "tile.gml", {"1": (0, 0), "2": (5, 0)})
+        content = open(city_gml).read()
+        gen_declaration = ' xmlns:gen="http://www.opengis.net/citygml/generics/2.0"'
+        content = content.replace(gen_declaration.replace(" ", "\n  ", 1), "")
+        content = content.replace("<core:cityObjectMember>", f"<core:cityObjectMember{gen_declaration}>")
+        open(city_gml, "w").write(content)
+
+        index = CityGmlIndex.open(city_gml, EGID_XPATH)
+        buildings = list(CityGmlIndex.open(city_gml, EGID_XPATH).read_buildings(index.get_ranges({"1", "2"})))
+
+        assert sorted(index.ranges_by_egid.keys()) == ["1", "2"]
+        assert [building.find(EGID_XPATH, namespaces=namespace).text for building in buildings] == ["1", "2"]
+
+    def test_build_skips_fragments_which_can_not_be_parsed(self, tmp_path, caplog):
+        city_gml = create_city_gml(tmp_path / "tile.gml", {"1": (0, 0), "2": (5, 0)})
+        content = open(city_gml).read()
+        open(city_gml, "w").write(content.replace('<bldg:Building gml:id="b1">',
+                                                  '<bldg:Building gml:id="b1"><undeclared:name/>'))
+
+        index = CityGmlIndex.build(city_gml, EGID_XPATH)
+
+        assert list(index.ranges_by_egid.keys()) == ["2"]
+        assert "skip building fragment" in caplog.text
@@ -3,7 +3,9 @@ import pytest
 from pathlib import Path
 from unittest.mock import patch
 
-from config.configuration import Configuration
+from pydantic import ValidationError
+
+from config.configuration import BuildingFeatureType, BuildingSourceConfig, Configuration
 from config.geo_referencing import GeoReferencing
 
 
@@ -57,3 +59,27 @@ class TestConfiguration:
         with pytest.raises(ValueError) as exc_info:
             Configuration.load(config_paths["invalid_building_config"].as_posix())
         assert "stac.dtm_items_url is required" in str(exc_info.value)
+
+    @pytest.mark.parametrize("egid_xpath, expression, xpath", [
+        ("./gen:value[", "./gen:value", "./gml:Solid"),
+        ("./gen:value", "./unknown:value", "./gml:Solid"),
+        ("./gen:value", "./gen:value", "./gml:Solid]"),
+    ])
+    def test_invalid_building_xpath(self, egid_xpath, expression, xpath):
+        with pytest.raises(ValidationError) as exc_info:
+            BuildingFeatureType.model_validate({
+                "name": "test_building",
+                "sql_path": "/test/sql/test.sql",
+                "egid_xpath": egid_xpath,
+                "entity_mapping": {
+                    "entity": "IfcBuilding",
+                    "attributes": [{"attribute": "Name", "source": {"type": "CITY_GML", "expression": expression}}],
+                    "building_parts": [{"entity": "IfcBuildingElementProxy",
+                                        "geometry_mapping": {"xpath": xpath, "geometry": "SOLID"}}]
+                }
+            })
+        assert "invalid XPath expression" in str(exc_info.value)
+
+    def test_static_building_expression_is_not_compiled(self):
+        source = BuildingSourceConfig.model_validate({"type": "STATIC", "expression": "not [an xpath"})
+        assert source.expression == "not [an xpath"
@@ -0,0 +1,86 @@
+from zipfile import ZipFile, ZIP_DEFLATED
+
+import numpy as np
+import shapely
+
+from service.asset_file import AssetFile
+from service.dtm_tile_store import DtmTileStore
+
+
+class TestDtmTileStore:
+
+    def test_convert_writes_memory_mapped_tile_and_removes_xyz(self, tmp_path):
+        xyz_path = tmp_path / "tile.xyz"
+        xyz_path.write_text("X Y Z\n2600000.25 1200000.25 400.5\n2600000.75 1200000.25 401.0\n")
+
+        tile_path = DtmTileStore.convert(str(xyz_path))
+
+        assert tile_path.endswith(".npy")
+        assert not xyz_path.exists()
+        data = DtmTileStore.open(tile_path)
+        assert isinstance(data, np.memmap)
+        assert data.shape == (2, 3)
+        np.testing.assert_array_equal(data[1], [2600000.75, 1200000.25, 401.0])
+
+    def test_convert_streams_zip_member_and_keeps_zip(self, tmp_path):
+        zip_path = tmp_path / "tile.xyz.zip"
+        with ZipFile(zip_path, "w", ZIP_DEFLATED) as zip_file:
+            zip_file.writestr("data/swissalti3d_tile.xyz", "X Y Z\n2600000.25 1200000.25 400.5\n")
+
+        tile_path = DtmTileStore.convert(AssetFile.join(str(zip_path), "data/swissalti3d_tile.xyz"))
+
+        assert tile_path == str(tmp_path / "swissalti3d_tile.npy")
+        assert zip_path.exists()
+        np.testing.assert_array_equal(DtmTileStore.open(tile_path), [[2600000.25, 1200000.25, 400.5]])
+
+    def test_open_parses_xyz_files_and_single_rows(self, tmp_path):
+        xyz_path = tmp_path / "tile.xyz"
+        xyz_path.write_text("X Y Z\n1.0 2.0 3.0\n")
+
+        data = DtmTileStore.open(str(xyz_path))
+
+        assert data.shape == (1, 3)
+        np.testing.assert_array_equal(data[0], [1.0, 2.0, 3.0])
+
+    def test_read_within_streams_chunks_and_keeps_points_in_region(self, tmp_path, monkeypatch):
+        xs, ys = np.meshgrid(np.arange(10.0), np.arange(10.0))
+        data = np.column_stack([xs.ravel(), ys.ravel(), np.arange(100.0)])
+        tile_path = tmp_path / "tile.npy"
+        np.save(tile_path, data)
+        xyz_path = tmp_path / "tile.xyz"
+        np.savetxt(xyz_path, data, delimiter=" ", header="X Y Z", comments="")
+        monkeypatch.setattr(DtmTileStore, "CHUNK_ROWS", 7)
+        region = shapely.union_all([shapely.box(0, 0, 1, 1), shapely.box(8, 8, 20, 20)])
+
+        zip_path = tmp_path / "tile.zip"
+        with ZipFile(zip_path, "w", ZIP_DEFLATED) as zip_file:
+            zip_file.write(xyz_path, "data/tile.xyz")
+        for path in [tile_path, xyz_path, AssetFile.join(str(zip_path), "data/tile.xyz")]:
+            points = DtmTileStore.read_within(str(path), region)
+
+            assert not isinstance(points, np.memmap)
+            np.testing.assert_array_equal(points[:, 2], [0, 1, 10, 11, 88, 89, 98, 99])
+
+    def test_read_within_returns_empty_array_outside_region(self, tmp_path):
+        tile_path = tmp_path / "tile.npy"
+        np.save(tile_path, np.zeros((4, 3)))
+
+        points = DtmTileStore.read_within(str(tile_path), shapely.box(5, 5, 6, 6))
+
+        assert points.shape == (0, 3)
+
+    def test_pixel_window_covers_bounds_and_is_clipped(self):
+        transform = (2600000.0, 0.5, 1201000.0, -0.5)
+
+        window = DtmTileStore.get_pixel_window((2600010.2, 1200990.1, 2600011.0, 1200999.9), transform, 2000, 2000)
+        clipped = DtmTileStore.get_pixel_window((2599990.0, 1200000.0, 2600001.0, 1201010.0), transform, 2000, 2000)
+
+        assert window == (20, 0, 2, 20)
+        assert clipped == (0, 0, 2, 2000)
+
+    def test_pixels_to_xyz_returns_pixel_centers_without_nodata(self):
+        heights = np.array([[400.0, -9999.0], [np.nan, 401.5]], dtype=np.float32)
+
+        points = DtmTileStore.pixels_to_xyz(heights, (2600000.0, 0.5, 1201000.0, -0.5), 20, 2, -9999.0)
+
+        np.testing.assert_array_equal(points, [[2600010.25, 1200998.75, 400.0], [2600010.75, 1200998.25, 401.5]])
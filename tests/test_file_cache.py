@@ -1,5 +1,6 @@
 from pathlib import Path
 
+from service.asset_file import AssetFile
 from service.file_cache import FileCache, CacheEntry
 import service.file_cache as fc
 
@@ -21,28 +22,31 @@ class DummyRedis:
         self.store.pop(key, None)
 
 
-class TestFileCache:
+def create_cache(monkeypatch) -> FileCache:
+    dummy = DummyRedis()
+    monkeypatch.setattr(fc.redis, "Redis", lambda host, port, db: dummy)
 
-    def test_add_and_get_with_expiry_and_file_presence(self, monkeypatch, tmp_path):
-        dummy = DummyRedis()
-        monkeypatch.setattr(fc.redis, "Redis", lambda host, port, db: dummy)
+    class DummyRedisCfg:
+        def __init__(self):
+            class DB:
+                file_cache = 0
+
+            self.host = "localhost"
+            self.port = 6379
+            self.db = DB()
 
-        class DummyRedisCfg:
-            def __init__(self):
-                class DB:
-                    file_cache = 0
+    class DummyCfg:
+        def __init__(self):
+            self.redis = DummyRedisCfg()
 
-                self.host = "localhost"
-                self.port = 6379
-                self.db = DB()
+    monkeypatch.setattr(fc, "config", DummyCfg())
+    return FileCache()
 
-        class DummyCfg:
-            def __init__(self):
-                self.redis = DummyRedisCfg()
 
-        monkeypatch.setattr(fc, "config", DummyCfg())
+class TestFileCache:
 
-        cache = FileCache()
+    def test_add_and_get_with_expiry_and_file_presence(self, monkeypatch, tmp_path):
+        cache = create_cache(monkeypatch)
 
         file_path = tmp_path / "f.txt"
         file_path.write_text("x")
@@ -54,3 +58,18 @@ class TestFileCache:
 
         file_path.unlink()
         assert cache.get("k1") is None
+
+    def test_expired_zip_is_removed_with_its_egid_indexes(self, monkeypatch, tmp_path):
+        cache = create_cache(monkeypatch)
+        zip_path = tmp_path / "tile.gml.zip"
+        zip_path.write_text("x")
+        index_path = tmp_path / "tile.gml.zip.tile.gml.0123456789abcdef.egid.json"
+        index_path.write_text("{}")
+        other_index_path = tmp_path / "other.gml.zip.other.gml.0123456789abcdef.egid.json"
+        other_index_path.write_text("{}")
+        cache.add("tile.gml.zip", AssetFile.join(str(zip_path), "tile.gml"), ttl=-1.0)
+
+        assert cache.get("tile.gml.zip") is None
+        assert not zip_path.exists()
+        assert not index_path.exists()
+        assert other_index_path.exists()
@@ -0,0 +1,62 @@
+import numpy as np
+
+from core.tin.grid import Grid
+
+
+ORIGIN = (2600000.25, 1200000.25)
+
+
+def plane(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    return 400.0 + 0.1 * (x - 2600000.0) + 0.2 * (y - 1200000.0)
+
+
+class TestGrid:
+
+    def test_heights_are_stored_by_index(self, create_raster_points):
+        raster_points = create_raster_points(plane, 4, 3, origin=ORIGIN)
+        # shuffle and add rounding noise, the raster must still be reconstructed
+        raster_points = raster_points[np.random.default_rng(0).permutation(len(raster_points))]
+        raster_points[:, :2] += 1e-9
+        grid = Grid(raster_points, 0.5)
+
+        assert grid.heights.shape == (3, 4)
+        assert not np.isnan(grid.heights).any()
+
+    def test_heights_for_vertices_interpolate_plane(self, create_raster_points):
+        grid = Grid(create_raster_points(plane, 4, 3, origin=ORIGIN), 0.5)
+        vertices = np.array([[2600000.25, 1200000.25], [2600001.0, 1200000.6], [2600001.75, 1200001.25]])
+
+        heights, valid = grid.get_heights_for_vertices(vertices)
+
+        assert valid.all()
+        expected = 400.0 + 0.1 * (vertices[:, 0] - 2600000.0) + 0.2 * (vertices[:, 1] - 1200000.0)
+        np.testing.assert_allclose(heights, expected)
+
+    def test_heights_for_vertices_interpolate_in_lower_or_upper_cell_triangle(self):
+        grid = Grid(np.array([[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [1.0, 1.0, 1.0]]), 1.0)
+
+        heights, valid = grid.get_heights_for_vertices(np.array([[0.25, 0.25], [0.5, 0.5], [0.75, 0.75]]))
+
+        assert valid.all()
+        np.testing.assert_allclose(heights, [0.0, 0.0, 0.5])
+
+    def test_heights_for_vertices_report_missing_or_outside(self, create_raster_points):
+        raster_points = create_raster_points(plane, 4, 3, origin=ORIGIN)
+        grid = Grid(raster_points[1:], 0.5)
+
+        heights, valid = grid.get_heights_for_vertices(np.array([
+            [2600000.3, 1200000.3], [2600003.0, 1200000.3], [2600001.0, 1200000.6]]))
+
+        assert valid.tolist() == [False, False, True]
+        assert np.isnan(heights[~valid]).all()
+
+    def test_densify_rings_adds_sorted_grid_line_intersections(self):
+        xs, ys = np.meshgrid(np.arange(3.0), np.arange(3.0))
+        grid = Grid(np.column_stack([xs.ravel(), ys.ravel(), np.zeros(9)]), 1.0)
+        ring = np.array([[0.25, 0.25], [1.75, 0.25], [0.25, 1.75], [0.25, 0.25]])
+
+        densified_ring, = grid.densify_rings([ring])
+
+        np.testing.assert_allclose(densified_ring, [
+            [0.25, 0.25], [0.75, 0.25], [1.0, 0.25], [1.75, 0.25], [1.0, 1.0], [0.25, 1.75], [0.25, 1.0],
+            [0.25, 0.75]])
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from core.tin import kernels
+
+
+def create_heights() -> np.ndarray:
+    heights = np.random.default_rng(0).normal(400.0, 2.0, (30, 40))
+    heights[5, 7] = np.nan
+    return heights
+
+
+def create_points(n: int = 2000) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(1)
+    # includes points outside the raster and exactly on raster points and borders
+    x = np.concatenate([rng.uniform(2599999.0, 2600021.0, n), 2600000.0 + 0.5 * np.arange(40), [2600019.5]])
+    y = np.concatenate([rng.uniform(1199999.0, 1200016.0, n), np.full(40, 1200000.0), [1200014.5]])
+    return x, y
+
+
+def create_keys() -> np.ndarray:
+    keys = np.random.default_rng(2).integers(0, 8, (3000, 3))
+    return np.vstack([keys, keys[::-1]])
+
+
+class TestKernels:
+
+    def assert_interpolation_equal(self, implementation):
+        x, y = create_points()
+        args = (create_heights(), 2600000.0, 1200000.0, 0.5, 1e-6, x, y)
+
+        expected_heights, expected_valid = kernels.interpolate_grid_numpy(*args)
+        heights, valid = implementation(*args)
+
+        np.testing.assert_array_equal(valid, expected_valid)
+        np.testing.assert_array_equal(heights, expected_heights)
+        assert 0 < np.count_nonzero(valid) < len(x)
+
+    def assert_weld_equal(self, implementation):
+        keys = create_keys()
+
+        expected_first, expected_inverse = kernels.weld_numpy(keys)
+        first, inverse = implementation(keys)
+
+        np.testing.assert_array_equal(first, expected_first)
+        np.testing.assert_array_equal(inverse, expected_inverse)
+        np.testing.assert_array_equal(keys[first][inverse], keys)
+
+    def test_interpolation_loop_equals_numpy(self):
+        self.assert_interpolation_equal(kernels.interpolate_grid_loop)
+
+    def test_weld_loop_equals_numpy(self):
+        self.assert_weld_equal(kernels.weld_loop)
+
+    def test_compiled_interpolation_equals_numpy(self):
+        pytest.importorskip("numba")
+        self.assert_interpolation_equal(kernels.interpolate_grid)
+
+    def test_compiled_weld_equals_numpy(self):
+        pytest.importorskip("numba")
+        self.assert_weld_equal(kernels.weld)
+        first, inverse = kernels.weld(np.empty((0, 3), dtype=np.int64))
+        assert len(first) == 0 and len(inverse) == 0
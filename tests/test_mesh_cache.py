@@ -0,0 +1,57 @@
+import os
+
+import numpy as np
+import shapely
+
+from service.mesh_cache import MeshCache
+
+
+class TestMeshCache:
+
+    def test_key_depends_on_polygon_and_assets(self):
+        polygon = shapely.box(0, 0, 1, 1)
+        triangulator = "PyvistaTriangulator"
+        key = MeshCache.create_key(polygon, triangulator, ["dtm_2019_a.zip", "dtm_2019_b.zip"])
+
+        assert key == MeshCache.create_key(shapely.box(0, 0, 1, 1), triangulator, ["dtm_2019_b.zip", "dtm_2019_a.zip"])
+        assert key != MeshCache.create_key(polygon, triangulator, ["dtm_2021_a.zip", "dtm_2019_b.zip"])
+        assert key != MeshCache.create_key(shapely.box(0, 0, 1, 2), triangulator, ["dtm_2019_a.zip", "dtm_2019_b.zip"])
+
+    def test_key_depends_on_triangulator(self):
+        polygon = shapely.box(0, 0, 1, 1)
+
+        assert MeshCache.create_key(polygon, "PyvistaTriangulator", ["dtm_2019_a.zip"]) != \
+            MeshCache.create_key(polygon, "TriangleTriangulator", ["dtm_2019_a.zip"])
+
+    def test_add_and_get_round_trip(self, tmp_path):
+        cache = MeshCache(1, str(tmp_path))
+        vertices = np.array([[0.0, 0.0, 1.0], [1.0, 0.0, 2.0], [0.0, 1.0, 3.0]])
+        faces = np.array([[0, 1, 2]])
+
+        assert cache.get("a") is None
+        cache.add("a", vertices, faces)
+        cached_vertices, cached_faces = cache.get("a")
+
+        np.testing.assert_array_equal(cached_vertices, vertices)
+        np.testing.assert_array_equal(cached_faces, faces)
+
+    def test_disabled_cache_stores_nothing(self, tmp_path):
+        cache = MeshCache(0, str(tmp_path))
+
+        cache.add("a", np.zeros((3, 3)), np.zeros((1, 3), dtype=np.int64))
+
+        assert cache.get("a") is None
+        assert list(tmp_path.iterdir()) == []
+
+    def test_evict_removes_least_recently_used_entries(self, tmp_path):
+        cache = MeshCache(1, str(tmp_path))
+        vertices = np.zeros((20000, 3))
+        faces = np.zeros((1, 3), dtype=np.int64)
+        for index, key in enumerate(["a", "b", "c"]):
+            cache.add(key, vertices, faces)
+            os.utime(cache.get_file_path(key), (index, index))
+        cache.get("a")
+
+        cache.evict()
+
+        assert [cache.get(key) is not None for key in ["a", "b", "c"]] == [True, False, True]
@@ -0,0 +1,47 @@
+import os
+import time
+
+from celery import Celery
+from celery.contrib.testing.worker import start_worker
+
+from core.parallel import map_inputs
+
+
+def square(value: int) -> int:
+    return value * value
+
+
+def get_pid(_) -> int:
+    return os.getpid()
+
+
+app = Celery("test_parallel", broker="memory://")
+
+
+@app.task
+def map_pids() -> tuple[int, list[int]]:
+    return os.getpid(), map_inputs(get_pid, list(range(8)), 2)
+
+
+class TestParallel:
+
+    def test_map_inputs_keeps_order_in_worker_processes(self):
+        assert map_inputs(square, list(range(10)), 2) == [value * value for value in range(10)]
+
+    def test_map_inputs_does_not_wait_for_worker_exit(self):
+        # billiard workers wait up to 30 s before exiting if their results are not accounted to them
+        start = time.perf_counter()
+        for _ in range(3):
+            assert map_inputs(square, list(range(10)), 2) == [value * value for value in range(10)]
+
+        assert time.perf_counter() - start < 20
+
+    def test_map_inputs_starts_worker_processes_in_celery_prefork_task(self, tmp_path):
+        # the task processes of the prefork pool are daemonic like in the deployed worker
+        app.conf.result_backend = f"file://{tmp_path}"
+        with start_worker(app, pool="prefork", concurrency=1, perform_ping_check=False):
+            task_pid, pids = map_pids.delay().get(timeout=60)
+
+        assert task_pid != os.getpid()
+        assert len(pids) == 8
+        assert task_pid not in pids
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+import shapely
+
+from core.tin.area import Area
+from core.tin.grid import Grid
+from core.tin.partition import Partition
+
+
+def surface(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    return 400.0 + 2.0 * np.sin(x / 10.0) * np.cos(y / 15.0)
+
+
+class TestPartition:
+    polygons = [
+        shapely.box(10.0, 10.0, 40.3, 70.0),
+        shapely.Polygon([(40.3, 10.0), (70.0, 10.0), (70.0, 70.0), (40.3, 70.0), (40.3, 35.1)]),
+        shapely.Polygon([(10.0, 70.0), (70.0, 70.0), (40.0, 75.3)]),
+    ]
+
+    def create_partition(self, raster_points: np.ndarray) -> Partition:
+        areas = []
+        for polygon in self.polygons:
+            area = Area(polygon)
+            buffer = polygon.buffer(area.get_buffer_distance())
+            area.raster_points_buffer.append(
+                raster_points[shapely.contains_xy(buffer, raster_points[:, 0], raster_points[:, 1])])
+            area.raster_points_within.append(
+                raster_points[shapely.contains_xy(polygon, raster_points[:, 0], raster_points[:, 1])])
+            areas.append(area)
+        return Partition(areas)
+
+    def test_planar_graph_contains_shared_edges_once(self, create_raster_points):
+        raster_points = create_raster_points(surface, 41, spacing=2.0)
+        partition = self.create_partition(raster_points)
+        grid_vertices, segments = partition.create_planar_graph(Grid(raster_points, 2.0))
+
+        edges = np.sort(segments, axis=1)
+        assert len(np.unique(edges, axis=0)) == len(edges)
+        assert len(np.unique(grid_vertices, axis=0)) == len(grid_vertices)
+
+    def test_meshes_cover_areas_and_share_boundary_vertices(self, create_raster_points):
+        partition = self.create_partition(create_raster_points(surface, 41, spacing=2.0))
+        meshes = Partition.from_mesh_input(partition.to_mesh_input()).create_meshes()
+
+        assert len(meshes) == len(self.polygons)
+        for polygon, (vertices, faces) in zip(self.polygons, meshes):
+            triangles = shapely.polygons(vertices[faces][:, :, :2])
+            assert shapely.union_all(triangles).area == pytest.approx(polygon.area)
+
+        shared_boundary = self.polygons[0].intersection(self.polygons[1])
+        shared_vertices = []
+        for vertices, _ in meshes[:2]:
+            on_boundary = shapely.dwithin(shapely.points(vertices[:, :2]), shared_boundary, 1e-9)
+            shared_vertices.append(vertices[on_boundary][np.lexsort(vertices[on_boundary].T[::-1])])
+        np.testing.assert_array_equal(shared_vertices[0], shared_vertices[1])
@@ -3,6 +3,34 @@ from lxml import etree
 from shapely import Point
 
 from core.ifc.model.building.polygon import Polygon
+from core.ifc.model.building.solid import Solid
+
+
+class DummyIfcFile:
+    def __init__(self):
+        self.cartesian_points = []
+
+    def create_ifc_indexed_polygonal_face(self, coord_index):
+        return "IfcIndexedPolygonalFace", coord_index
+
+    def create_ifc_indexed_polygonal_face_with_voids(self, coord_index, inner_coord_indices):
+        return "IfcIndexedPolygonalFaceWithVoids", coord_index, inner_coord_indices
+
+    def create_ifc_cartesian_point(self, point):
+        self.cartesian_points.append(("IfcCartesianPoint", point))
+        return self.cartesian_points[-1]
+
+    def create_ifc_poly_loop(self, polygon):
+        return polygon
+
+    def create_ifc_face(self, exterior_poly_loop, interior_poly_loops):
+        return ("IfcFace", exterior_poly_loop, *interior_poly_loops)
+
+    def create_ifc_faceted_brep(self, faces):
+        return "IfcFacetedBrep", faces
+
+    def create_ifc_styled_item(self, item, style):
+        pass
 
 
 class TestGmlPolygon:
@@ -47,3 +75,49 @@ class TestGmlPolygon:
 
         with pytest.raises(ValueError,  match="PosList must be closed"):
             Polygon().from_gml(gml_poly, Point(0, 0, 0))
+
+    def test_faces_share_vertices_including_interior(self):
+        gml_poly = etree.fromstring(
+            f'<gml:Polygon xmlns:gml="{self.NS_GML}">'
+            '<gml:exterior><gml:LinearRing><gml:posList>0 0 0 10 0 0 10 10 0 0 10 0 0 0 0</gml:posList>'
+            '</gml:LinearRing></gml:exterior>'
+            '<gml:interior><gml:LinearRing><gml:posList>2 2 0 4 2 0 4 4 0 2 2 0</gml:posList>'
+            '</gml:LinearRing></gml:interior></gml:Polygon>')
+        poly = Polygon()
+        poly.from_gml(gml_poly, Point(1, 1, 0))
+        ifc_file = DummyIfcFile()
+
+        coordinates = {}
+        face = poly.create_ifc_indexed_polygonal_face(ifc_file, coordinates)
+        assert face == ("IfcIndexedPolygonalFaceWithVoids", [1, 2, 3, 4], [[5, 6, 7]])
+        assert list(coordinates)[0] == (-1.0, -1.0, 0.0)
+        assert poly.create_ifc_indexed_polygonal_face(ifc_file, coordinates)[1] == [1, 2, 3, 4]
+        assert len(coordinates) == 7
+
+        vertices = {}
+        face = poly.create_ifc_face(ifc_file, vertices)
+        assert [len(loop) for loop in face[1:]] == [4, 3]
+        assert face[2][0] == ("IfcCartesianPoint", (1.0, 1.0, 0.0))
+        assert len(vertices) == 7
+
+    def test_solid_faces_reference_pooled_cartesian_points(self):
+        gml_solid = etree.fromstring(
+            f'<gml:Solid xmlns:gml="{self.NS_GML}"><gml:exterior><gml:CompositeSurface>'
+            '<gml:surfaceMember><gml:Polygon><gml:exterior><gml:LinearRing>'
+            '<gml:posList>0 0 0 1 0 0 1 1 0 0 0 0</gml:posList>'
+            '</gml:LinearRing></gml:exterior></gml:Polygon></gml:surfaceMember>'
+            '<gml:surfaceMember><gml:Polygon><gml:exterior><gml:LinearRing>'
+            '<gml:posList>0 0 0 1 1 0 0 1 0 0 0 0</gml:posList>'
+            '</gml:LinearRing></gml:exterior></gml:Polygon></gml:surfaceMember>'
+            '</gml:CompositeSurface></gml:exterior></gml:Solid>')
+        solid = Solid()
+        solid.from_gml(gml_solid, Point(0, 0, 0))
+        ifc_file = DummyIfcFile()
+
+        vertices = {}
+        breps = [solid.create_ifc_brep(ifc_file, None, vertices) for _ in range(2)]
+
+        assert len(ifc_file.cartesian_points) == len(vertices) == 4
+        first_face, second_face = breps[1][1]
+        assert first_face[1][0] is second_face[1][0] is breps[0][1][0][1][0]
+        assert first_face[1][2] is second_face[1][1]
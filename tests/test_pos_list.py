@@ -1,3 +1,4 @@
+import numpy as np
 import pytest
 from shapely import Point
 
@@ -23,8 +24,9 @@ class TestPosList:
         pl.from_gml(gml, origin)
 
         # After offset, first coordinate becomes (0,0,0)
-        assert len(pl.coordinates) == 3  # last coordinate is closing point and not stored
-        assert pl.coordinates[0] == Point(0.0, 0.0, 0.0)
+        assert pl.coordinates.shape == (3, 3)  # last coordinate is closing point and not stored
+        assert pl.coordinates.dtype == np.float64
+        np.testing.assert_array_equal(pl.coordinates, [[0.0, 0.0, 0.0], [1.0, 0.0, 1.0], [1.0, 1.0, 2.0]])
 
     def test_from_gml_rejects_non_3d_or_unclosed(self):
         origin = Point(0, 0, 0)
@@ -0,0 +1,20 @@
+import numpy as np
+from shapely import Point
+
+from core.processors.projection_data import ProjectionData
+
+
+class TestProjectionData:
+
+    def test_create_mesh_data_welds_vertices_of_areas(self):
+        element_row = {"wkt": "MULTIPOLYGON(((0 0, 1 0, 1 1, 0 0)), ((0 0, 1 1, 0 1, 0 0)))"}
+        projection_data = ProjectionData(element_row, Point(10, 20, 30))
+        area_meshes = [
+            (np.array([[10.0, 20.0, 30.0], [11.0, 20.0, 30.0], [11.0, 21.0, 31.0]]), np.array([[0, 1, 2]])),
+            (np.array([[11.0, 21.0, 31.0 + 1e-9], [10.0, 21.0, 31.0], [10.0, 20.0, 30.0]]), np.array([[2, 0, 1]])),
+        ]
+
+        points, indices = projection_data.create_mesh_data(area_meshes)
+
+        np.testing.assert_allclose(points, [[0, 0, 0], [1, 0, 0], [1, 1, 1], [0, 1, 1]])
+        np.testing.assert_array_equal(indices, [[0, 1, 2], [0, 2, 3]])
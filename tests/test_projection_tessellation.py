@@ -1,4 +1,4 @@
-from shapely import Point
+import numpy as np
 
 from core.ifc.model.projection.projection import Projection
 from core.ifc.model.projection.tessellation import Tessellation
@@ -34,24 +34,17 @@ class DummyIfcFile:
 
 class TestTessellation:
 
-    def test_map_to_ifc_builds_unique_vertices_and_indices(self):
-        v1, v2, v3, v4 = Point(0, 0, 0), Point(1, 0, 0), Point(0, 1, 0), Point(1, 1, 0)
+    def test_map_to_ifc_passes_arrays_with_one_based_indices(self):
+        vertices = np.array([[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [1.0, 1.0, 0.0]])
         # Two triangles that share an edge (v2-v3)
-        faces = [
-            (v1, v2, v3),
-            (v2, v4, v3),
-        ]
-        tess = Tessellation(faces)
+        indices = np.array([[0, 1, 2], [1, 3, 2]])
+        tess = Tessellation(vertices, indices)
         dummy = DummyIfcFile()
         face_set = tess.map_to_ifc(dummy)
 
-        # Expect unique vertices condensed, indices referencing same objects
         assert face_set["type"] == "IfcTriangulatedFaceSet"
-        # Vertices must include exactly the unique set {v1, v2, v3, v4}
-        assert len(face_set["vertices"]) == 4
-        # Two triangles => two index rows of length 3
-        assert len(face_set["indices"]) == 2
-        assert all(len(row) == 3 for row in face_set["indices"])
+        assert face_set["vertices"] is vertices
+        np.testing.assert_array_equal(face_set["indices"], [[1, 2, 3], [2, 4, 3]])
 
 
 class TestProjection:
@@ -65,7 +58,8 @@ class TestProjection:
         indices = [[0, 1, 2]]
 
         proj = Projection((points, indices))
-        assert len(proj.triangles) == 1
+        assert proj.vertices.shape == (3, 3)
+        np.testing.assert_array_equal(proj.indices, [[0, 1, 2]])
 
         dummy = DummyIfcFile()
         # The Projection.map_to_ifc chooses based on entity, we select IFC_GEOGRAPHIC_ELEMENT path
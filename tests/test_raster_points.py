@@ -0,0 +1,43 @@
+import numpy as np
+import shapely
+
+from core.tin.area import Area
+from core.tin.raster_points import RasterPoints
+
+
+def create_raster_points(tmp_path) -> RasterPoints:
+    xs, ys = np.meshgrid(np.arange(10.0), np.arange(10.0))
+    data = np.column_stack([xs.ravel(), ys.ravel(), np.arange(100.0)])
+    tile_path = tmp_path / "tile.npy"
+    np.save(tile_path, data[np.random.default_rng(0).permutation(100)])
+    return RasterPoints(str(tile_path))
+
+
+class TestRasterPoints:
+
+    def test_within_returns_points_in_tile_order(self, tmp_path):
+        raster_points = create_raster_points(tmp_path)
+        polygon = shapely.box(1.5, 2.5, 3.5, 4.5)
+        shapely.prepare(polygon)
+
+        points = raster_points.within(polygon)
+
+        np.testing.assert_array_equal(np.sort(points[:, 2]), [32, 33, 42, 43])
+        tile_rows = [np.flatnonzero((raster_points.data == point).all(axis=1))[0] for point in points]
+        assert tile_rows == sorted(tile_rows)
+        assert raster_points.bounds == (0.0, 0.0, 9.0, 9.0)
+
+    def test_within_returns_none_without_points(self, tmp_path):
+        raster_points = create_raster_points(tmp_path)
+
+        assert raster_points.within(shapely.box(20, 20, 30, 30)) is None
+        assert raster_points.within(shapely.Polygon()) is None
+
+    def test_area_excludes_points_on_boundary(self, tmp_path):
+        raster_points = create_raster_points(tmp_path)
+        area = Area(shapely.box(2, 2, 5, 5))
+
+        area.add_raster_points(raster_points)
+
+        np.testing.assert_array_equal(np.sort(area.raster_points_within[0][:, 2]), [33, 34, 43, 44])
+        assert len(area.raster_points_buffer[0]) > 16
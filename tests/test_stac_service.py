@@ -0,0 +1,24 @@
+from config.configuration import config
+from config.dtm_source import DtmSource
+from service.bounding_box import BoundingBox
+from service.stac_service import STACService
+
+
+class TestSTACService:
+
+    def test_cog_dtm_assets_are_returned_as_urls_without_download(self, monkeypatch):
+        hrefs = ["https://data.example.ch/swissalti3d_2019_2600-1200_0.5_2056_5728.tif"]
+        monkeypatch.setattr(config.stac, "dtm_source", DtmSource.COG)
+        service = STACService.__new__(STACService)
+        service.asset_ids_by_file = {}
+        monkeypatch.setattr(service, "fetch_latest_assets", lambda url, bounding_box, asset_filter: hrefs)
+
+        def download(href, file_path):
+            raise AssertionError(f"{href} must not be downloaded")
+
+        monkeypatch.setattr(service, "download", download)
+
+        dtm_files = service.fetch_dtm_assets(BoundingBox.from_wkts(["POINT(2600000 1200000)"]), 0.5)
+
+        assert dtm_files == hrefs
+        assert service.asset_ids_by_file == {hrefs[0]: "swissalti3d_2019_2600-1200_0.5_2056_5728.tif"}
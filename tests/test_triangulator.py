@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+import shapely
+from shapely import Polygon
+from shapely.geometry.polygon import LinearRing
+
+from core.tin.triangulator import PyvistaTriangulator, TriangleTriangulator
+
+
+class TestTriangulator:
+    polygon = Polygon([(0, 0), (10, 0), (10, 10), (5, 4), (0, 10)], [[(2, 2), (4, 2), (4, 3), (2, 3)]])
+    points_within = np.array([[1.0, 1.0], [8.0, 1.0], [8.0, 5.0], [3.0, 5.0]])
+
+    def triangulate(self, triangulator):
+        vertices, faces = triangulator.triangulate(self.polygon, self.polygon.exterior,
+                                                   [LinearRing(self.polygon.interiors[0])], self.points_within)
+        assert vertices.shape[1] == 2
+        return shapely.polygons(vertices[faces])
+
+    def test_triangle_backend_covers_polygon_without_hole(self):
+        triangles = self.triangulate(TriangleTriangulator())
+
+        assert shapely.union_all(triangles).symmetric_difference(self.polygon).area == pytest.approx(0.0, abs=1e-9)
+        assert sum(triangle.area for triangle in triangles) == pytest.approx(self.polygon.area)
+
+    def test_pyvista_backend_clips_triangles_to_polygon(self):
+        triangles = self.triangulate(PyvistaTriangulator())
+
+        assert len(triangles) > 0
+        assert all(triangle.within(self.polygon.buffer(0.01)) for triangle in triangles)